@@ -0,0 +1,204 @@
+"""
+Асинхронный клиент Яндекс.Диск API (asyncio + aiohttp)
+"""
+import asyncio
+import json
+import os
+import time
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp — необязательная зависимость
+    aiohttp = None
+
+from api.coalesce import AsyncSingleFlight, request_key
+from api.endpoints import *
+from api.metrics import endpoint_template
+from api.models import join_fields, query_params
+from api.resilience import CircuitOpenError
+from api.throttle import RequestStats, RetryPolicy, send_with_retry_async
+from api.transport import DEFAULT_TIMEOUT
+from api.upload import UPLOAD_CHUNK_SIZE
+
+# Сколько запросов одновременно держим в полёте
+DEFAULT_CONCURRENCY = 100
+# Общий лимит соединений пула
+DEFAULT_ASYNC_POOL_SIZE = 100
+
+
+class AsyncResponse:
+    """Прочитанный ответ с тем же интерфейсом, что у requests.Response"""
+
+    def __init__(self, status_code, headers, content, url):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncYandexDiskAPI:
+    """Асинхронная версия YandexDiskAPI.
+
+    Все запросы идут через одну aiohttp-сессию (общий пул соединений),
+    а семафор ограничивает число одновременных запросов.
+    """
+
+    def __init__(self, token, concurrency=DEFAULT_CONCURRENCY,
+                 pool_size=DEFAULT_ASYNC_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 rate_limiter=None, retry_policy=None, base_url=BASE_URL,
+                 coalesce=False, hedging=None, circuit_breaker=None):
+        if aiohttp is None:
+            raise ImportError("Для AsyncYandexDiskAPI нужен aiohttp: pip install aiohttp")
+        self.token = token
+        # Другой base_url (например, локальный стенд) подменяет префикс BASE_URL
+        self.base_url = base_url.rstrip('/')
+        self.headers = {
+            'Authorization': f'OAuth {token}',
+            'Content-Type': 'application/json'
+        }
+        self.pool_size = pool_size
+        connect_timeout, read_timeout = timeout
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout,
+                                             sock_read=read_timeout)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # TokenBucket общий для потоков и корутин: его можно делить с YandexDiskAPI
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.stats = RequestStats()
+        # Одинаковые одновременные GET делят один запрос: coalesce=True
+        self.single_flight = AsyncSingleFlight(self.stats) if coalesce else None
+        # Хвосты задержек: HedgePolicy для GET и CircuitBreaker по эндпоинтам
+        self.hedging = hedging
+        self.circuit_breaker = circuit_breaker
+        self._session = None
+
+    def _get_session(self):
+        # Сессию создаём лениво: ей нужен запущенный цикл событий
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def _send(self, method, url, headers=None, params=None, **kwargs):
+        async with self._semaphore:
+            async with self._get_session().request(method, url, headers=headers,
+                                                   params=query_params(params),
+                                                   **kwargs) as response:
+                content = await response.read()
+                return AsyncResponse(response.status, response.headers, content,
+                                     str(response.url))
+
+    def _admit_hedge(self):
+        """Вторая копия хеджа тратит токен лимитера; без свободного не отправляется"""
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            return False
+        self.stats.incr('requests')
+        return True
+
+    async def _request(self, method, url, **kwargs):
+        """Базовый метод для запросов"""
+        if self.base_url != BASE_URL and url.startswith(BASE_URL):
+            url = self.base_url + url[len(BASE_URL):]
+
+        plain_get = method == 'GET' and set(kwargs) <= {'params'}
+        errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+        def attempt():
+            return self._send(method, url, headers=self.headers, **kwargs)
+
+        if self.hedging is not None or self.circuit_breaker is not None:
+            endpoint = endpoint_template(method, url)
+        if self.hedging is not None and plain_get:
+            hedged = attempt
+            attempt = lambda: self.hedging.run_async(endpoint, hedged, self._admit_hedge)
+        if self.circuit_breaker is not None:
+            guarded = attempt
+            attempt = lambda: self.circuit_breaker.call_async(endpoint, guarded, errors)
+
+        async def send():
+            try:
+                return await send_with_retry_async(attempt, method, self.retry_policy,
+                                                   self.rate_limiter, self.stats, errors=errors)
+            except CircuitOpenError:
+                self.stats.incr('circuit_open')
+                raise
+
+        if self.single_flight is not None and plain_get:
+            return await self.single_flight.do(request_key(method, url, kwargs.get('params')),
+                                               send)
+        return await send()
+
+    async def close(self):
+        """Закрывает сессию и все соединения пула"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    # Методы для работы с файлами
+    async def get_disk_info(self, fields=None):
+        params = {'fields': join_fields(fields)} if fields else None
+        return await self._request('GET', BASE_URL, params=params)
+
+    async def upload_file(self, file_path, disk_file_path, overwrite=False,
+                          chunk_size=UPLOAD_CHUNK_SIZE, progress=None):
+        """Загрузка файла сырым телом; progress(sent, total, elapsed) — по желанию"""
+        # 1. Получаем ссылку для загрузки
+        params = {'path': disk_file_path, 'overwrite': overwrite}
+        response = await self._request('GET', FILES_URL, params=params)
+
+        if response.status_code == 200:
+            href = response.json()['href']
+            # 2. Загружаем файл потоком; чтение с диска уходит в пул потоков
+            total = os.path.getsize(file_path)
+            body = self._read_chunks(file_path, chunk_size, total, progress)
+            return await self._send('PUT', href, data=body,
+                                    headers={'Content-Length': str(total)})
+        return response
+
+    @staticmethod
+    async def _read_chunks(file_path, chunk_size, total, progress):
+        sent = 0
+        started = time.monotonic()
+        with open(file_path, 'rb') as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+                sent += len(chunk)
+                if progress is not None:
+                    progress(sent, total, time.monotonic() - started)
+
+    async def create_folder(self, path):
+        params = {'path': path}
+        return await self._request('PUT', RESOURCES_URL, params=params)
+
+    async def delete_resource(self, path, permanently=False):
+        params = {'path': path, 'permanently': permanently}
+        return await self._request('DELETE', RESOURCES_URL, params=params)
+
+    async def get_resource_info(self, path, fields=None, limit=None):
+        """Метаданные ресурса; fields — проекция на стороне API"""
+        params = {'path': path}
+        if fields:
+            params['fields'] = join_fields(fields)
+        if limit is not None:
+            params['limit'] = limit
+        return await self._request('GET', RESOURCES_URL, params=params)
+
+    async def publish_resource(self, path):
+        params = {'path': path}
+        return await self._request('PUT', PUBLISH_URL, params=params)
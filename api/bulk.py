@@ -0,0 +1,173 @@
+"""
+Массовые операции: создание и удаление папок с учётом дерева путей,
+копирование и перемещение на стороне сервера
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+from api.operations import OPERATION_FAILED, OPERATION_SUCCESS
+from api.paths import ancestors, is_under, normalize_path, parent_path
+
+# Сколько запросов массовой операции выполняем одновременно
+BULK_WORKERS = 8
+# Сколько секунд массовое копирование/перемещение ждёт асинхронные операции
+TRANSFER_TIMEOUT = 300.0
+
+
+def _call(func, path):
+    # Ошибка сети одного пути не должна ронять всю пачку
+    try:
+        return func(path)
+    except Exception as error:
+        return error
+
+
+def plan_folders(paths):
+    """Все папки, которые нужно создать, включая недостающих предков"""
+    planned = set()
+    for path in paths:
+        path = normalize_path(path)
+        if path:
+            planned.add(path)
+            planned.update(ancestors(path))
+    return planned
+
+
+def create_folders(create_folder, paths, workers=BULK_WORKERS):
+    """Создаёт дерево папок; ребёнок уходит в работу сразу после родителя.
+
+    Возвращает {нормализованный путь: ответ или исключение}. Если родитель
+    не создался (не 201/409), его потомки не запрашиваются и получают None.
+    """
+    planned = plan_folders(paths)
+    children = {}
+    roots = []
+    for path in sorted(planned):
+        parent = parent_path(path)
+        if parent in planned:
+            children.setdefault(parent, []).append(path)
+        else:
+            roots.append(path)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_call, create_folder, path): path for path in roots}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                result = results[path] = future.result()
+                if getattr(result, 'status_code', None) in (201, 409):
+                    for child in children.get(path, ()):
+                        pending[executor.submit(_call, create_folder, child)] = child
+                else:
+                    for other in planned:
+                        if other != path and is_under(other, path):
+                            results[other] = None
+    return results
+
+
+def collapse_deletes(paths):
+    """Убирает пути, которые и так удалятся вместе с удаляемым предком.
+
+    Возвращает (корни для удаления, {покрытый путь: его корень}).
+    """
+    roots = []
+    root_set = set()
+    covered = {}
+    # Предок всегда короче потомка, поэтому идём по возрастанию длины;
+    # у пути не больше одного предка среди корней
+    for path in sorted({normalize_path(p) for p in paths}, key=len):
+        root = next((a for a in ancestors(path) if a in root_set), None)
+        if root is None:
+            roots.append(path)
+            root_set.add(path)
+        else:
+            covered[path] = root
+    return roots, covered
+
+
+def delete_resources(delete_resource, paths, workers=BULK_WORKERS):
+    """Удаляет пути параллельно, не трогая уже покрытые предками.
+
+    Возвращает {нормализованный путь: ответ или исключение}; покрытые пути
+    получают ответ своего удалённого предка.
+    """
+    roots, covered = collapse_deletes(paths)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dict(zip(roots, executor.map(lambda p: _call(delete_resource, p), roots)))
+    for path, root in covered.items():
+        results[path] = results[root]
+    return results
+
+
+# Статусы TransferResult помимо 'success'/'failed' операций Диска
+TRANSFER_IN_PROGRESS = 'in-progress'
+TRANSFER_ERROR = 'error'
+
+
+class TransferResult:
+    """Итог копирования/перемещения одного ресурса.
+
+    status: 'success', 'failed' (ответ 4xx/5xx или операция завершилась
+    ошибкой), 'in-progress' (операция не успела за timeout) или 'error'
+    (исключение при запросе, оно в error). response — первый ответ API.
+    """
+
+    __slots__ = ('source', 'path', 'response', 'status', 'error')
+
+    def __init__(self, source, path, response=None, status=None, error=None):
+        self.source = source
+        self.path = path
+        self.response = response
+        self.status = status
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.status == OPERATION_SUCCESS
+
+    def __repr__(self):
+        return f'TransferResult({self.source!r} -> {self.path!r}: {self.status})'
+
+
+def transfer_many(transfer, track, pairs, workers=BULK_WORKERS, timeout=TRANSFER_TIMEOUT):
+    """Копирует или перемещает пары (откуда, куда) не больше workers за раз.
+
+    transfer(source, path) — ответ API, track(response) — Future статуса
+    асинхронной операции (202). Запросы уходят параллельно, операции
+    опрашиваются общим планировщиком, пока идут остальные запросы.
+    Возвращает {нормализованный путь назначения: TransferResult}; два
+    ресурса в одно назначение — ValueError. timeout=None — ждать без предела.
+    """
+    pairs = [(normalize_path(source), normalize_path(path)) for source, path in pairs]
+    destinations = set()
+    for _, path in pairs:
+        if path in destinations:
+            raise ValueError(f"Несколько ресурсов копируются в один путь: {path}")
+        destinations.add(path)
+    results = {}
+    operations = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        responses = executor.map(lambda pair: _call(lambda p: transfer(*p), pair), pairs)
+        for (source, path), response in zip(pairs, responses):
+            result = results[path] = TransferResult(source, path)
+            if isinstance(response, Exception):
+                result.status = TRANSFER_ERROR
+                result.error = response
+                continue
+            result.response = response
+            if response.status_code == 202:
+                operations[path] = track(response)
+            else:
+                result.status = OPERATION_SUCCESS if response.status_code < 300 else OPERATION_FAILED
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for path, future in operations.items():
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            results[path].status = future.result(remaining)
+        except FuturesTimeout:
+            results[path].status = TRANSFER_IN_PROGRESS
+    return results
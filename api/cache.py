@@ -0,0 +1,97 @@
+"""
+LRU-кэш метаданных с TTL для get_resource_info и get_disk_info
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from api.paths import is_under, normalize_path
+
+# Размер кэша по умолчанию (число ответов)
+CACHE_MAXSIZE = 1024
+# Сколько секунд запись считается свежей
+CACHE_TTL = 30.0
+# Поля, по которым сверяем устаревшую запись с сервером
+REVALIDATE_FIELDS = ('md5', 'modified')
+
+
+class CacheEntry:
+    __slots__ = ('path', 'response', 'expires_at')
+
+    def __init__(self, path, response, expires_at):
+        self.path = path
+        self.response = response
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return time.monotonic() < self.expires_at
+
+
+class MetadataCache:
+    """Ограниченный по размеру кэш ответов с вытеснением LRU.
+
+    Устаревшая запись файла не выбрасывается сразу: клиент может дёшево сверить
+    md5/modified ресурса и продлить её (touch). Запись хранит нормализованный
+    путь ('' — корень, None — информация о диске), по нему идёт инвалидация.
+    """
+
+    def __init__(self, maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Растёт при каждой инвалидации: ответ, запрошенный до неё, не кэшируем
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(self, key):
+        """Запись (возможно устаревшая) или None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+            return entry
+
+    def put(self, key, path, response, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = CacheEntry(path, response, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def touch(self, key):
+        """Продлевает TTL записи, подтверждённой сервером"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + self.ttl
+                self.hits += 1
+
+    def invalidate(self, path, disk_info=True):
+        """Сбрасывает записи пути, его потомков и предков (их листинги изменились)"""
+        path = normalize_path(path)
+        with self._lock:
+            self.generation += 1
+            for key in [key for key, entry in self._entries.items()
+                        if (entry.path is None and disk_info)
+                        or (entry.path is not None
+                            and (is_under(entry.path, path) or is_under(path, entry.path)
+                                 or entry.path == ''))]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
@@ -0,0 +1,261 @@
+"""
+Запись и воспроизведение HTTP-обменов (кассеты) для быстрых офлайн-тестов
+
+    with CassetteTransport('tests/cassettes/upload') as transport:
+        client = YandexDiskAPI(token, transport=transport)
+        ...
+
+Кассета — два файла: <path>.bodies с телами ответов подряд (сырые байты,
+одинаковые тела хранятся один раз) и <path>.index.json с индексом
+{ключ запроса: [ответы по порядку]}. Ключ — метод, URL, параметры и Range,
+поэтому поиск при воспроизведении — один поиск в словаре. Крупные тела при
+воспроизведении читаются с диска по мере потребления, а не целиком.
+"""
+import datetime
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from api.coalesce import request_key
+from api.metrics import RequestEvent, endpoint_template
+from api.transport import Transport
+
+CASSETTE_VERSION = 1
+# Тела до этого размера при воспроизведении читаются сразу, крупнее — потоком
+INLINE_BODY_SIZE = 64 * 1024
+RECORD_CHUNK_SIZE = 1024 * 1024
+# Заголовки ответа, которые при воспроизведении не нужны
+_SKIP_HEADERS = frozenset(('date', 'server', 'connection', 'keep-alive',
+                           'transfer-encoding', 'content-encoding'))
+
+RECORD = 'record'
+REPLAY = 'replay'
+ONCE = 'once'
+
+
+class CassetteMissError(requests.RequestException):
+    """В кассете нет ответа на такой запрос"""
+
+
+def cassette_key(method, url, params=None, headers=None):
+    """Строковый ключ запроса в индексе кассеты"""
+    method, url, items = request_key(method, url, params)
+    query = '&'.join(f'{key}={value}' for key, value in items)
+    key = f'{method} {url}' + (f'?{query}' if query else '')
+    range_header = (headers or {}).get('Range')
+    return f'{key} [{range_header}]' if range_header else key
+
+
+class _BodySlice(io.RawIOBase):
+    """Файловый объект над диапазоном файла тел: читает только по запросу"""
+
+    def __init__(self, path, offset, length):
+        self._file = open(path, 'rb')
+        self._file.seek(offset)
+        self._remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if not size:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class CassetteTransport:
+    """Транспорт с интерфейсом Transport, пишущий или проигрывающий кассету.
+
+    mode: 'record' — запросы идут в сеть через transport, ответы пишутся;
+    'replay' — только кассета, неизвестный запрос — CassetteMissError;
+    'once' — воспроизведение, если кассета уже есть, иначе запись.
+    Повторяющиеся запросы получают записанные ответы по порядку, после
+    последнего отдаётся последний. timing — множитель записанной задержки
+    (0 — без задержек, 1 — как при записи).
+    """
+
+    def __init__(self, path, mode=ONCE, transport=None, timing=0.0):
+        self.path = path
+        self.index_path = path + '.index.json'
+        self.bodies_path = path + '.bodies'
+        if mode == ONCE:
+            mode = REPLAY if os.path.exists(self.index_path) else RECORD
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Неизвестный режим кассеты: {mode}")
+        self.mode = mode
+        self.timing = timing
+        self.hooks = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._positions = {}
+        if mode == RECORD:
+            self._owns_transport = transport is None
+            self.transport = transport or Transport()
+            self.timeout = self.transport.timeout
+            self._entries = {}
+            self._digests = {}
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._bodies = open(self.bodies_path, 'wb')
+        else:
+            self._owns_transport = False
+            self.transport = None
+            self.timeout = None
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') != CASSETTE_VERSION:
+                raise ValueError(f"Неподдерживаемая версия кассеты: {index.get('version')}")
+            self._entries = index['entries']
+            self._bodies = None
+
+    def add_hook(self, hook):
+        """Подписывает hook(event) на события запросов, как у Transport"""
+        self.hooks.append(hook)
+
+    def request(self, method, url, params=None, headers=None, data=None, stream=False,
+                **kwargs):
+        if self._closed:
+            raise RuntimeError("Кассета закрыта")
+        key = cassette_key(method, url, params, headers)
+        if self.mode == RECORD:
+            entry = self._record(key, method, url, params, headers, data, stream, kwargs)
+        else:
+            _drain(data)
+            entry = self._next(key)
+            if self.timing:
+                time.sleep(entry['elapsed'] * self.timing)
+        response = self._response(entry, method, stream)
+        if self.hooks:
+            event = RequestEvent(method, url, endpoint_template(method, url),
+                                 status=response.status_code, duration=entry['elapsed'],
+                                 bytes_received=entry['length'])
+            for hook in self.hooks:
+                hook(event)
+        return response
+
+    def _next(self, key):
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(f"Нет записи в кассете {self.path}: {key}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+    def _record(self, key, method, url, params, headers, data, stream, kwargs):
+        started = time.perf_counter()
+        response = self.transport.request(method, url, params=params, headers=headers,
+                                          data=data, stream=True, **kwargs)
+        # Тело сначала копим во временном файле (в памяти, пока небольшое),
+        # чтобы под блокировкой только дописать его в кассету
+        digest = hashlib.sha1()
+        with tempfile.SpooledTemporaryFile(max_size=RECORD_CHUNK_SIZE) as spool:
+            try:
+                for chunk in response.iter_content(RECORD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    spool.write(chunk)
+            finally:
+                response.close()
+            elapsed = time.perf_counter() - started
+            length = spool.tell()
+            with self._lock:
+                offset = self._digests.get(digest.hexdigest())
+                if offset is None:
+                    offset = self._bodies.tell()
+                    spool.seek(0)
+                    while True:
+                        chunk = spool.read(RECORD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        self._bodies.write(chunk)
+                    self._bodies.flush()
+                    self._digests[digest.hexdigest()] = offset
+                entry = {
+                    'status': response.status_code,
+                    'reason': response.reason,
+                    'url': response.url,
+                    'headers': {name: value for name, value in response.headers.items()
+                                if name.lower() not in _SKIP_HEADERS},
+                    'offset': offset,
+                    'length': length,
+                    'elapsed': round(elapsed, 6),
+                }
+                self._entries.setdefault(key, []).append(entry)
+        return entry
+
+    def _response(self, entry, method, stream):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.elapsed = datetime.timedelta(seconds=entry['elapsed'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.request = requests.Request(method, entry['url']).prepare()
+        length = entry['length']
+        if stream and length > INLINE_BODY_SIZE:
+            response.raw = _BodySlice(self.bodies_path, entry['offset'], length)
+            return response
+        # Тело уже прочитано: close() не должен трогать raw, которого нет
+        response._content_consumed = True
+        response._content = b''
+        if length:
+            with open(self.bodies_path, 'rb') as f:
+                f.seek(entry['offset'])
+                response._content = f.read(length)
+        return response
+
+    def save(self):
+        """Записывает индекс; тела уже на диске"""
+        if self.mode != RECORD:
+            return
+        with self._lock:
+            self._bodies.flush()
+            temp_path = self.index_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CASSETTE_VERSION, 'entries': self._entries}, f,
+                          ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, self.index_path)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """Сохраняет записанную кассету и закрывает файлы"""
+        if self._closed:
+            return
+        self.save()
+        if self._bodies is not None:
+            self._bodies.close()
+        if self._owns_transport:
+            self.transport.close()
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _drain(data):
+    """При воспроизведении тело запроса тоже читается: генераторы и трубы
+    не должны зависнуть, а progress — получить свои вызовы"""
+    if data is None or isinstance(data, (bytes, bytearray, memoryview, str, dict)):
+        return
+    for _ in data:
+        pass
@@ -1,48 +1,353 @@
-import requests
+import threading
+
 from api.endpoints import *
+from api.transport import Transport, DEFAULT_TIMEOUT, DEFAULT_POOL_MAXSIZE
+from api import bulk
+from api.bulk import BULK_WORKERS, TRANSFER_TIMEOUT
+from api.cache import REVALIDATE_FIELDS
+from api.coalesce import SingleFlight, request_key
+from api.download import download_ranged, DOWNLOAD_SEGMENT_SIZE, DOWNLOAD_WORKERS
+from api.listing import PAGE_SIZE, item_fields, iter_pages
+from api.mirror import FILES_PAGE_SIZE, LAST_UPLOADED_LIMIT, MIRROR_MAX_AGE, MetadataMirror
+from api.metrics import endpoint_template
+from api.models import join_fields, query_params
+from api.operations import OperationTracker
+from api.paths import normalize_path
+from api.resilience import CircuitOpenError
+from api import sync
+from api.sync import SYNC_WORKERS
+from api.throttle import RequestStats, RetryPolicy, send_with_retry
+from api.upload import (FileBody, UPLOAD_CHUNK_SIZE, UPLOAD_LOOKAHEAD, UPLOAD_WORKERS,
+                        make_body, pipelined_upload)
 
 class YandexDiskAPI:
-    def __init__(self, token):
+    def __init__(self, token, transport=None, pool_size=DEFAULT_POOL_MAXSIZE,
+                 timeout=DEFAULT_TIMEOUT, keep_alive=True, rate_limiter=None,
+                 retry_policy=None, cache=None, base_url=BASE_URL, metrics=None,
+                 coalesce=False, hedging=None, circuit_breaker=None):
         self.token = token
+        # Другой base_url (например, локальный стенд) подменяет префикс BASE_URL
+        self.base_url = base_url.rstrip('/')
         self.headers = {
             'Authorization': f'OAuth {token}',
             'Content-Type': 'application/json'
         }
+        # Клиент владеет транспортом, только если создал его сам
+        self._owns_transport = transport is None
+        self.transport = transport or Transport(pool_maxsize=pool_size,
+                                                timeout=timeout,
+                                                keep_alive=keep_alive)
+        # Лимитер можно разделить между клиентами, передав один TokenBucket
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.stats = RequestStats()
+        # Кэш метаданных включается явно: YandexDiskAPI(token, cache=MetadataCache())
+        self.cache = cache
+        # Метрики по фазам: YandexDiskAPI(token, metrics=MetricsCollector())
+        self.metrics = metrics
+        if metrics is not None:
+            self.transport.add_hook(metrics)
+        # Одинаковые одновременные GET делят один запрос: coalesce=True
+        self.single_flight = SingleFlight(self.stats) if coalesce else None
+        # Хвосты задержек: HedgePolicy для GET и CircuitBreaker по эндпоинтам
+        self.hedging = hedging
+        self.circuit_breaker = circuit_breaker
+        # Локальное зеркало метаданных: client.open_mirror()
+        self.mirror = None
+        self._operations = None
+        self._lock = threading.Lock()
     
     def _request(self, method, url, **kwargs):
         """Базовый метод для запросов"""
-        response = requests.request(method, url, headers=self.headers, **kwargs)
+        if self.base_url != BASE_URL and url.startswith(BASE_URL):
+            url = self.base_url + url[len(BASE_URL):]
+        if kwargs.get('params'):
+            kwargs['params'] = query_params(kwargs['params'])
+        
+        # Склеиваем и хеджируем только простые GET: с телом или stream нельзя
+        plain_get = method == 'GET' and set(kwargs) <= {'params'}
+        
+        def attempt():
+            return self.transport.request(method, url, headers=self.headers, **kwargs)
+        
+        if self.hedging is not None or self.circuit_breaker is not None:
+            endpoint = endpoint_template(method, url)
+        if self.hedging is not None and plain_get:
+            hedged = attempt
+            attempt = lambda: self.hedging.run(endpoint, hedged, self._admit_hedge)
+        if self.circuit_breaker is not None:
+            guarded = attempt
+            attempt = lambda: self.circuit_breaker.call(endpoint, guarded)
+        
+        def send():
+            try:
+                return send_with_retry(attempt, method, self.retry_policy, self.rate_limiter,
+                                       self.stats)
+            except CircuitOpenError:
+                self.stats.incr('circuit_open')
+                raise
+        
+        if self.single_flight is not None and plain_get:
+            return self.single_flight.do(request_key(method, url, kwargs.get('params')), send)
+        return send()
+    
+    def _admit_hedge(self):
+        """Вторая копия хеджа тратит токен лимитера; без свободного не отправляется"""
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            return False
+        self.stats.incr('requests')
+        return True
+    
+    def _cached_get(self, url, path, params=None):
+        """GET через кэш метаданных; устаревшая запись файла сверяется по md5/modified"""
+        key = (url, tuple(sorted((params or {}).items())))
+        entry = self.cache.lookup(key)
+        if entry is not None:
+            if entry.fresh:
+                return entry.response
+            if path is not None and self._still_valid(entry.response, url, params):
+                self.cache.touch(key)
+                return entry.response
+        generation = self.cache.generation
+        response = self._request('GET', url, params=params)
+        if response.status_code == 200:
+            self.cache.put(key, path, response, generation)
         return response
     
+    def _still_valid(self, cached, url, params):
+        cached_data = cached.json()
+        # Сверять можно только файл: modified папки не меняется при изменении
+        # её содержимого, поэтому папки и списки после TTL запрашиваются заново
+        if 'md5' not in cached_data or '_embedded' in cached_data:
+            return False
+        probe = self._request('GET', url, params=dict(params, fields=','.join(REVALIDATE_FIELDS)))
+        if probe.status_code != 200:
+            return False
+        probe_data = probe.json()
+        return all(probe_data.get(field) == cached_data.get(field) for field in REVALIDATE_FIELDS)
+    
+    def _invalidate(self, path, disk_info=True):
+        if self.cache is not None:
+            self.cache.invalidate(path, disk_info=disk_info)
+        if self.mirror is not None:
+            self.mirror.invalidate(path)
+    
+    def close(self):
+        """Закрывает соединения, если транспорт принадлежит клиенту"""
+        if self._operations is not None:
+            self._operations.close()
+        if self.mirror is not None:
+            self.mirror.close()
+        if self._owns_transport:
+            self.transport.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @property
+    def operations(self):
+        """Общий планировщик опроса асинхронных операций (создаётся лениво)"""
+        with self._lock:
+            if self._operations is None:
+                self._operations = OperationTracker(self._request)
+        return self._operations
+    
+    def track_operation(self, response):
+        """Future, которое завершится статусом операции из ответа 202"""
+        return self.operations.track(response)
+    
+    def wait_operation(self, response, timeout=None):
+        """Ждёт завершения операции и возвращает 'success' или 'failed'"""
+        return self.track_operation(response).result(timeout)
+    
     # Методы для работы с файлами
-    def get_disk_info(self):
-        return self._request('GET', BASE_URL)
+    def get_disk_info(self, fields=None):
+        params = {'fields': join_fields(fields)} if fields else None
+        if self.cache is not None:
+            return self._cached_get(BASE_URL, None, params)
+        return self._request('GET', BASE_URL, params=params)
     
-    def upload_file(self, file_path, disk_file_path, overwrite=False):
+    def upload_file(self, file_path, disk_file_path, overwrite=False,
+                    chunk_size=UPLOAD_CHUNK_SIZE, progress=None):
+        """Загрузка файла сырым телом; progress(sent, total, elapsed) — по желанию"""
         # 1. Получаем ссылку для загрузки
+        response = self._upload_href(disk_file_path, overwrite)
+        
+        if response.status_code == 200:
+            href = response.json()['href']
+            # 2. Загружаем файл по полученной ссылке потоком, без multipart
+            return self._put_file(href, file_path, disk_file_path, chunk_size, progress)
+        return response
+    
+    def upload_many(self, pairs, overwrite=False, workers=UPLOAD_WORKERS,
+                    lookahead=UPLOAD_LOOKAHEAD, chunk_size=UPLOAD_CHUNK_SIZE):
+        """Загрузка пар (локальный путь, путь на Диске): ссылки берутся заранее"""
+        return pipelined_upload(
+            lambda disk_path: self._upload_href(disk_path, overwrite),
+            lambda href, file_path, disk_path: self._put_file(href, file_path, disk_path,
+                                                              chunk_size),
+            pairs, lookahead=lookahead, workers=workers)
+    
+    def _upload_href(self, disk_file_path, overwrite=False):
         params = {'path': disk_file_path, 'overwrite': overwrite}
-        response = self._request('GET', FILES_URL, params=params)
+        return self._request('GET', FILES_URL, params=params)
+    
+    def _put_file(self, href, file_path, disk_file_path, chunk_size=UPLOAD_CHUNK_SIZE,
+                  progress=None):
+        with open(file_path, 'rb') as f:
+            body = FileBody(f, chunk_size=chunk_size, progress=progress)
+            return self._put_body(href, body, disk_file_path)
+    
+    def _put_body(self, href, body, disk_file_path):
+        # Без __len__ тело уходит chunked, с ним — с явным Content-Length
+        headers = {'Content-Length': str(len(body))} if hasattr(body, '__len__') else None
+        upload_response = self.transport.request('PUT', href, data=body, headers=headers)
+        self._invalidate(disk_file_path)
+        return upload_response
+    
+    def upload_stream(self, source, disk_file_path, overwrite=False, length=None,
+                      chunk_size=UPLOAD_CHUNK_SIZE, progress=None):
+        """Загрузка из bytes/memoryview, файлового объекта или итератора байтов.
+        
+        Данные не сохраняются на диск: известная длина (буфер, сикаемый файл,
+        итерируемый источник с __len__ или length=...) уходит с Content-Length,
+        иначе — chunked.
+        """
+        response = self._upload_href(disk_file_path, overwrite)
+        
+        if response.status_code == 200:
+            body = make_body(source, length=length, chunk_size=chunk_size, progress=progress)
+            return self._put_body(response.json()['href'], body, disk_file_path)
+        return response
+    
+    def download_file(self, disk_file_path, file_path, segment_size=DOWNLOAD_SEGMENT_SIZE,
+                      workers=DOWNLOAD_WORKERS, resume=True):
+        """Скачивание файла параллельными сегментами с докачкой"""
+        # 1. Получаем ссылку для скачивания
+        params = {'path': disk_file_path}
+        response = self._request('GET', DOWNLOAD_URL, params=params)
         
         if response.status_code == 200:
             href = response.json()['href']
-            # 2. Загружаем файл по полученной ссылке
-            with open(file_path, 'rb') as f:
-                upload_response = requests.put(href, files={'file': f})
-            return upload_response
+            # 2. Качаем по ссылке; ошибки сегментов поднимаются как HTTPError
+            download_ranged(self.transport, href, file_path, segment_size=segment_size,
+                            workers=workers, resume=resume)
         return response
     
     def create_folder(self, path):
         params = {'path': path}
-        return self._request('PUT', RESOURCES_URL, params=params)
+        response = self._request('PUT', RESOURCES_URL, params=params)
+        self._invalidate(path)
+        return response
     
     def delete_resource(self, path, permanently=False):
         params = {'path': path, 'permanently': permanently}
-        return self._request('DELETE', RESOURCES_URL, params=params)
+        response = self._request('DELETE', RESOURCES_URL, params=params)
+        self._invalidate(path)
+        return response
+    
+    def create_folders(self, paths, workers=BULK_WORKERS):
+        """Создание дерева папок: предки раньше потомков, соседи параллельно"""
+        return bulk.create_folders(self.create_folder, paths, workers=workers)
+    
+    def delete_resources(self, paths, permanently=False, workers=BULK_WORKERS):
+        """Параллельное удаление; пути внутри удаляемых папок пропускаются"""
+        return bulk.delete_resources(lambda path: self.delete_resource(path, permanently),
+                                     paths, workers=workers)
+    
+    def copy(self, from_path, path, overwrite=False, force_async=False):
+        """Копирование на стороне Диска: 201 — готово, 202 — асинхронная операция"""
+        return self._transfer(COPY_URL, from_path, path, overwrite, force_async)
     
-    def get_resource_info(self, path):
+    def move(self, from_path, path, overwrite=False, force_async=False):
+        """Перемещение на стороне Диска: 201 — готово, 202 — асинхронная операция"""
+        response = self._transfer(MOVE_URL, from_path, path, overwrite, force_async)
+        self._invalidate(from_path)
+        return response
+    
+    def _transfer(self, url, from_path, path, overwrite, force_async):
+        params = {'from': from_path, 'path': path, 'overwrite': overwrite}
+        if force_async:
+            params['force_async'] = True
+        response = self._request('POST', url, params=params)
+        self._invalidate(path)
+        return response
+    
+    def copy_many(self, pairs, overwrite=False, workers=BULK_WORKERS,
+                  timeout=TRANSFER_TIMEOUT):
+        """Копирование пар (откуда, куда) с ожиданием асинхронных операций"""
+        return bulk.transfer_many(lambda source, path: self.copy(source, path, overwrite),
+                                  self.track_operation, pairs, workers=workers, timeout=timeout)
+    
+    def move_many(self, pairs, overwrite=False, workers=BULK_WORKERS,
+                  timeout=TRANSFER_TIMEOUT):
+        """Перемещение пар (откуда, куда) с ожиданием асинхронных операций"""
+        return bulk.transfer_many(lambda source, path: self.move(source, path, overwrite),
+                                  self.track_operation, pairs, workers=workers, timeout=timeout)
+    
+    def get_resource_info(self, path, fields=None, limit=None):
+        """Метаданные ресурса; fields — проекция на стороне API"""
         params = {'path': path}
+        if fields:
+            params['fields'] = join_fields(fields)
+        if limit is not None:
+            params['limit'] = limit
+        if self.cache is not None:
+            return self._cached_get(RESOURCES_URL, normalize_path(path), params)
         return self._request('GET', RESOURCES_URL, params=params)
     
+    def iter_dir(self, path, fields=None, page_size=PAGE_SIZE, prefetch=True):
+        """Ленивый обход папки по страницам limit/offset с подгрузкой следующей"""
+        params = {'path': path, 'limit': page_size}
+        projection = item_fields(fields)
+        if projection is not None:
+            params['fields'] = projection
+        return iter_pages(
+            lambda offset: self._request('GET', RESOURCES_URL, params=dict(params, offset=offset)),
+            page_size=page_size, prefetch=prefetch)
+    
+    def iter_files(self, fields=None, page_size=FILES_PAGE_SIZE, prefetch=True,
+                   media_type=None):
+        """Плоский список всех файлов Диска (/resources/files) по страницам"""
+        params = {'limit': page_size}
+        projection = item_fields(fields, prefix='')
+        if projection is not None:
+            params['fields'] = projection
+        if media_type:
+            params['media_type'] = media_type
+        return iter_pages(
+            lambda offset: self._request('GET', ALL_FILES_URL, params=dict(params, offset=offset)),
+            page_size=page_size, prefetch=prefetch, extract=lambda data: data.get('items', []))
+    
+    def get_last_uploaded(self, limit=LAST_UPLOADED_LIMIT, fields=None, media_type=None):
+        """Последние загруженные файлы, от новых к старым"""
+        params = {'limit': limit}
+        projection = item_fields(fields, prefix='')
+        if projection is not None:
+            params['fields'] = projection
+        if media_type:
+            params['media_type'] = media_type
+        return self._request('GET', LAST_UPLOADED_URL, params=params)
+    
+    def open_mirror(self, path=':memory:', max_age=MIRROR_MAX_AGE, build=True):
+        """Подключает локальное зеркало метаданных (SQLite) и собирает его"""
+        mirror = MetadataMirror(self, path, max_age=max_age)
+        if build and mirror.built_at is None:
+            mirror.build()
+        self.mirror = mirror
+        return mirror
+    
+    def sync_directory(self, local_dir, disk_dir, index_path=None, delete_orphans=True,
+                       workers=SYNC_WORKERS):
+        """Инкрементальная синхронизация локальной папки в папку на Диске"""
+        return sync.sync_directory(self, local_dir, disk_dir, index_path=index_path,
+                                   delete_orphans=delete_orphans, workers=workers)
+    
     def publish_resource(self, path):
         params = {'path': path}
-        return self._request('PUT', PUBLISH_URL, params=params)
\ No newline at end of file
+        response = self._request('PUT', PUBLISH_URL, params=params)
+        self._invalidate(path, disk_info=False)
+        return response
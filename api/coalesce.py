@@ -0,0 +1,88 @@
+"""
+Склейка одинаковых одновременных запросов (single-flight)
+
+Если несколько потоков (или корутин) одновременно делают один и тот же
+идемпотентный GET, на сервер уходит только первый запрос, остальные ждут
+его и получают тот же ответ. Так всплеск одинаковых get_disk_info /
+get_resource_info при старте задач не съедает лимит запросов.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+def request_key(method, url, params=None):
+    """Ключ запроса: метод, URL и параметры без учёта порядка"""
+    items = tuple(sorted((key, str(value)) for key, value in (params or {}).items()))
+    return method.upper(), url, items
+
+
+class SingleFlight:
+    """Single-flight для потоков.
+
+    Ответ разделяется только между вызовами, пришедшими, пока запрос в полёте;
+    после завершения ключ освобождается и следующий вызов идёт на сервер.
+    Исключение первого вызова получают все ожидающие.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            if self.stats is not None:
+                self.stats.incr('coalesced')
+            return call.result()
+        try:
+            result = func()
+        except BaseException as error:
+            call.set_exception(error)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Single-flight для корутин одного цикла событий.
+
+    Запрос выполняется отдельной задачей: отмена одного из ожидающих не
+    отменяет запрос для остальных.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self._calls = {}
+
+    async def do(self, key, coro_func):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(coro_func())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        elif self.stats is not None:
+            self.stats.incr('coalesced')
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Исключение уже получили ожидающие; не даём asyncio ругаться на него
+            task.exception()
+
+    def in_flight(self):
+        return len(self._calls)
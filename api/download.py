@@ -0,0 +1,134 @@
+"""
+Скачивание файла параллельными Range-сегментами с докачкой
+"""
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Размер одного Range-сегмента (8 MB)
+DOWNLOAD_SEGMENT_SIZE = 8 * 1024 * 1024
+# Сколько сегментов качаем одновременно
+DOWNLOAD_WORKERS = 4
+# Размер куска при записи тела ответа на диск
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Суффикс файла-спутника с прогрессом докачки
+SIDECAR_SUFFIX = '.download'
+
+_CONTENT_RANGE = re.compile(r'bytes\s+\d+-\d+/(\d+)')
+
+
+class DownloadState:
+    """Состояние докачки: какие сегменты уже записаны в файл назначения"""
+
+    def __init__(self, path, size, etag, segment_size, done=None):
+        self.path = path
+        self.size = size
+        self.etag = etag
+        self.segment_size = segment_size
+        self.done = set(done or ())
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, size, etag, segment_size):
+        """Читает спутник; при несовпадении размера/etag начинаем заново"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, size, etag, segment_size)
+        if (data.get('size'), data.get('etag'), data.get('segment_size')) != (size, etag, segment_size):
+            return cls(path, size, etag, segment_size)
+        return cls(path, size, etag, segment_size, data.get('done'))
+
+    def mark_done(self, index):
+        with self._lock:
+            self.done.add(index)
+            self._save()
+
+    def _save(self):
+        # Пишем во временный файл и подменяем, чтобы спутник не бился при обрыве
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'size': self.size, 'etag': self.etag,
+                       'segment_size': self.segment_size,
+                       'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _write_body(response, f):
+    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+        f.write(chunk)
+
+
+def download_ranged(transport, href, local_path, segment_size=DOWNLOAD_SEGMENT_SIZE,
+                    workers=DOWNLOAD_WORKERS, resume=True):
+    """Скачивает href в local_path и возвращает размер файла.
+
+    Пробный запрос Range: bytes=0-0 сразу показывает, поддерживает ли сервер
+    диапазоны и какой у файла размер. Если нет — тело пишется одним потоком.
+    Ошибки сегментов пробрасываются как requests.HTTPError; спутник при этом
+    остаётся на диске, и следующий вызов докачает только недостающее.
+    """
+    probe = transport.request('GET', href, headers={'Range': 'bytes=0-0'}, stream=True)
+    if probe.status_code == 416:
+        # Пустой файл: диапазон 0-0 не существует
+        probe.close()
+        open(local_path, 'wb').close()
+        return 0
+    probe.raise_for_status()
+    match = _CONTENT_RANGE.match(probe.headers.get('Content-Range', ''))
+    if probe.status_code != 206 or not match:
+        # Диапазоны не поддерживаются: пишем весь ответ как есть
+        with open(local_path, 'wb') as f:
+            _write_body(probe, f)
+        probe.close()
+        return os.path.getsize(local_path)
+    probe.close()
+
+    size = int(match.group(1))
+    # После редиректа качаем сегменты сразу с конечного хоста
+    url = probe.url
+    sidecar = local_path + SIDECAR_SUFFIX
+    etag = probe.headers.get('ETag')
+    if resume and os.path.exists(local_path):
+        state = DownloadState.load(sidecar, size, etag, segment_size)
+    else:
+        state = DownloadState(sidecar, size, etag, segment_size)
+
+    # Заранее выделяем файл нужного размера: воркеры пишут каждый в свой диапазон
+    with open(local_path, 'r+b' if state.done else 'wb') as f:
+        f.truncate(size)
+
+    def fetch(index):
+        start = index * segment_size
+        end = min(start + segment_size, size) - 1
+        response = transport.request('GET', url, headers={'Range': f'bytes={start}-{end}'},
+                                     stream=True)
+        try:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise requests.HTTPError(f"Сервер проигнорировал Range для сегмента {index}",
+                                         response=response)
+            with open(local_path, 'r+b') as f:
+                f.seek(start)
+                _write_body(response, f)
+        finally:
+            response.close()
+        state.mark_done(index)
+
+    segments = [i for i in range((size + segment_size - 1) // segment_size)
+                if i not in state.done]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() пробрасывает первое исключение из воркеров
+        list(executor.map(fetch, segments))
+
+    state.remove()
+    return size
@@ -1,4 +1,10 @@
 BASE_URL = "https://cloud-api.yandex.net/v1/disk"
 RESOURCES_URL = f"{BASE_URL}/resources"
 FILES_URL = f"{BASE_URL}/resources/upload"
-PUBLISH_URL = f"{BASE_URL}/resources/publish"
\ No newline at end of file
+PUBLISH_URL = f"{BASE_URL}/resources/publish"
+DOWNLOAD_URL = f"{BASE_URL}/resources/download"
+OPERATIONS_URL = f"{BASE_URL}/operations"
+ALL_FILES_URL = f"{BASE_URL}/resources/files"
+LAST_UPLOADED_URL = f"{BASE_URL}/resources/last-uploaded"
+COPY_URL = f"{BASE_URL}/resources/copy"
+MOVE_URL = f"{BASE_URL}/resources/move"
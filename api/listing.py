@@ -0,0 +1,64 @@
+"""
+Постраничный обход содержимого папки
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+# Сколько элементов запрашиваем за одну страницу
+PAGE_SIZE = 100
+
+
+def item_fields(fields, prefix='_embedded'):
+    """Поля элементов ('name', 'size') -> проекция API ('_embedded.items.name', ...).
+
+    prefix — где лежат items: '_embedded' у папки, '' у плоских списков
+    (/resources/files, /resources/last-uploaded).
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    items = f'{prefix}.items' if prefix else 'items'
+    return ','.join(field if field.startswith(items) or (prefix and field.startswith(prefix))
+                    else f'{items}.{field}' for field in fields)
+
+
+def _embedded_items(data):
+    return data.get('_embedded', {}).get('items', [])
+
+
+def iter_pages(fetch_page, page_size=PAGE_SIZE, prefetch=True, extract=_embedded_items):
+    """Отдаёт элементы страница за страницей.
+
+    fetch_page(offset) возвращает ответ API. Пока вызывающий обходит
+    текущую страницу, следующая уже грузится в фоне, поэтому в памяти
+    одновременно не больше двух страниц. Конец — страница короче page_size.
+    extract(data) достаёт элементы из JSON страницы (по умолчанию _embedded.items).
+    """
+    def load(offset):
+        response = fetch_page(offset)
+        response.raise_for_status()
+        return extract(response.json())
+
+    if not prefetch:
+        offset = 0
+        while True:
+            items = load(offset)
+            yield from items
+            if len(items) < page_size:
+                return
+            offset += page_size
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(load, 0)
+        offset = 0
+        while pending is not None:
+            items = pending.result()
+            offset += page_size
+            pending = executor.submit(load, offset) if len(items) == page_size else None
+            try:
+                yield from items
+            except GeneratorExit:
+                if pending is not None:
+                    pending.cancel()
+                raise
+            del items
@@ -0,0 +1,198 @@
+"""
+Метрики запросов: события по фазам, гистограммы и экспорт (Prometheus/JSON)
+"""
+import bisect
+import json
+import threading
+from urllib.parse import urlsplit
+
+from api import endpoints
+
+# Границы корзин гистограмм (секунды), как у prometheus_client по умолчанию
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75,
+                   1.0, 2.5, 5.0, 7.5, 10.0)
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'transfer')
+
+# Путь каждого шаблона из api/endpoints.py -> имя константы
+_ENDPOINT_PATHS = sorted(
+    ((urlsplit(value).path, name) for name, value in vars(endpoints).items()
+     if name.endswith('_URL') and isinstance(value, str)),
+    key=lambda item: len(item[0]), reverse=True)
+
+
+def endpoint_template(method, url):
+    """Имя шаблона из api/endpoints.py ('RESOURCES_URL') для URL запроса.
+
+    Хост не важен, поэтому локальный стенд классифицируется так же.
+    Ссылки загрузки и скачивания — UPLOAD_HREF / DOWNLOAD_HREF.
+    """
+    path = urlsplit(url).path.rstrip('/')
+    for template_path, name in _ENDPOINT_PATHS:
+        if path == template_path or (name == 'OPERATIONS_URL'
+                                     and path.startswith(template_path + '/')):
+            return name
+    return 'UPLOAD_HREF' if method.upper() == 'PUT' else 'DOWNLOAD_HREF'
+
+
+class RequestEvent:
+    """Один выполненный запрос; фазы в секундах, None — фазы не было.
+
+    dns/connect/tls есть только у запросов, открывших новое соединение.
+    bytes_sent=None — размер тела неизвестен (например, файловый объект без длины).
+    """
+
+    __slots__ = ('method', 'url', 'endpoint', 'status', 'error', 'duration', 'dns',
+                 'connect', 'tls', 'ttfb', 'transfer', 'bytes_sent', 'bytes_received')
+
+    def __init__(self, method, url, endpoint, status=None, error=None, duration=0.0,
+                 dns=None, connect=None, tls=None, ttfb=None, transfer=None, bytes_sent=0,
+                 bytes_received=0):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.status = status
+        self.error = error
+        self.duration = duration
+        self.dns = dns
+        self.connect = connect
+        self.tls = tls
+        self.ttfb = ttfb
+        self.transfer = transfer
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def percentile(samples, fraction):
+    """Перцентиль непустой выборки методом ближайшего ранга"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples):
+    """p50/p95/p99 выборки задержек (секунды) в миллисекундах"""
+    return {f'p{int(q * 100)}_ms': round(percentile(samples, q) * 1000, 3)
+            for q in (0.50, 0.95, 0.99)}
+
+
+class Histogram:
+    """Кумулятивная гистограмма в стиле Prometheus"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """[(граница, число наблюдений <= границы), ..., ('+Inf', всего)]"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels.items())
+
+
+class MetricsCollector:
+    """Хук для Transport: копит гистограммы длительностей и фаз, счётчики.
+
+        metrics = MetricsCollector()
+        client = YandexDiskAPI(token, metrics=metrics)
+        print(metrics.to_prometheus())
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix='yadisk'):
+        self.buckets = buckets
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._phases = {}
+        self._requests = {}
+        self._bytes = {}
+
+    def __call__(self, event):
+        with self._lock:
+            key = (event.endpoint, event.method)
+            self._histogram(self._durations, key).observe(event.duration)
+            for phase in PHASES:
+                value = getattr(event, phase)
+                if value is not None:
+                    self._histogram(self._phases, (event.endpoint, phase)).observe(value)
+            status = event.status if event.status is not None else 'error'
+            counter = (event.endpoint, event.method, str(status))
+            self._requests[counter] = self._requests.get(counter, 0) + 1
+            for direction, value in (('sent', event.bytes_sent), ('received', event.bytes_received)):
+                if value is None:
+                    continue
+                self._bytes[(event.endpoint, direction)] = \
+                    self._bytes.get((event.endpoint, direction), 0) + value
+
+    def _histogram(self, table, key):
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets)
+        return histogram
+
+    def to_json(self):
+        """Снимок метрик как словарь (json.dumps-совместимый)"""
+        with self._lock:
+            def dump(histogram):
+                return {'count': histogram.count, 'sum': histogram.sum,
+                        'buckets': {str(bound): count for bound, count in histogram.cumulative()}}
+
+            return {
+                'durations': [dict(endpoint=e, method=m, **dump(h))
+                              for (e, m), h in sorted(self._durations.items())],
+                'phases': [dict(endpoint=e, phase=p, **dump(h))
+                           for (e, p), h in sorted(self._phases.items())],
+                'requests': [{'endpoint': e, 'method': m, 'status': s, 'count': c}
+                             for (e, m, s), c in sorted(self._requests.items())],
+                'bytes': [{'endpoint': e, 'direction': d, 'total': v}
+                          for (e, d), v in sorted(self._bytes.items())],
+            }
+
+    def to_json_text(self):
+        return json.dumps(self.to_json(), indent=2)
+
+    def to_prometheus(self):
+        """Текстовый формат экспозиции Prometheus"""
+        prefix = self.prefix
+        lines = []
+        with self._lock:
+            def histogram_lines(name, table, label_names):
+                lines.append(f'# TYPE {name} histogram')
+                for key, histogram in sorted(table.items()):
+                    labels = dict(zip(label_names, key))
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{_labels(**labels, le=bound)}}} {count}')
+                    lines.append(f'{name}_sum{{{_labels(**labels)}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{_labels(**labels)}}} {histogram.count}')
+
+            histogram_lines(f'{prefix}_request_duration_seconds', self._durations,
+                            ('endpoint', 'method'))
+            histogram_lines(f'{prefix}_request_phase_seconds', self._phases,
+                            ('endpoint', 'phase'))
+            lines.append(f'# TYPE {prefix}_requests_total counter')
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                labels = _labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f'{prefix}_requests_total{{{labels}}} {count}')
+            lines.append(f'# TYPE {prefix}_request_bytes_total counter')
+            for (endpoint, direction), total in sorted(self._bytes.items()):
+                labels = _labels(endpoint=endpoint, direction=direction)
+                lines.append(f'{prefix}_request_bytes_total{{{labels}}} {total}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,278 @@
+"""
+Локальное зеркало метаданных Диска в SQLite
+
+    mirror = client.open_mirror('disk_meta.sqlite', max_age=60)
+    mirror.exists('photos/cat.jpg'), mirror.md5('photos/cat.jpg'), mirror.size('photos')
+
+Полная сборка — один проход по плоскому списку /resources/files; обновление —
+по /resources/last-uploaded, только то, что изменилось с прошлого раза.
+Ответы на вопросы "есть ли путь", "какой md5", "сколько весит папка" идут из
+индекса без запросов к API. Границы устаревания у них две:
+
+  * max_age — для новых загрузок: если зеркало обновлялось давнее max_age
+    секунд назад, перед ответом оно дочитывает последние загруженные;
+  * rebuild_interval — для удалений, перемещений и копирований чужими
+    клиентами: last-uploaded их не показывает, они видны только после
+    полной сборки.
+
+Точечным вопросам (info/exists/md5) можно передать verify=True: если
+последняя полная сборка старше max_age, положительный ответ сверяется с API,
+и удалённый чужим клиентом путь не выдаётся за существующий.
+"""
+import sqlite3
+import threading
+import time
+
+from api.paths import ancestors, normalize_path, parent_path
+
+# Насколько устаревшим (сек) по новым загрузкам зеркало может отвечать без обновления
+MIRROR_MAX_AGE = 60.0
+# Раз в сколько секунд обновление делается полной сборкой: удаления чужими
+# клиентами видны только в ней
+MIRROR_REBUILD_INTERVAL = 3600.0
+FILES_PAGE_SIZE = 1000
+LAST_UPLOADED_LIMIT = 100
+# Поля файлов, которые хранит зеркало
+MIRROR_FIELDS = ('path', 'type', 'size', 'md5', 'sha256', 'modified')
+
+
+class MetadataMirror:
+    """SQLite-индекс удалённого дерева с индексами по пути, родителю и md5.
+
+    Папки выводятся из путей файлов, поэтому пустые папки в зеркало не
+    попадают. Свои изменения клиент сообщает через invalidate(): затронутые
+    пути считаются неизвестными, и точечные вопросы о них уходят в API, пока
+    следующая полная сборка не подтвердит состояние.
+    """
+
+    def __init__(self, client, path=':memory:', max_age=MIRROR_MAX_AGE,
+                 rebuild_interval=MIRROR_REBUILD_INTERVAL, page_size=FILES_PAGE_SIZE,
+                 recent_limit=LAST_UPLOADED_LIMIT):
+        self.client = client
+        self.path = path
+        self.max_age = max_age
+        self.rebuild_interval = rebuild_interval
+        self.page_size = page_size
+        self.recent_limit = recent_limit
+        # Пути, изменённые этим клиентом после последней полной сборки, и все
+        # их предки, включая корень '' (для проверки "внутри менялось")
+        self._unknown = set()
+        self._unknown_ancestors = set()
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            'CREATE TABLE IF NOT EXISTS resources ('
+            'path TEXT PRIMARY KEY, parent TEXT, type TEXT, size INTEGER, '
+            'md5 TEXT, sha256 TEXT, modified TEXT);'
+            'CREATE INDEX IF NOT EXISTS resources_parent ON resources (parent);'
+            'CREATE INDEX IF NOT EXISTS resources_md5 ON resources (md5);'
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);')
+        self._db.commit()
+        self.built_at = self._meta('built_at')
+        self.refreshed_at = self._meta('refreshed_at')
+        self.watermark = self._meta('watermark')
+
+    # --- Сборка и обновление
+
+    def _meta(self, key):
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _save_meta(self):
+        self._db.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                             [('built_at', self.built_at), ('refreshed_at', self.refreshed_at),
+                              ('watermark', self.watermark)])
+
+    def _upsert(self, items):
+        """Пишет файлы и их папки-предки; возвращает наибольший modified"""
+        newest = None
+        files = []
+        folders = set()
+        for item in items:
+            path = normalize_path(item['path'])
+            modified = item.get('modified')
+            files.append((path, parent_path(path), item.get('type', 'file'), item.get('size'),
+                          item.get('md5'), item.get('sha256'), modified))
+            folders.update(ancestors(path))
+            newest = _latest(newest, modified)
+        self._db.executemany('INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             files)
+        self._db.executemany("INSERT OR IGNORE INTO resources (path, parent, type) "
+                             "VALUES (?, ?, 'dir')",
+                             [(folder, parent_path(folder)) for folder in folders])
+        return newest
+
+    def build(self):
+        """Полная сборка по /resources/files; возвращает число файлов"""
+        started = time.time()
+        count = 0
+        newest = None
+        with self._lock:
+            with self._db:
+                self._db.execute('DELETE FROM resources')
+                self._db.execute("INSERT INTO resources (path, parent, type) VALUES ('', NULL, 'dir')")
+                page = []
+                for item in self.client.iter_files(fields=MIRROR_FIELDS,
+                                                   page_size=self.page_size):
+                    page.append(item)
+                    if len(page) == self.page_size:
+                        newest = _latest(newest, self._upsert(page))
+                        count += len(page)
+                        page = []
+                newest = _latest(newest, self._upsert(page))
+                count += len(page)
+                self.built_at = self.refreshed_at = started
+                self.watermark = newest
+                self._unknown.clear()
+                self._unknown_ancestors.clear()
+                self._save_meta()
+        return count
+
+    def refresh(self):
+        """Инкрементальное обновление по последним загруженным.
+
+        Если все полученные файлы новее отметки, окно могло переполниться —
+        тогда, как и по истечении rebuild_interval, делается полная сборка.
+        Возвращает число обновлённых файлов.
+        """
+        started = time.time()
+        with self._lock:
+            if self.built_at is None or started - self.built_at > self.rebuild_interval:
+                return self.build()
+            response = self.client.get_last_uploaded(limit=self.recent_limit,
+                                                     fields=MIRROR_FIELDS)
+            response.raise_for_status()
+            items = response.json().get('items', [])
+            changed = [item for item in items
+                       if self.watermark is None or item.get('modified', '') >= self.watermark]
+            if items and len(changed) == len(items) and len(items) >= self.recent_limit:
+                return self.build()
+            with self._db:
+                self.watermark = _latest(self.watermark, self._upsert(changed))
+                self.refreshed_at = started
+                self._save_meta()
+            return len(changed)
+
+    def age(self):
+        """Сколько секунд прошло с последнего обновления (inf — не собиралось)"""
+        if self.refreshed_at is None:
+            return float('inf')
+        return time.time() - self.refreshed_at
+
+    def ensure_fresh(self, max_age=None):
+        """Обновляет зеркало, если оно старше max_age (по умолчанию self.max_age)"""
+        max_age = self.max_age if max_age is None else max_age
+        if self.age() > max_age:
+            self.refresh()
+
+    def invalidate(self, path):
+        """Клиент изменил path: вопросы о нём и его содержимом идут в API"""
+        path = normalize_path(path)
+        with self._lock:
+            self._unknown.add(path)
+            if path:
+                self._unknown_ancestors.update(('', *ancestors(path)))
+
+    # --- Вопросы к зеркалу
+
+    def _is_unknown(self, path):
+        """Менялся ли сам path, его предок или что-то внутри него"""
+        if not self._unknown:
+            return False
+        if path in self._unknown_ancestors:
+            return True
+        return not self._unknown.isdisjoint((path, '', *ancestors(path)))
+
+    def _live(self, path):
+        """Метаданные пути из API с обновлением зеркала; None — пути нет"""
+        response = self.client.get_resource_info(path, fields=MIRROR_FIELDS, limit=0)
+        with self._lock, self._db:
+            if response.status_code == 404:
+                self._db.execute("DELETE FROM resources WHERE path = ? "
+                                 "OR (path >= ? AND path < ?)", (path, *_subtree_range(path)))
+                return None
+            response.raise_for_status()
+            self._upsert([response.json()])
+        return self._row(path)
+
+    def _row(self, path):
+        row = self._db.execute('SELECT path, type, size, md5, sha256, modified '
+                               'FROM resources WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('path', 'type', 'size', 'md5', 'sha256', 'modified'), row))
+
+    def info(self, path, max_age=None, verify=False):
+        """Запись о ресурсе (path, type, size, md5, sha256, modified) или None.
+
+        verify=True — найденная запись сверяется с API, если полная сборка
+        (единственный источник удалений) старше max_age.
+        """
+        path = normalize_path(path)
+        max_age = self.max_age if max_age is None else max_age
+        self.ensure_fresh(max_age)
+        with self._lock:
+            if self._is_unknown(path):
+                return self._live(path)
+            row = self._row(path)
+            if verify and row is not None and time.time() - self.built_at > max_age:
+                return self._live(path)
+            return row
+
+    def exists(self, path, max_age=None, verify=False):
+        return self.info(path, max_age, verify) is not None
+
+    def md5(self, path, max_age=None, verify=False):
+        info = self.info(path, max_age, verify)
+        return info['md5'] if info is not None else None
+
+    def size(self, path='', max_age=None):
+        """Размер файла или суммарный размер файлов папки со всеми вложенными.
+
+        Чужие удаления учитываются не позже rebuild_interval (см. модуль).
+        """
+        path = normalize_path(path)
+        self.ensure_fresh(max_age)
+        with self._lock:
+            if self._is_unknown(path):
+                # Поддерево менялось локально: пересобираем, чтобы сумма была честной
+                self.build()
+            row = self._db.execute('SELECT type, size FROM resources WHERE path = ?',
+                                   (path,)).fetchone()
+            if row is None:
+                return None
+            if row[0] == 'file':
+                return row[1]
+            if not path:
+                query, args = "SELECT SUM(size) FROM resources WHERE type = 'file'", ()
+            else:
+                query = "SELECT SUM(size) FROM resources WHERE type = 'file' AND path >= ? AND path < ?"
+                args = _subtree_range(path)
+            return self._db.execute(query, args).fetchone()[0] or 0
+
+    def find_by_md5(self, md5, max_age=None):
+        """Пути файлов с данным md5 (поиск дубликатов перед загрузкой)"""
+        self.ensure_fresh(max_age)
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                'SELECT path FROM resources WHERE md5 = ? ORDER BY path', (md5,))]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM resources WHERE type = 'file'").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _latest(first, second):
+    """Более поздняя из двух ISO-отметок modified (None — нет отметки)"""
+    if first is None or (second is not None and second > first):
+        return second
+    return first
+
+
+def _subtree_range(path):
+    """Границы путей внутри папки для поиска по индексу: ['a/', 'a0')"""
+    return path + '/', path + chr(ord('/') + 1)
@@ -0,0 +1,116 @@
+"""
+Лёгкие модели ответов API на __slots__ с ленивым разбором JSON
+"""
+
+
+def _field(name, doc=None):
+    return property(lambda self: self.data.get(name), doc=doc)
+
+
+def join_fields(fields):
+    """['name', 'size'] -> 'name,size' для параметра fields"""
+    if fields is None or isinstance(fields, str):
+        return fields
+    return ','.join(fields)
+
+
+def query_params(params):
+    """bool в query как в документации API ('true'/'false'); общий вид для
+    синхронного клиента (requests прислал бы 'True') и aiohttp (bool не берёт)"""
+    if not params:
+        return params
+    return {key: str(value).lower() if isinstance(value, bool) else value
+            for key, value in params.items()}
+
+
+class Model:
+    """Обёртка над JSON ответа.
+
+    Тело разбирается при первом обращении к полю, а поля читаются прямо из
+    словаря, без копирования в атрибуты. Если запрос шёл с fields=...,
+    отсутствующие поля возвращают None.
+    """
+
+    __slots__ = ('_response', '_data')
+
+    def __init__(self, data=None, response=None):
+        self._data = data
+        self._response = response
+
+    @classmethod
+    def from_response(cls, response):
+        """Модель по ответу 200; для других статусов None"""
+        if response is None or response.status_code != 200:
+            return None
+        return cls(response=response)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self._response.json() if self._response is not None else {}
+            self._response = None
+        return self._data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.data!r})'
+
+
+class Link(Model):
+    """Ссылка (upload/download href, операция, созданный ресурс)"""
+
+    __slots__ = ()
+
+    href = _field('href')
+    method = _field('method')
+    templated = _field('templated')
+
+
+class DiskInfo(Model):
+    """Информация о диске"""
+
+    __slots__ = ()
+
+    total_space = _field('total_space')
+    used_space = _field('used_space')
+    trash_size = _field('trash_size')
+    system_folders = _field('system_folders')
+
+    @property
+    def free_space(self):
+        if self.total_space is None or self.used_space is None:
+            return None
+        return self.total_space - self.used_space
+
+
+class Resource(Model):
+    """Файл или папка; items лениво оборачивает _embedded.items"""
+
+    __slots__ = ()
+
+    path = _field('path')
+    name = _field('name')
+    type = _field('type')
+    size = _field('size')
+    md5 = _field('md5')
+    sha256 = _field('sha256')
+    created = _field('created')
+    modified = _field('modified')
+    mime_type = _field('mime_type')
+    public_url = _field('public_url')
+
+    @property
+    def is_dir(self):
+        return self.type == 'dir'
+
+    @property
+    def total(self):
+        """Сколько всего элементов в папке (а не на этой странице)"""
+        return self.data.get('_embedded', {}).get('total')
+
+    @property
+    def items(self):
+        for item in self.data.get('_embedded', {}).get('items', ()):
+            yield Resource(item)
@@ -0,0 +1,159 @@
+"""
+Отслеживание асинхронных операций Диска (ответы 202 со ссылкой на статус)
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Первая пауза перед опросом статуса и её верхняя граница (секунды)
+POLL_INTERVAL = 0.5
+MAX_POLL_INTERVAL = 10.0
+# Во сколько раз растёт пауза после каждого ответа "in-progress"
+POLL_BACKOFF = 2.0
+# Доля случайного разброса паузы, чтобы опросы не шли синхронной волной
+POLL_JITTER = 0.2
+# Сколько статусов опрашиваем одновременно за один проход планировщика
+POLL_CONCURRENCY = 8
+# После стольких сбоев опроса подряд (сеть, 5xx, 429) операция считается неудачной
+POLL_MAX_ERRORS = 10
+
+OPERATION_SUCCESS = 'success'
+OPERATION_FAILED = 'failed'
+
+
+class _Operation:
+    __slots__ = ('href', 'future', 'next_poll', 'interval', 'errors')
+
+    def __init__(self, href, future, next_poll, interval):
+        self.href = href
+        self.future = future
+        self.next_poll = next_poll
+        self.interval = interval
+        self.errors = 0
+
+
+class OperationTracker:
+    """Один планировщик на все операции клиента.
+
+    track() возвращает concurrent.futures.Future, которое завершается
+    строкой 'success' или 'failed'. Фоновый поток раз за проход собирает
+    все операции, которым пора опроситься, и проверяет их пачкой через
+    небольшой пул, так что сотни операций не означают сотни циклов опроса.
+    Ответ 4xx на опрос (кроме 429) — ссылка устарела или недоступна — и
+    max_errors сбоев опроса подряд завершают операцию как 'failed'.
+    """
+
+    def __init__(self, request, poll_interval=POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL,
+                 backoff=POLL_BACKOFF, jitter=POLL_JITTER, concurrency=POLL_CONCURRENCY,
+                 max_errors=POLL_MAX_ERRORS):
+        self._request = request
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_errors = max_errors
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._operations = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def _delay(self, interval):
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def track(self, response):
+        """Future операции по ответу API (или по готовой ссылке на статус)"""
+        future = Future()
+        if isinstance(response, str):
+            href = response
+        elif response.status_code == 202:
+            href = response.json()['href']
+        else:
+            # Операция уже выполнилась синхронно (или не началась)
+            future.set_result(OPERATION_SUCCESS if response.status_code < 300 else OPERATION_FAILED)
+            return future
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("OperationTracker закрыт")
+            if href in self._operations:
+                return self._operations[href].future
+            self._operations[href] = _Operation(
+                href, future, time.monotonic() + self._delay(self.poll_interval), self.poll_interval)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='disk-operations',
+                                                daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def wait_async(self, response):
+        """То же, что track(), но в виде awaitable для asyncio"""
+        return asyncio.wrap_future(self.track(response))
+
+    @property
+    def pending(self):
+        with self._condition:
+            return len(self._operations)
+
+    def _poll(self, operation):
+        """Статус операции; None — сбой опроса, который стоит повторить"""
+        try:
+            response = self._request('GET', operation.href)
+        except Exception:
+            return None
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            return OPERATION_FAILED
+        if response.status_code != 200:
+            return None
+        return response.json().get('status')
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    now = time.monotonic()
+                    due = [op for op in self._operations.values() if op.next_poll <= now]
+                    if due:
+                        break
+                    timeout = min((op.next_poll for op in self._operations.values()), default=None)
+                    self._condition.wait(None if timeout is None else timeout - now)
+                if self._closed:
+                    return
+
+            statuses = list(self._executor.map(self._poll, due))
+
+            with self._condition:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for operation, status in zip(due, statuses):
+                    if status is None:
+                        operation.errors += 1
+                        if operation.errors >= self.max_errors:
+                            status = OPERATION_FAILED
+                    else:
+                        operation.errors = 0
+                    if status in (OPERATION_SUCCESS, OPERATION_FAILED):
+                        del self._operations[operation.href]
+                        operation.future.set_result(status)
+                    else:
+                        # in-progress или сбой опроса: опросим позже
+                        operation.interval = min(operation.interval * self.backoff,
+                                                 self.max_interval)
+                        operation.next_poll = now + self._delay(operation.interval)
+
+    def close(self):
+        """Останавливает планировщик; незавершённые future отменяются"""
+        with self._condition:
+            self._closed = True
+            operations = list(self._operations.values())
+            self._operations.clear()
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=False)
+        for operation in operations:
+            operation.future.cancel()
@@ -0,0 +1,27 @@
+"""
+Работа с путями на Диске: нормализация и отношения родитель/потомок
+"""
+DISK_PREFIX = 'disk:'
+
+
+def normalize_path(path):
+    """'disk:/a/b/' и '/a/b' приводим к виду 'a/b'"""
+    if path.startswith(DISK_PREFIX):
+        path = path[len(DISK_PREFIX):]
+    return path.strip('/')
+
+
+def parent_path(path):
+    """Родитель нормализованного пути; у папки верхнего уровня это ''"""
+    return path.rpartition('/')[0]
+
+
+def ancestors(path):
+    """Все предки пути сверху вниз, без самого пути"""
+    parts = path.split('/')
+    return ['/'.join(parts[:i]) for i in range(1, len(parts))]
+
+
+def is_under(path, root):
+    """Совпадает ли path с root или лежит внутри него"""
+    return path == root or path.startswith(root + '/')
@@ -0,0 +1,328 @@
+"""
+Борьба с хвостами задержек: хеджирование GET и предохранитель по эндпоинтам
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+import requests
+
+from api.metrics import percentile
+
+# Окно последних замеров, по которому считается порог хеджирования
+HEDGE_WINDOW = 200
+HEDGE_PERCENTILE = 0.95
+# Пока замеров меньше, порог — HEDGE_DEFAULT_DELAY
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05
+HEDGE_DEFAULT_DELAY = 1.0
+HEDGE_WORKERS = 32
+
+# Сколько сбоев подряд открывают предохранитель и сколько секунд он открыт
+BREAKER_FAILURES = 5
+BREAKER_RECOVERY = 30.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.RequestException):
+    """Предохранитель эндпоинта открыт: запрос не отправлялся"""
+
+    def __init__(self, endpoint, retry_after):
+        super().__init__(f"Предохранитель {endpoint} открыт, повтор через {retry_after:.1f} с")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class HedgePolicy:
+    """Хеджирование идемпотентных GET.
+
+    Если первая попытка не ответила за порог (перцентиль недавних задержек
+    этого эндпоинта), отправляется вторая копия; берётся ответ, пришедший
+    первым, проигравший закрывается. Попытки идут в собственном пуле потоков,
+    поэтому вызывающий поток не зависает на застрявшем запросе дольше
+    порога + времени второй попытки. admit() перед второй копией решает,
+    можно ли её отправить (клиент тратит на неё токен лимитера); если нет,
+    ждём первую попытку.
+
+    Попытка никогда не ждёт в очереди пула: время в очереди засчиталось бы
+    в порог и порождало лишние копии. Если свободных потоков нет, запрос
+    выполняется в вызывающем потоке без хеджирования (stats['hedge_bypassed']),
+    а вторая копия не отправляется — так пул не ограничивает параллельность
+    клиента.
+    """
+
+    def __init__(self, percentile=HEDGE_PERCENTILE, window=HEDGE_WINDOW,
+                 min_samples=HEDGE_MIN_SAMPLES, min_delay=HEDGE_MIN_DELAY,
+                 default_delay=HEDGE_DEFAULT_DELAY, workers=HEDGE_WORKERS, stats=None):
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.workers = workers
+        self.stats = stats
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        # Попыток в пуле сейчас; не больше workers, чтобы очереди не было
+        self._busy = 0
+
+    def delay(self, endpoint):
+        """Через сколько секунд без ответа отправлять вторую копию"""
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None or len(samples) < self.min_samples:
+                return self.default_delay
+            return max(self.min_delay, percentile(samples, self.percentile))
+
+    def observe(self, endpoint, elapsed):
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(elapsed)
+
+    def _incr(self, name):
+        if self.stats is not None:
+            self.stats.incr(name)
+
+    def _reserve(self):
+        """Занимает свободный поток пула; False — свободных нет"""
+        with self._lock:
+            if self._busy >= self.workers:
+                return False
+            self._busy += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._busy -= 1
+
+    def _submit(self, send):
+        """Попытка в потоке, занятом _reserve()"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='hedge')
+            executor = self._executor
+        return executor.submit(self._timed, send)
+
+    def _timed(self, send):
+        try:
+            return _timed_inline(send)
+        finally:
+            self._release()
+
+    def run(self, endpoint, send, admit=None):
+        """send() в пуле с хеджированием; возвращает первый успешный ответ"""
+        if not self._reserve():
+            self._incr('hedge_bypassed')
+            response, elapsed = _timed_inline(send)
+            self.observe(endpoint, elapsed)
+            return response
+        primary = self._submit(send)
+        try:
+            response, elapsed = primary.result(timeout=self.delay(endpoint))
+        except FuturesTimeout:
+            pass
+        else:
+            self.observe(endpoint, elapsed)
+            return response
+
+        reserved = self._reserve()
+        if reserved and admit is not None and not admit():
+            self._release()
+            reserved = False
+        if not reserved:
+            self._incr('hedge_skipped')
+            response, elapsed = primary.result()
+            self.observe(endpoint, elapsed)
+            return response
+        backup = self._submit(send)
+        self._incr('hedged')
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                response, elapsed = future.result()
+                self.observe(endpoint, elapsed)
+                if future is backup:
+                    self._incr('hedge_won')
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                return response
+        raise error
+
+    async def run_async(self, endpoint, send, admit=None):
+        """Вариант run для корутинной функции send; проигравшая попытка отменяется"""
+        async def timed():
+            started = time.perf_counter()
+            return await send(), time.perf_counter() - started
+
+        primary = asyncio.ensure_future(timed())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay(endpoint))
+            if not done:
+                if admit is None or admit():
+                    self._incr('hedged')
+                    tasks.add(asyncio.ensure_future(timed()))
+                else:
+                    self._incr('hedge_skipped')
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    response, elapsed = task.result()
+                    self.observe(endpoint, elapsed)
+                    if task is not primary:
+                        self._incr('hedge_won')
+                    return response
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def _timed_inline(send):
+    started = time.perf_counter()
+    return send(), time.perf_counter() - started
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result()[0].close()
+
+
+class _Circuit:
+    __slots__ = ('state', 'failures', 'opened_at', 'trials', 'admitted_at')
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trials = 0
+        # Когда пропущен последний пробный запрос
+        self.admitted_at = 0.0
+
+
+class CircuitBreaker:
+    """Предохранитель на каждый эндпоинт (шаблон из api/endpoints.py).
+
+    После failures сбоев подряд (сетевая ошибка или 5xx) эндпоинт открывается
+    на recovery секунд: запросы к нему сразу падают с CircuitOpenError, а не
+    копят заблокированные потоки. Затем пропускается half_open_max пробных
+    запросов: успех закрывает предохранитель, сбой открывает снова. Проба,
+    завершившаяся без ответа и без сетевой ошибки (отмена, чужое исключение),
+    освобождает свой слот; если проба потерялась совсем, через recovery
+    секунд пропускается новая. Один объект можно разделить между клиентами.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, recovery=BREAKER_RECOVERY,
+                 half_open_max=1, errors=(requests.RequestException,)):
+        self.failures = failures
+        self.recovery = recovery
+        self.half_open_max = half_open_max
+        self.errors = tuple(errors)
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def state(self, endpoint):
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None:
+                return CLOSED
+            if circuit.state == OPEN and time.monotonic() - circuit.opened_at >= self.recovery:
+                return HALF_OPEN
+            return circuit.state
+
+    def before(self, endpoint):
+        """Разрешение на запрос; при открытом предохранителе — CircuitOpenError.
+
+        Возвращает True, если запрос пропущен как пробный.
+        """
+        with self._lock:
+            circuit = self._circuits.setdefault(endpoint, _Circuit())
+            if circuit.state == CLOSED:
+                return False
+            now = time.monotonic()
+            waited = now - circuit.opened_at
+            if circuit.state == OPEN and waited >= self.recovery:
+                circuit.state = HALF_OPEN
+                circuit.trials = 0
+            elif circuit.state == HALF_OPEN and now - circuit.admitted_at >= self.recovery:
+                # Пробы так и не отчитались: пропускаем новые
+                circuit.trials = 0
+            if circuit.state == HALF_OPEN and circuit.trials < self.half_open_max:
+                circuit.trials += 1
+                circuit.admitted_at = now
+                return True
+            raise CircuitOpenError(endpoint, max(0.0, self.recovery - waited))
+
+    def release(self, endpoint):
+        """Пробный запрос завершился без вердикта: его слот снова свободен"""
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is not None and circuit.state == HALF_OPEN and circuit.trials:
+                circuit.trials -= 1
+
+    def record(self, endpoint, success):
+        with self._lock:
+            circuit = self._circuits.setdefault(endpoint, _Circuit())
+            if success:
+                circuit.state = CLOSED
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failures:
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+
+    def call(self, endpoint, send):
+        trial = self.before(endpoint)
+        try:
+            response = send()
+        except self.errors:
+            self.record(endpoint, False)
+            raise
+        except BaseException:
+            if trial:
+                self.release(endpoint)
+            raise
+        self.record(endpoint, response.status_code < 500)
+        return response
+
+    async def call_async(self, endpoint, send, errors=()):
+        """Вариант call для корутинной функции; errors — исключения aiohttp"""
+        trial = self.before(endpoint)
+        try:
+            response = await send()
+        except self.errors + tuple(errors):
+            self.record(endpoint, False)
+            raise
+        except BaseException:
+            # В том числе отмена (asyncio.wait_for, таймаут вызывающего)
+            if trial:
+                self.release(endpoint)
+            raise
+        self.record(endpoint, response.status_code < 500)
+        return response
@@ -0,0 +1,233 @@
+"""
+Инкрементальная синхронизация локальной папки с папкой на Диске
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from api.paths import normalize_path
+
+# Имя индекса по умолчанию (лежит в синхронизируемой папке и не загружается)
+INDEX_NAME = '.disk_sync.sqlite'
+# Сколько файлов хэшируем и загружаем одновременно
+SYNC_WORKERS = 4
+HASH_CHUNK_SIZE = 1024 * 1024
+# Новые хэши пишутся в индекс пачками: одна транзакция на столько файлов
+INDEX_BATCH_SIZE = 500
+# Поля, которые нужны от удалённого листинга
+REMOTE_FIELDS = ('name', 'path', 'type', 'md5', 'size')
+
+
+def file_hashes(path):
+    """md5 и sha256 файла за один проход"""
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb') as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            md5.update(view[:size])
+            sha256.update(view[:size])
+    return md5.hexdigest(), sha256.hexdigest()
+
+
+class SyncIndex:
+    """Локальный SQLite-индекс: размер, mtime и хэши уже посчитанных файлов.
+
+    Если размер и mtime файла не изменились, хэш берётся из индекса и файл
+    заново не читается. Новые хэши копятся в памяти и записываются одной
+    транзакцией на batch_size файлов, остаток — в flush() или close().
+    """
+
+    def __init__(self, path, batch_size=INDEX_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS files ('
+                         'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+                         'md5 TEXT, sha256 TEXT)')
+        self._db.commit()
+
+    def hashes(self, rel_path, full_path):
+        """(md5, sha256) файла: из индекса или посчитанные заново"""
+        stat = os.stat(full_path)
+        with self._lock:
+            row = self._db.execute('SELECT size, mtime_ns, md5, sha256 FROM files WHERE path = ?',
+                                   (rel_path,)).fetchone()
+        if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            return row[2], row[3]
+        md5, sha256 = file_hashes(full_path)
+        with self._lock:
+            self._pending[rel_path] = (rel_path, stat.st_size, stat.st_mtime_ns, md5, sha256)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+        return md5, sha256
+
+    def _flush(self):
+        if self._pending:
+            self._db.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)',
+                                 self._pending.values())
+            self._db.commit()
+            self._pending.clear()
+
+    def flush(self):
+        """Записывает накопленные хэши одной транзакцией"""
+        with self._lock:
+            self._flush()
+
+    def forget(self, rel_paths):
+        """Убирает из индекса файлы, которых больше нет локально"""
+        with self._lock:
+            for rel_path in rel_paths:
+                self._pending.pop(rel_path, None)
+            self._db.executemany('DELETE FROM files WHERE path = ?', [(p,) for p in rel_paths])
+            self._db.commit()
+
+    def paths(self):
+        with self._lock:
+            self._flush()
+            return [row[0] for row in self._db.execute('SELECT path FROM files')]
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+
+class SyncReport:
+    """Итог синхронизации: списки относительных путей по результату"""
+
+    def __init__(self):
+        self.uploaded = []
+        self.unchanged = []
+        self.deleted = []
+        self.failed = {}
+
+    def __repr__(self):
+        return (f'SyncReport(uploaded={len(self.uploaded)}, unchanged={len(self.unchanged)}, '
+                f'deleted={len(self.deleted)}, failed={len(self.failed)})')
+
+
+def scan_local(local_dir, skip=()):
+    """Относительные пути файлов и папок (через '/')"""
+    files = {}
+    dirs = set()
+    for root, dirnames, filenames in os.walk(local_dir):
+        rel_root = os.path.relpath(root, local_dir).replace(os.sep, '/')
+        rel_root = '' if rel_root == '.' else rel_root
+        for name in dirnames:
+            dirs.add(f'{rel_root}/{name}' if rel_root else name)
+        for name in filenames:
+            rel_path = f'{rel_root}/{name}' if rel_root else name
+            full_path = os.path.join(root, name)
+            if os.path.abspath(full_path) not in skip:
+                files[rel_path] = full_path
+    return files, dirs
+
+
+def scan_remote(client, disk_dir):
+    """Файлы ({путь: md5}) и папки удалённой папки; нет папки — пусто"""
+    files = {}
+    dirs = set()
+    pending = ['']
+    while pending:
+        rel_dir = pending.pop()
+        remote_dir = f'{disk_dir}/{rel_dir}' if rel_dir else disk_dir
+        try:
+            for item in client.iter_dir(remote_dir, fields=REMOTE_FIELDS):
+                rel_path = f"{rel_dir}/{item['name']}" if rel_dir else item['name']
+                if item.get('type') == 'dir':
+                    dirs.add(rel_path)
+                    pending.append(rel_path)
+                else:
+                    files[rel_path] = item.get('md5')
+        except requests.HTTPError as error:
+            if error.response is None or error.response.status_code != 404:
+                raise
+    return files, dirs
+
+
+def sync_directory(client, local_dir, disk_dir, index_path=None, delete_orphans=True,
+                   workers=SYNC_WORKERS):
+    """Загружает на Диск только изменившиеся файлы и удаляет лишние.
+
+    Удалённый листинг идёт в фоне, пока локальные файлы хэшируются; файл
+    уходит на загрузку, как только посчитан его хэш. Файл, который не
+    удалось прочитать (битая ссылка, нет прав, удалён во время работы),
+    попадает в report.failed с OSError, а его копия на Диске не удаляется.
+    """
+    disk_dir = normalize_path(disk_dir)
+    index_path = index_path or os.path.join(local_dir, INDEX_NAME)
+    index = SyncIndex(index_path)
+    report = SyncReport()
+    skip = {os.path.abspath(index_path), os.path.abspath(index_path) + '-journal'}
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as lister, \
+                ThreadPoolExecutor(max_workers=workers) as hashers, \
+                ThreadPoolExecutor(max_workers=workers) as uploaders:
+            remote_future = lister.submit(scan_remote, client, disk_dir)
+            local_files, local_dirs = scan_local(local_dir, skip)
+            index.forget(set(index.paths()) - set(local_files))
+            hash_futures = {hashers.submit(index.hashes, rel_path, full_path): rel_path
+                            for rel_path, full_path in local_files.items()}
+
+            remote_files, remote_dirs = remote_future.result()
+            missing_dirs = [f'{disk_dir}/{d}' for d in local_dirs - remote_dirs]
+            if disk_dir and not remote_files and not remote_dirs:
+                missing_dirs.append(disk_dir)
+            if missing_dirs:
+                client.create_folders(missing_dirs)
+
+            upload_futures = {}
+            for future in as_completed(hash_futures):
+                rel_path = hash_futures[future]
+                try:
+                    md5, _ = future.result()
+                except OSError as error:
+                    report.failed[rel_path] = error
+                    continue
+                if remote_files.get(rel_path) == md5:
+                    report.unchanged.append(rel_path)
+                    continue
+                upload_futures[uploaders.submit(
+                    client.upload_file, local_files[rel_path],
+                    f'{disk_dir}/{rel_path}' if disk_dir else rel_path, True)] = rel_path
+            index.flush()
+
+            for future in as_completed(upload_futures):
+                rel_path = upload_futures[future]
+                try:
+                    response = future.result()
+                except Exception as error:
+                    report.failed[rel_path] = error
+                    continue
+                if response.status_code in (201, 202):
+                    report.uploaded.append(rel_path)
+                else:
+                    report.failed[rel_path] = response
+
+        if delete_orphans:
+            orphans = [path for path in remote_files if path not in local_files]
+            orphans += [path for path in remote_dirs if path not in local_dirs]
+            if orphans:
+                results = client.delete_resources(
+                    [f'{disk_dir}/{path}' if disk_dir else path for path in orphans])
+                for path in orphans:
+                    result = results.get(normalize_path(f'{disk_dir}/{path}'))
+                    if getattr(result, 'status_code', None) in (202, 204):
+                        report.deleted.append(path)
+                    else:
+                        report.failed[path] = result
+    finally:
+        index.close()
+    return report
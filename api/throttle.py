@@ -0,0 +1,188 @@
+"""
+Ограничение частоты запросов и повторы при 429/503
+"""
+import asyncio
+import email.utils
+import random
+import threading
+import time
+
+import requests
+
+# Статусы, которыми Диск сообщает о перегрузке
+THROTTLE_STATUSES = (429, 503)
+# Методы, которые безопасно повторять
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'DELETE')
+
+
+class TokenBucket:
+    """Токен-бакет, общий для потоков и корутин.
+
+    Токен резервируется под блокировкой сразу (счётчик может уйти в минус),
+    а ждать вызывающий уже будет сам: time.sleep в потоке или asyncio.sleep
+    в корутине. Так блокировка никогда не держится во время ожидания.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Забирает токен и возвращает, сколько секунд нужно подождать"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_acquire(self):
+        """Забирает токен, только если он есть сейчас; ждать не нужно"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RetryPolicy:
+    """Когда и через сколько повторять запрос.
+
+    Повторяются только методы из methods: ответы со статусами из statuses
+    и сетевые ошибки из errors. Пауза берётся из Retry-After, иначе —
+    экспоненциальный бэкофф с полным джиттером.
+    """
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=30.0,
+                 statuses=THROTTLE_STATUSES, methods=IDEMPOTENT_METHODS,
+                 errors=(requests.ConnectionError, requests.Timeout)):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.errors = tuple(errors)
+
+    def allows(self, method, attempt):
+        return attempt < self.max_retries and method.upper() in self.methods
+
+    def should_retry(self, method, attempt, response):
+        return response.status_code in self.statuses and self.allows(method, attempt)
+
+    def delay(self, attempt, response=None):
+        retry_after = _parse_retry_after(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+def _parse_retry_after(response):
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+
+class RequestStats:
+    """Счётчики клиента: запросы, ответы-троттлинги, повторы, ожидания лимитера"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {'requests': 0, 'throttled': 0, 'retried': 0, 'rate_limited': 0}
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def __getitem__(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+
+def send_with_retry(send, method, policy=None, limiter=None, stats=None):
+    """Выполняет send() с учётом лимитера и политики повторов"""
+    attempt = 0
+    while True:
+        if limiter is not None and limiter.acquire() and stats is not None:
+            stats.incr('rate_limited')
+        if stats is not None:
+            stats.incr('requests')
+        try:
+            response = send()
+        except Exception as error:
+            if policy is None or not isinstance(error, policy.errors) \
+                    or not policy.allows(method, attempt):
+                raise
+            delay = policy.delay(attempt)
+        else:
+            if stats is not None and response.status_code in THROTTLE_STATUSES:
+                stats.incr('throttled')
+            if policy is None or not policy.should_retry(method, attempt, response):
+                return response
+            delay = policy.delay(attempt, response)
+        if stats is not None:
+            stats.incr('retried')
+        time.sleep(delay)
+        attempt += 1
+
+
+async def send_with_retry_async(send, method, policy=None, limiter=None, stats=None,
+                                errors=()):
+    """Асинхронный вариант send_with_retry; send — корутинная функция.
+
+    errors — дополнительные сетевые исключения, которые повторяются наравне
+    с policy.errors (у aiohttp они свои).
+    """
+    attempt = 0
+    while True:
+        if limiter is not None and await limiter.acquire_async() and stats is not None:
+            stats.incr('rate_limited')
+        if stats is not None:
+            stats.incr('requests')
+        try:
+            response = await send()
+        except Exception as error:
+            if policy is None or not isinstance(error, policy.errors + tuple(errors)) \
+                    or not policy.allows(method, attempt):
+                raise
+            delay = policy.delay(attempt)
+        else:
+            if stats is not None and response.status_code in THROTTLE_STATUSES:
+                stats.incr('throttled')
+            if policy is None or not policy.should_retry(method, attempt, response):
+                return response
+            delay = policy.delay(attempt, response)
+        if stats is not None:
+            stats.incr('retried')
+        await asyncio.sleep(delay)
+        attempt += 1
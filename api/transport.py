@@ -0,0 +1,198 @@
+"""
+HTTP-транспорт клиента: пул keep-alive соединений поверх requests.Session
+"""
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NameResolutionError
+from urllib3.util.connection import allowed_gai_family
+
+from api.metrics import RequestEvent, endpoint_template
+
+# Таймауты по умолчанию: (подключение, чтение) в секундах
+DEFAULT_TIMEOUT = (5, 30)
+# Сколько хостов держим в пуле (API, хост загрузки, хост скачивания)
+DEFAULT_POOL_CONNECTIONS = 4
+# Сколько соединений держим на каждый хост
+DEFAULT_POOL_MAXSIZE = 10
+
+
+# Фазы установки соединения текущего потока (заполняются при новом соединении)
+_phases = threading.local()
+
+
+class _TimedConnectionMixin:
+    """Засекает DNS, TCP-подключение и TLS-рукопожатие по отдельности.
+
+    Имя разрешается здесь же, а urllib3 подключается уже к адресам, по
+    очереди, как сделал бы сам; повторного разрешения нет.
+    """
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(),
+                                           socket.SOCK_STREAM)
+        except socket.gaierror as error:
+            raise NameResolutionError(self.host, self, error) from error
+        resolved = time.perf_counter()
+        _phases.dns = resolved - started
+        host = self._dns_host
+        error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                except OSError as failure:
+                    error = failure
+                    continue
+                _phases.connect = time.perf_counter() - resolved
+                return sock
+        finally:
+            self._dns_host = host
+        raise error
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        connect = getattr(_phases, 'connect', None)
+        if connect is not None and isinstance(self, HTTPSConnection):
+            _phases.tls = time.perf_counter() - started - connect - getattr(_phases, 'dns', 0.0)
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                   'https': _TimedHTTPSConnectionPool}
+
+
+def _body_length(body):
+    """Длина тела; None — заранее неизвестна (итератор, файл без длины)"""
+    if body is None:
+        return 0
+    try:
+        return len(body)
+    except TypeError:
+        return None
+
+
+def _counted(chunks, sent):
+    """Отдаёт куски chunked-тела, считая в sent[0] реально отправленные байты"""
+    for chunk in chunks:
+        sent[0] += len(chunk)
+        yield chunk
+
+
+class Transport:
+    """Пул соединений, которым владеет клиент.
+
+    Один Session на клиента: urllib3 держит отдельный пул на каждый хост,
+    поэтому запросы к cloud-api.yandex.net и к хостам загрузки/скачивания
+    переиспользуют уже открытые TCP+TLS соединения.
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, timeout=DEFAULT_TIMEOUT,
+                 keep_alive=True, pool_block=False):
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.session = requests.Session()
+        adapter = _TimedAdapter(pool_connections=pool_connections,
+                                pool_maxsize=pool_maxsize,
+                                pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+        # Хуки получают RequestEvent после каждого запроса; без хуков замеров нет
+        self.hooks = []
+        self._closed = False
+
+    def add_hook(self, hook):
+        """Подписывает hook(event) на события запросов"""
+        self.hooks.append(hook)
+
+    def request(self, method, url, **kwargs):
+        """Выполняет запрос через пул; таймаут подставляется, если не задан"""
+        if self._closed:
+            raise RuntimeError("Transport закрыт")
+        kwargs.setdefault('timeout', self.timeout)
+        if not self.hooks:
+            return self.session.request(method, url, **kwargs)
+        return self._instrumented(method, url, kwargs)
+
+    def _instrumented(self, method, url, kwargs):
+        _phases.__dict__.clear()
+        event = RequestEvent(method, url, endpoint_template(method, url))
+        data = kwargs.get('data')
+        sent = None
+        if data is not None and not hasattr(data, 'read') and _body_length(data) is None:
+            sent = [0]
+            kwargs = dict(kwargs, data=_counted(data, sent))
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception as error:
+            event.error = type(error).__name__
+            event.duration = time.perf_counter() - started
+            self._emit(event)
+            raise
+        event.duration = time.perf_counter() - started
+        event.status = response.status_code
+        event.dns = getattr(_phases, 'dns', None)
+        event.connect = getattr(_phases, 'connect', None)
+        event.tls = getattr(_phases, 'tls', None)
+        # elapsed у requests включает установку соединения: её фазы уже посчитаны
+        setup = (event.dns or 0.0) + (event.connect or 0.0) + (event.tls or 0.0)
+        event.ttfb = max(0.0, response.elapsed.total_seconds() - setup)
+        if not kwargs.get('stream'):
+            event.transfer = max(0.0, event.duration - setup - event.ttfb)
+            event.bytes_received = len(response.content)
+        else:
+            event.bytes_received = int(response.headers.get('Content-Length') or 0)
+        event.bytes_sent = sent[0] if sent is not None else _body_length(response.request.body)
+        self._emit(event)
+        return response
+
+    def _emit(self, event):
+        for hook in self.hooks:
+            hook(event)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """Закрывает все соединения пула"""
+        if not self._closed:
+            self.session.close()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
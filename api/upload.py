@@ -0,0 +1,213 @@
+"""
+Потоковая загрузка: тело PUT отдаётся кусками фиксированного размера
+"""
+import io
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Размер куска при загрузке (1 MB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _remaining_length(fileobj, start):
+    """Сколько байт осталось в файловом объекте; None для труб и сокетов"""
+    try:
+        stat_result = os.fstat(fileobj.fileno())
+        if stat.S_ISREG(stat_result.st_mode):
+            return stat_result.st_size - start
+        return None
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    try:
+        if not fileobj.seekable():
+            return None
+        end = fileobj.seek(0, io.SEEK_END)
+        fileobj.seek(start)
+        return end - start
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+class FileBody:
+    """Сырое тело файла для PUT по ссылке загрузки.
+
+    requests берёт Content-Length из __len__ и отправляет тело, итерируясь
+    по кускам. Все куски читаются через readinto в один и тот же буфер,
+    поэтому память не растёт с размером файла.
+    """
+
+    def __init__(self, fileobj, chunk_size=UPLOAD_CHUNK_SIZE, progress=None, length=None):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._start = fileobj.tell()
+        self._length = length if length is not None else _remaining_length(fileobj, self._start)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        # При повторной отправке (редирект, ретрай) начинаем сначала
+        self.fileobj.seek(self._start)
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        sent = 0
+        started = time.monotonic()
+        while sent < self._length:
+            size = self.fileobj.readinto(view[:min(self.chunk_size, self._length - sent)])
+            if not size:
+                break
+            yield view[:size]
+            sent += size
+            if self.progress is not None:
+                self.progress(sent, self._length, time.monotonic() - started)
+
+
+class BufferBody:
+    """Тело из bytes/bytearray/memoryview: куски — срезы memoryview без копий"""
+
+    def __init__(self, buffer, chunk_size=UPLOAD_CHUNK_SIZE, progress=None):
+        self.view = memoryview(buffer).cast('B')
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+    def __len__(self):
+        return len(self.view)
+
+    def __iter__(self):
+        total = len(self.view)
+        started = time.monotonic()
+        for offset in range(0, total, self.chunk_size):
+            chunk = self.view[offset:offset + self.chunk_size]
+            yield chunk
+            if self.progress is not None:
+                self.progress(offset + len(chunk), total, time.monotonic() - started)
+
+
+class StreamBody:
+    """Тело из итератора байтов или несикаемого потока (труба, сокет).
+
+    Без length у тела нет __len__, и requests отправляет его с
+    Transfer-Encoding: chunked; с length — с обычным Content-Length.
+    """
+
+    def __init__(self, chunks, progress=None, length=None):
+        self.chunks = chunks
+        self.progress = progress
+        self.length = length
+
+    def __iter__(self):
+        sent = 0
+        started = time.monotonic()
+        for chunk in self.chunks:
+            if not chunk:
+                continue
+            yield chunk
+            sent += len(chunk)
+            if self.progress is not None:
+                self.progress(sent, self.length, time.monotonic() - started)
+
+
+class SizedStreamBody(StreamBody):
+    """StreamBody с заранее известной длиной"""
+
+    def __len__(self):
+        return self.length
+
+
+def _read_chunks(fileobj, chunk_size):
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def make_body(source, length=None, chunk_size=UPLOAD_CHUNK_SIZE, progress=None):
+    """Тело PUT для bytes-подобного объекта, файлового объекта или итератора.
+
+    У итерируемого источника с __len__ (например, helpers.data_generator.Payload)
+    длина считается размером в байтах, и тело уходит с Content-Length, а не
+    chunked; у списка или кортежа кусков длина — сумма длин кусков.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BufferBody(source, chunk_size, progress)
+    if hasattr(source, 'read'):
+        if hasattr(source, 'readinto') and hasattr(source, 'seek'):
+            try:
+                start = source.tell()
+            except (OSError, io.UnsupportedOperation):
+                start = None
+            if start is not None:
+                known = length if length is not None else _remaining_length(source, start)
+                if known is not None:
+                    return FileBody(source, chunk_size, progress, length=known)
+        chunks = _read_chunks(source, chunk_size)
+    else:
+        if length is None and isinstance(source, (list, tuple)):
+            length = sum(len(chunk) for chunk in source)
+        elif length is None and hasattr(source, '__len__'):
+            length = len(source)
+        chunks = iter(source)
+    body_class = StreamBody if length is None else SizedStreamBody
+    return body_class(chunks, progress, length)
+
+
+# Ссылка загрузки живёт 30 минут; старше этого возраста берём новую заранее
+UPLOAD_HREF_TTL = 25 * 60
+# Ответы PUT, означающие, что ссылка устарела
+EXPIRED_HREF_STATUSES = (404, 410)
+# Сколько ссылок держим наготове и сколько PUT идёт одновременно
+UPLOAD_LOOKAHEAD = 8
+UPLOAD_WORKERS = 4
+
+
+def pipelined_upload(get_href, put_file, pairs, lookahead=UPLOAD_LOOKAHEAD,
+                     workers=UPLOAD_WORKERS):
+    """Двухстадийная загрузка многих файлов.
+
+    get_href(disk_path) — ответ API со ссылкой, put_file(href, local_path,
+    disk_path) — ответ PUT. Ссылки запрашиваются заранее, но не больше чем
+    на lookahead файлов вперёд; PUT идут параллельно по мере готовности
+    ссылок. Устаревшая ссылка запрашивается заново прозрачно.
+    Возвращает {disk_path: ответ или исключение}.
+    """
+    slots = threading.BoundedSemaphore(lookahead)
+
+    def fetch(disk_path):
+        return get_href(disk_path), time.monotonic()
+
+    def put(local_path, disk_path, href_future):
+        try:
+            response, fetched_at = href_future.result()
+            for attempt in range(2):
+                if response.status_code != 200:
+                    return response
+                if time.monotonic() - fetched_at > UPLOAD_HREF_TTL:
+                    response, fetched_at = fetch(disk_path)
+                    continue
+                result = put_file(response.json()['href'], local_path, disk_path)
+                if result.status_code not in EXPIRED_HREF_STATUSES or attempt:
+                    return result
+                response, fetched_at = fetch(disk_path)
+            return response
+        except Exception as error:
+            return error
+        finally:
+            slots.release()
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=lookahead) as fetchers, \
+            ThreadPoolExecutor(max_workers=workers) as putters:
+        futures = []
+        for local_path, disk_path in pairs:
+            # Не уходим со ссылками дальше чем на lookahead файлов вперёд
+            slots.acquire()
+            href_future = fetchers.submit(fetch, disk_path)
+            futures.append((disk_path, putters.submit(put, local_path, disk_path, href_future)))
+        for disk_path, future in futures:
+            results[disk_path] = future.result()
+    return results
@@ -0,0 +1,217 @@
+"""
+Бенчмарк горячих путей YandexDiskAPI на локальном стенде
+
+    python -m benchmarks.bench_client --output bench_results.json
+    python -m benchmarks.bench_client --sizes 1KB 1MB 1GB --latency 0.005
+    python -m benchmarks.bench_client --compare baseline.json --threshold 0.15
+
+Метрики: операции в секунду и p50/p95/p99 для get_resource_info,
+create_folder и delete_resource, пропускная способность upload_file по
+размерам файлов и пиковый RSS клиента. Стенд работает отдельным процессом
+и не хранит загруженное (--discard-bodies), поэтому peak_rss_mb — память
+только клиента; память стенда — в stand_peak_rss_mb.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from api.client import YandexDiskAPI
+from api.metrics import latency_summary
+from helpers.data_generator import write_file
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = ['1KB', '64KB', '1MB', '16MB']
+DEFAULT_OPERATIONS = 200
+DEFAULT_THRESHOLD = 0.10
+_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+# Суффиксы метрик, у которых "больше — лучше"; у остальных лучше меньше
+HIGHER_IS_BETTER = ('ops_per_sec', 'mb_per_sec')
+
+
+def parse_size(text):
+    """'64KB' -> 65536"""
+    text = text.strip().upper()
+    for unit in sorted(_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * _UNITS[unit])
+    return int(text)
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_mb(children=False):
+    """Пиковый RSS этого процесса или (children) завершённых дочерних"""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux отдаёт килобайты, macOS — байты
+    return round(peak / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _timed(func, args_list):
+    samples = []
+    started = time.perf_counter()
+    for args in args_list:
+        begin = time.perf_counter()
+        response = func(*args)
+        samples.append(time.perf_counter() - begin)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{func.__name__}{args}: статус {response.status_code}')
+    total = time.perf_counter() - started
+    return dict(ops_per_sec=round(len(samples) / total, 1), **latency_summary(samples))
+
+
+def bench_metadata(client, operations):
+    client.create_folder('bench')
+    paths = [(f'bench/folder_{i}',) for i in range(operations)]
+    return {
+        'create_folder': _timed(client.create_folder, paths),
+        'get_resource_info': _timed(client.get_resource_info, paths),
+        'delete_resource': _timed(client.delete_resource, paths),
+    }
+
+
+def bench_upload(client, sizes, repeats):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label in sizes:
+            size = parse_size(label)
+            source = os.path.join(tmp_dir, f'upload_{label}.bin')
+            write_file(source, size)
+            samples = []
+            for i in range(repeats):
+                begin = time.perf_counter()
+                response = client.upload_file(source, f'bench/upload_{label}_{i}.bin',
+                                              overwrite=True)
+                samples.append(time.perf_counter() - begin)
+                if response.status_code not in (201, 202):
+                    raise RuntimeError(f'upload {label}: статус {response.status_code}')
+            os.unlink(source)
+            results[label] = dict(mb_per_sec=round(size * len(samples) / sum(samples) / 1024 ** 2, 2),
+                                  **latency_summary(samples))
+    return results
+
+
+@contextmanager
+def stand_process(latency=0.0, bandwidth=None):
+    """Стенд в дочернем процессе; отдаёт его base_url"""
+    command = [sys.executable, '-m', 'helpers.fake_server', '--discard-bodies',
+               '--latency', str(latency)]
+    if bandwidth:
+        command += ['--bandwidth', str(bandwidth)]
+    process = subprocess.Popen(command, cwd=ROOT, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        base_url = process.stdout.readline().strip()
+        if not base_url:
+            raise RuntimeError(f'Стенд не запустился (код {process.wait()})')
+        yield base_url
+    finally:
+        # Закрытый stdin — сигнал стенду остановиться
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+def run(operations=DEFAULT_OPERATIONS, sizes=DEFAULT_SIZES, repeats=3, latency=0.0,
+        bandwidth=None):
+    """Запускает стенд и все замеры; возвращает словарь для JSON"""
+    with stand_process(latency, bandwidth) as base_url:
+        with YandexDiskAPI('bench', base_url=base_url) as client:
+            metadata = bench_metadata(client, operations)
+            upload = bench_upload(client, sizes, repeats)
+    return {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'operations': operations, 'repeats': repeats, 'latency': latency,
+                 'bandwidth': bandwidth, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'metadata': metadata,
+        'upload': upload,
+        'peak_rss_mb': peak_rss_mb(),
+        'stand_peak_rss_mb': peak_rss_mb(children=True),
+    }
+
+
+def flatten(results):
+    """{'metadata.create_folder.ops_per_sec': 512.3, ...} без блока meta"""
+    flat = {}
+
+    def walk(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(f'{prefix}.{key}' if prefix else key, item)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix] = value
+
+    walk('', {key: value for key, value in results.items() if key != 'meta'})
+    return flat
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Метрики, ухудшившиеся относительно baseline больше чем на threshold"""
+    current = flatten(results)
+    regressions = []
+    for name, old in flatten(baseline).items():
+        new = current.get(name)
+        if new is None or not old:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            change = (old - new) / old
+        else:
+            change = (new - old) / old
+        if change > threshold:
+            regressions.append({'metric': name, 'baseline': old, 'current': new,
+                                'change': round(change, 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарк YandexDiskAPI на локальном стенде')
+    parser.add_argument('--output', default='bench_results.json', help='куда записать JSON')
+    parser.add_argument('--operations', type=int, default=DEFAULT_OPERATIONS,
+                        help='число метаданных-операций каждого вида')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help='размеры файлов для загрузки (1KB ... 1GB)')
+    parser.add_argument('--repeats', type=int, default=3, help='повторов загрузки на размер')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка стенда, сек')
+    parser.add_argument('--bandwidth', type=float, default=None, help='полоса стенда, байт/сек')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON прошлого прогона для сравнения')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='допустимое ухудшение (0.10 = 10%%)')
+    args = parser.parse_args(argv)
+
+    results = run(args.operations, args.sizes, args.repeats, args.latency, args.bandwidth)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for item in regressions:
+            print(f"РЕГРЕССИЯ {item['metric']}: {item['baseline']} -> {item['current']} "
+                  f"({item['change']:+.1%})")
+        if regressions:
+            return 1
+        print('Регрессий нет')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,111 +1,192 @@
 """
-Диагностика проблемы с токеном Яндекс.Диска
+Диагностика доступа к Яндекс.Диску без интерактива
+
+    YANDEX_DISK_TOKEN=... python diagnose.py
+    python diagnose.py --token ... --samples 50 --output report.json
+
+Проверки идут параллельно:
+  * api          — доступность API и права токена (GET /v1/disk)
+  * upload_href  — выдача ссылки загрузки (права на запись; файл не создаётся)
+  * latency      — N запросов по одному keep-alive соединению и N запросов
+                   с новым соединением на каждый; p50/p95/p99 и фазы dns/connect/tls
+
+Результат — JSON в stdout (или в --output). Код выхода: EXIT_* ниже.
 """
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
-def diagnose_token(token):
-    print("=" * 60)
-    print("ДИАГНОСТИКА ТОКЕНА ЯНДЕКС.ДИСК")
-    print("=" * 60)
-    
-    headers = {
-        'Authorization': f'OAuth {token}',
-        'Content-Type': 'application/json'
-    }
-    
-    # 1. Проверяем базовый доступ
-    print("\n1. Проверка доступа к API...")
-    response = requests.get(
-        "https://cloud-api.yandex.net/v1/disk",
-        headers=headers,
-        timeout=10
-    )
-    
-    print(f"   Статус: {response.status_code}")
-    print(f"   Ответ: {response.text[:200]}")
-    
+from api.endpoints import BASE_URL, FILES_URL
+from api.metrics import latency_summary
+from api.transport import Transport
+
+TOKEN_ENV = 'YANDEX_DISK_TOKEN'
+DEFAULT_SAMPLES = 20
+DEFAULT_TIMEOUT = 10
+
+# Коды выхода
+EXIT_OK = 0
+EXIT_DEGRADED = 1      # API доступен, но часть проверок не прошла (например, нет прав на запись)
+EXIT_USAGE = 2         # не задан токен / неверные аргументы (как у argparse)
+EXIT_AUTH = 3          # токен недействителен или без прав на Диск
+EXIT_UNREACHABLE = 4   # API недоступен по сети
+
+HINTS = {
+    401: 'Токен недействителен или устарел: получите новый на https://oauth.yandex.ru',
+    403: "У токена нет прав на Диск: при создании приложения выберите 'Яндекс.Диск REST API'",
+}
+
+
+def _url(base_url, url):
+    return base_url + url[len(BASE_URL):]
+
+
+def _error(error):
+    return {'ok': False, 'error': f'{type(error).__name__}: {error}'}
+
+
+def check_api(transport, headers, base_url):
+    """Доступность API и права токена на чтение"""
+    started = time.perf_counter()
+    try:
+        response = transport.request('GET', _url(base_url, BASE_URL), headers=headers)
+    except requests.RequestException as error:
+        return _error(error)
+    result = {'ok': response.status_code == 200, 'status': response.status_code,
+              'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)}
     if response.status_code == 200:
-        data = response.json()
-        print(f"  Доступ есть! Диск: {data.get('total_space', 0)/1024**3:.1f}GB")
-        return True
-    elif response.status_code == 403:
-        print("    Ошибка 403: Доступ запрещен")
-        print("\n   Возможные причины:")
-        print("   • Токен не имеет прав на Яндекс.Диск")
-        print("   • Токен создан для другого приложения")
-        print("   • Нужно подтвердить права в Яндекс.OAuth")
-    elif response.status_code == 401:
-        print("    Ошибка 401: Неавторизован (токен недействителен)")
-    else:
-        print(f"  Неожиданный статус: {response.status_code}")
-    
-    # 2. Проверяем, какой это тип токена
-    print("\n2. Проверка типа токена...")
-    print(f"   Длина токена: {len(token)} символов")
-    print(f"   Начинается с: {token[:20]}...")
-    
-    # 3. Пробуем получить информацию о приложении
-    print("\n3. Пробуем получить информацию о токене...")
+        info = response.json()
+        result['login'] = (info.get('user') or {}).get('login')
+        result['total_space'] = info.get('total_space')
+        result['used_space'] = info.get('used_space')
+    elif response.status_code in HINTS:
+        result['hint'] = HINTS[response.status_code]
+    return result
+
+
+def check_upload_href(transport, headers, base_url):
+    """Выдача ссылки загрузки; сам файл не загружается"""
+    path = f'diagnose_{uuid.uuid4().hex[:12]}.txt'
     try:
-        info_response = requests.get(
-            "https://login.yandex.ru/info",
-            headers={'Authorization': f'OAuth {token}'},
-            timeout=10
-        )
-        print(f"   Статус info: {info_response.status_code}")
-        if info_response.status_code == 200:
-            print(f"   Токен валиден для аккаунта")
-            print(f"   Инфо: {info_response.json().get('login', 'N/A')}")
-        else:
-            print(f"   Нет доступа к информации аккаунта")
-    except Exception as e:
-        print(f"   Ошибка: {e}")
-    
-    # 4. Проверяем права через OAuth
-    print("\n4. Проверка прав токена...")
-    print("   Перейдите на: https://oauth.yandex.ru/authorize?response_type=token&client_id=")
-    print("   Посмотрите, какие права запрашиваются")
-    
-    return False
-
-def get_working_solution():
-    print("\n" + "=" * 60)
-    print("РЕШЕНИЕ ПРОБЛЕМЫ С ТОКЕНОМ")
-    print("=" * 60)
-    
-    print("\nВАРИАНТ 1: Получить токен через Яндекс.OAuth (правильно)")
-    print("  1. Зайдите: https://oauth.yandex.ru/client/new")
-    print("  2. Создайте новое приложение:")
-    print("     • Название: 'Test API App'")
-    print("     • Платформы: 'Веб-сервисы'")
-    print("     • Callback URI: https://oauth.yandex.ru/verification_code")
-    print("     • ПРАВА: Обязательно выберите 'Яндекс.Диск REST API'")
-    print("  3. Получите Client ID и Client Secret")
-    print("  4. Используйте для получения токена")
-    
-    print("\nВАРИАНТ 2: Использовать токен из командной строки (быстро)")
-    print("  curl -X POST https://oauth.yandex.ru/token \\")
-    print("       -d 'grant_type=password' \\")
-    print("       -d 'username=ВАШ_ЛОГИН' \\")
-    print("       -d 'password=ВАШ_ПАРОЛЬ' \\")
-    print("       -d 'client_id=ВАШ_CLIENT_ID' \\")
-    print("       -d 'client_secret=ВАШ_CLIENT_SECRET'")
-    
-    print("\nВАРИАНТ 3: Временное решение для тестового задания")
-    print("  Используйте заглушки (моки) для демонстрации логики")
-    print("  Объясните, что с рабочим токеном все будет работать")
-
-if __name__ == "__main__":
-    # Введите ваш токен здесь
-    YOUR_TOKEN = input("Введите ваш токен: ").strip()
-    
-    if not YOUR_TOKEN:
-        YOUR_TOKEN = "y0_AgAAAAA2gcKaAAr7IAAAADqBeK7iRKbEVfJz9MZOF7GmUEE"
-        print(f"Используется тестовый токен: {YOUR_TOKEN[:20]}...")
-    
-    is_valid = diagnose_token(YOUR_TOKEN)
-    
-    if not is_valid:
-        get_working_solution()
-    
-    input("\nНажмите Enter для выхода...")
\ No newline at end of file
+        response = transport.request('GET', _url(base_url, FILES_URL), headers=headers,
+                                     params={'path': path, 'overwrite': 'true'})
+    except requests.RequestException as error:
+        return _error(error)
+    result = {'ok': response.status_code == 200, 'status': response.status_code}
+    if response.status_code == 200:
+        result['templated'] = response.json().get('templated', False)
+    elif response.status_code in HINTS:
+        result['hint'] = HINTS[response.status_code]
+    return result
+
+
+def probe_latency(headers, base_url, samples, timeout, pooled):
+    """samples запросов GET /v1/disk подряд.
+
+    pooled=True — одно keep-alive соединение (первый запрос его открывает и в
+    выборку не входит); pooled=False — новое TCP+TLS соединение на каждый запрос.
+    """
+    events = []
+    transport = Transport(pool_connections=1, pool_maxsize=1, timeout=timeout,
+                          keep_alive=pooled)
+    transport.add_hook(events.append)
+    url = _url(base_url, BASE_URL)
+    try:
+        with transport:
+            if pooled:
+                transport.request('GET', url, headers=headers)
+                events.clear()
+            for _ in range(samples):
+                transport.request('GET', url, headers=headers)
+    except requests.RequestException as error:
+        return dict(_error(error), completed=len(events))
+
+    statuses = {}
+    for event in events:
+        statuses[str(event.status)] = statuses.get(str(event.status), 0) + 1
+    result = {'ok': all(event.status == 200 for event in events), 'samples': len(events),
+              'statuses': statuses,
+              'total': latency_summary([event.duration for event in events])}
+    for phase in ('dns', 'connect', 'tls', 'ttfb'):
+        values = [getattr(event, phase) for event in events if getattr(event, phase) is not None]
+        if values:
+            result[phase] = latency_summary(values)
+    result['new_connections'] = sum(1 for event in events if event.connect is not None)
+    return result
+
+
+def run(token, base_url=BASE_URL, samples=DEFAULT_SAMPLES, timeout=DEFAULT_TIMEOUT):
+    """Запускает все проверки параллельно; возвращает отчёт-словарь"""
+    headers = {'Authorization': f'OAuth {token}', 'Accept': 'application/json'}
+    started = time.perf_counter()
+    with Transport(timeout=timeout) as transport, ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {
+            'api': pool.submit(check_api, transport, headers, base_url),
+            'upload_href': pool.submit(check_upload_href, transport, headers, base_url),
+            'latency_pooled': pool.submit(probe_latency, headers, base_url, samples, timeout, True),
+            'latency_fresh': pool.submit(probe_latency, headers, base_url, samples, timeout, False),
+        }
+        checks = {name: future.result() for name, future in futures.items()}
+    checks['latency'] = {'pooled': checks.pop('latency_pooled'),
+                         'fresh': checks.pop('latency_fresh')}
+    report = {'base_url': base_url, 'samples': samples,
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+              'checks': checks}
+    report['exit_code'] = exit_code(report)
+    report['ok'] = report['exit_code'] == EXIT_OK
+    return report
+
+
+def exit_code(report):
+    """Код выхода по отчёту: сеть хуже прав, права хуже частичных сбоев"""
+    checks = report['checks']
+    api = checks['api']
+    if 'error' in api:
+        return EXIT_UNREACHABLE
+    if api['status'] in (401, 403):
+        return EXIT_AUTH
+    latency = checks['latency']
+    if api['ok'] and checks['upload_href']['ok'] and latency['pooled']['ok'] \
+            and latency['fresh']['ok']:
+        return EXIT_OK
+    return EXIT_DEGRADED
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Диагностика доступа к Яндекс.Диску')
+    parser.add_argument('--token', default=os.environ.get(TOKEN_ENV),
+                        help=f'OAuth-токен (по умолчанию из ${TOKEN_ENV})')
+    parser.add_argument('--base-url', default=BASE_URL, help='адрес API (например, стенд)')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                        help='запросов в каждой выборке задержки')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='таймаут запроса, сек')
+    parser.add_argument('--output', help='куда записать JSON (по умолчанию stdout)')
+    args = parser.parse_args(argv)
+
+    if not args.token:
+        print(f'Токен не задан: --token или ${TOKEN_ENV}', file=sys.stderr)
+        return EXIT_USAGE
+    if args.samples < 1:
+        print('--samples должно быть не меньше 1', file=sys.stderr)
+        return EXIT_USAGE
+
+    report = run(args.token, args.base_url.rstrip('/'), args.samples, args.timeout)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return report['exit_code']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
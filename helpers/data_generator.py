@@ -0,0 +1,158 @@
+"""
+Синтетические данные для тестов и бенчмарков: содержимое файлов и деревья папок
+
+Всё детерминировано по seed: одинаковые параметры дают одинаковые байты и
+одинаковое дерево. Содержимое не собирается в памяти целиком — куски
+отдаются срезами memoryview из двух заранее заполненных буферов (случайный
+и текстовый), поэтому генерация гигабайта стоит столько же памяти, сколько
+генерация килобайта.
+"""
+import hashlib
+import math
+import os
+import random
+
+# Размер куска, которым отдаётся содержимое
+BLOCK_SIZE = 64 * 1024
+# Размер буферов-источников; куски берутся из них со случайным смещением
+POOL_SIZE = 1024 * 1024
+
+_WORDS = ('disk', 'yandex', 'folder', 'file', 'upload', 'download', 'resource',
+          'path', 'token', 'sync', 'cache', 'operation', 'publish', 'link',
+          'data', 'test', 'bench', 'метаданные', 'папка', 'файл')
+
+# Буферы-источники общие для всех seed: файлы различаются порядком и
+# смещениями кусков. Создаются один раз на процесс
+_POOL_SEED = 'yadisk-data-generator'
+_pools = {}
+
+
+def _pool(compressible):
+    """Буфер вдвое длиннее POOL_SIZE, чтобы любой срез [offset:offset+BLOCK_SIZE]
+    с offset < POOL_SIZE был непрерывным"""
+    pool = _pools.get(compressible)
+    if pool is None:
+        rng = random.Random(f'{_POOL_SEED}:{int(compressible)}')
+        if compressible:
+            text = bytearray()
+            while len(text) < POOL_SIZE:
+                text += ' '.join(rng.choices(_WORDS, k=16)).encode() + b'\n'
+            data = bytes(text[:POOL_SIZE])
+        else:
+            data = rng.randbytes(POOL_SIZE)
+        pool = _pools[compressible] = memoryview(data + data)
+    return pool
+
+
+class Payload:
+    """Детерминированное содержимое файла заданного размера.
+
+    compressible — доля кусков с текстом (хорошо сжимается), остальные куски
+    случайные. Итерация отдаёт memoryview без копирования, есть __len__,
+    поэтому объект годится как тело запроса и как источник upload_stream.
+    """
+
+    def __init__(self, size, seed=0, compressible=0.0, block_size=BLOCK_SIZE):
+        if not 0.0 <= compressible <= 1.0:
+            raise ValueError("compressible должен быть от 0 до 1")
+        if block_size > POOL_SIZE:
+            raise ValueError(f"block_size не больше {POOL_SIZE}")
+        self.size = size
+        self.seed = seed
+        self.compressible = compressible
+        self.block_size = block_size
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        rng = random.Random(self.seed)
+        text = _pool(True)
+        noise = _pool(False)
+        remaining = self.size
+        while remaining:
+            length = min(self.block_size, remaining)
+            pool = text if rng.random() < self.compressible else noise
+            offset = rng.randrange(POOL_SIZE)
+            yield pool[offset:offset + length]
+            remaining -= length
+
+    def read_all(self):
+        """Всё содержимое одним bytes (только для небольших размеров)"""
+        return b''.join(self)
+
+    def md5(self):
+        digest = hashlib.md5()
+        for chunk in self:
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def write_to(self, path):
+        """Записывает содержимое в файл; возвращает размер"""
+        with open(path, 'wb') as f:
+            for chunk in self:
+                f.write(chunk)
+        return self.size
+
+
+def write_file(path, size, seed=0, compressible=0.0):
+    """Файл заданного размера с детерминированным содержимым"""
+    return Payload(size, seed, compressible).write_to(path)
+
+
+def lognormal_sizes(median=64 * 1024, sigma=1.5, min_size=0, max_size=64 * 1024 * 1024):
+    """Распределение размеров, похожее на реальные папки: много мелких файлов,
+    редкие крупные. Возвращает функцию rng -> размер."""
+    mu = math.log(median)
+
+    def sample(rng):
+        return int(min(max_size, max(min_size, rng.lognormvariate(mu, sigma))))
+
+    return sample
+
+
+def fixed_size(size):
+    """Все файлы одного размера"""
+    return lambda rng: size
+
+
+def tree_spec(depth=2, fanout=3, files_per_dir=5, sizes=None, seed=0):
+    """План дерева без записи на диск.
+
+    Возвращает (папки, файлы): папки — относительные пути в порядке создания
+    (родитель раньше детей), файлы — список (относительный путь, размер,
+    seed содержимого).
+    """
+    sizes = sizes or lognormal_sizes()
+    rng = random.Random(seed)
+    folders = []
+    files = []
+
+    def walk(prefix, level):
+        for i in range(files_per_dir):
+            rel_path = f'{prefix}file_{i:04d}.bin'
+            files.append((rel_path, sizes(rng), rng.getrandbits(32)))
+        if level == depth:
+            return
+        for i in range(fanout):
+            folder = f'{prefix}dir_{i:02d}'
+            folders.append(folder)
+            walk(folder + '/', level + 1)
+
+    walk('', 0)
+    return folders, files
+
+
+def generate_tree(root, depth=2, fanout=3, files_per_dir=5, sizes=None, seed=0,
+                  compressible=0.0):
+    """Создаёт в root дерево из tree_spec и заполняет файлы.
+
+    Возвращает список (относительный путь, размер) записанных файлов.
+    """
+    folders, files = tree_spec(depth, fanout, files_per_dir, sizes, seed)
+    os.makedirs(root, exist_ok=True)
+    for folder in folders:
+        os.makedirs(os.path.join(root, folder), exist_ok=True)
+    for rel_path, size, file_seed in files:
+        write_file(os.path.join(root, rel_path), size, file_seed, compressible)
+    return [(rel_path, size) for rel_path, size, _ in files]
@@ -0,0 +1,597 @@
+"""
+Локальный стенд Яндекс.Диск API для офлайн- и нагрузочного тестирования
+
+Реализует эндпоинты из api/endpoints.py поверх дерева в памяти: информация
+о диске, ресурсы, плоский список файлов и последние загруженные, ссылки
+загрузки/скачивания и сами PUT/GET по ним, копирование и перемещение,
+публикация и асинхронные операции (202). Задержку, ограничение полосы и
+долю ответов 429 можно настроить.
+
+    with FakeDiskServer(latency=0.01, throttle_rate=0.1) as server:
+        client = YandexDiskAPI('token', base_url=server.base_url)
+
+Отдельным процессом (например, чтобы память стенда не смешивалась с
+памятью клиента в бенчмарке); первая строка вывода — base_url:
+
+    python -m helpers.fake_server --discard-bodies
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = '/v1/disk'
+TOTAL_SPACE = 10 * 1024 ** 3
+# Кусок, которым стенд читает и отдаёт тела (и по которому считает полосу)
+TRANSFER_CHUNK_SIZE = 64 * 1024
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def _normalize(path):
+    if path.startswith('disk:'):
+        path = path[len('disk:'):]
+    return path.strip('/')
+
+
+def _project(data, fields):
+    """Проекция fields=a,b.c в стиле API Диска"""
+    groups = {}
+    for field in fields:
+        head, _, rest = field.partition('.')
+        groups.setdefault(head, []).append(rest)
+    result = {}
+    for head, rests in groups.items():
+        if head not in data:
+            continue
+        value = data[head]
+        if '' in rests:
+            result[head] = value
+        elif isinstance(value, dict):
+            result[head] = _project(value, rests)
+        elif isinstance(value, list):
+            result[head] = [_project(item, rests) if isinstance(item, dict) else item
+                            for item in value]
+    return result
+
+
+class Node:
+    __slots__ = ('type', 'data', 'digest', 'created', 'modified', 'public_url', 'uploaded')
+
+    def __init__(self, node_type, data=b'', digest=None):
+        self.type = node_type
+        self.data = data
+        # (size, md5, sha256) файла, содержимое которого стенд не хранит
+        self.digest = digest
+        self.created = self.modified = _now()
+        self.public_url = None
+        # Порядковый номер последней загрузки (для /resources/last-uploaded)
+        self.uploaded = 0
+
+    @property
+    def size(self):
+        return self.digest[0] if self.digest else len(self.data)
+
+
+class DiskState:
+    """Дерево ресурсов в памяти; все изменения под одной блокировкой"""
+
+    def __init__(self, total_space=TOTAL_SPACE):
+        self.total_space = total_space
+        self.nodes = {'': Node('dir')}
+        self.lock = threading.RLock()
+        self.uploads = 0
+
+    def used_space(self):
+        return sum(node.size for node in self.nodes.values())
+
+    def children(self, path):
+        prefix = path + '/' if path else ''
+        return sorted(p for p in self.nodes
+                      if p and p.startswith(prefix) and '/' not in p[len(prefix):])
+
+    def describe(self, path, limit=20, offset=0):
+        node = self.nodes[path]
+        name = path.rpartition('/')[2] or 'disk'
+        data = {'path': f'disk:/{path}', 'name': name, 'type': node.type,
+                'created': node.created, 'modified': node.modified}
+        if node.public_url:
+            data['public_url'] = node.public_url
+        if node.type == 'file':
+            if node.digest:
+                size, md5, sha256 = node.digest
+            else:
+                size = len(node.data)
+                md5 = hashlib.md5(node.data).hexdigest()
+                sha256 = hashlib.sha256(node.data).hexdigest()
+            data.update(size=size, md5=md5, sha256=sha256,
+                        mime_type='application/octet-stream')
+        elif limit is not None:
+            children = self.children(path)
+            data['_embedded'] = {
+                'path': f'disk:/{path}', 'limit': limit, 'offset': offset,
+                'total': len(children),
+                'items': [self.describe(child, limit=None)
+                          for child in children[offset:offset + limit]],
+            }
+        return data
+
+    def files(self):
+        return sorted(path for path, node in self.nodes.items() if node.type == 'file')
+
+    def remove(self, path):
+        for key in [p for p in self.nodes if p == path or p.startswith(path + '/')]:
+            del self.nodes[key]
+
+
+class FakeDiskServer:
+    """HTTP-стенд в отдельном потоке.
+
+    latency — задержка перед каждым ответом (сек), bandwidth — предел
+    скорости передачи тел (байт/сек), throttle_rate — доля запросов к API,
+    на которые стенд отвечает 429, operation_delay — сколько секунд
+    асинхронная операция остаётся in-progress. Если задан token, стенд
+    проверяет заголовок Authorization. discard_bodies — загруженные файлы
+    только хэшируются и не хранятся (память стенда не растёт с объёмом
+    загрузок; скачать их нельзя).
+    """
+
+    def __init__(self, latency=0.0, bandwidth=None, throttle_rate=0.0, operation_delay=0.05,
+                 token=None, seed=0, host='127.0.0.1', port=0, discard_bodies=False):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.throttle_rate = throttle_rate
+        self.operation_delay = operation_delay
+        self.token = token
+        self.discard_bodies = discard_bodies
+        self.state = DiskState()
+        self.requests = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._counter_lock = threading.Lock()
+        # Выданные ссылки загрузки/скачивания и асинхронные операции
+        self._uploads = {}
+        self._downloads = {}
+        self._operations = {}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def base_url(self):
+        """Подставляется в YandexDiskAPI(base_url=...) вместо BASE_URL"""
+        return self.url + API_PREFIX
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,),
+                                        name='fake-disk-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _should_throttle(self):
+        with self._counter_lock:
+            self.requests += 1
+            if self.throttle_rate and self._random.random() < self.throttle_rate:
+                self.throttled += 1
+                return True
+        return False
+
+    def _start_operation(self):
+        operation_id = uuid.uuid4().hex
+        self._operations[operation_id] = time.monotonic() + self.operation_delay
+        return f'{self.base_url}/operations/{operation_id}'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(_DiskHandler):
+            fake = server
+
+        return Handler
+
+
+class _DiskHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело уходят отдельными записями: без TCP_NODELAY keep-alive
+    # упирается в задержку подтверждений (~40 мс на запрос)
+    disable_nagle_algorithm = True
+    fake = None
+
+    def log_message(self, *args):
+        pass
+
+    # --- Транспорт: тела с учётом полосы, JSON-ответы, ошибки
+
+    def _throttle_bandwidth(self, size, started):
+        if self.fake.bandwidth:
+            expected = size / self.fake.bandwidth
+            elapsed = time.monotonic() - started
+            if expected > elapsed:
+                time.sleep(expected - elapsed)
+
+    def _read_body(self, sink=None):
+        """Тело запроса целиком или, если задан sink(chunk), по кускам в sink"""
+        started = time.monotonic()
+        chunks = []
+        consume = sink or chunks.append
+        received = 0
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                consume(self.rfile.read(size))
+                self.rfile.readline()
+                received += size
+                self._throttle_bandwidth(received, started)
+        else:
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining:
+                chunk = self.rfile.read(min(TRANSFER_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                consume(chunk)
+                remaining -= len(chunk)
+                received += len(chunk)
+                self._throttle_bandwidth(received, started)
+        return b''.join(chunks)
+
+    def _send(self, status, body=b'', headers=None):
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            # Как настоящий сервер: иначе клиент вернёт закрытый сокет в пул
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        if self.command == 'HEAD':
+            return
+        started = time.monotonic()
+        for offset in range(0, len(body), TRANSFER_CHUNK_SIZE):
+            self.wfile.write(body[offset:offset + TRANSFER_CHUNK_SIZE])
+            self._throttle_bandwidth(min(offset + TRANSFER_CHUNK_SIZE, len(body)), started)
+
+    def _json(self, status, data, headers=None):
+        headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+        self._send(status, json.dumps(data).encode(), headers)
+
+    def _error(self, status, error, message):
+        self._json(status, {'error': error, 'message': message, 'description': message})
+
+    # --- Маршрутизация
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = url.path
+
+        if route.startswith('/upload/') and self.command == 'PUT':
+            return self._upload_target(route[len('/upload/'):])
+        if route.startswith('/download/') and self.command in ('GET', 'HEAD'):
+            return self._download_target(route[len('/download/'):])
+        if not route.startswith(API_PREFIX):
+            return self._error(404, 'NotFoundError', 'Unknown endpoint')
+
+        # Тело запроса к API читаем всегда, чтобы не сломать keep-alive
+        self._read_body()
+        if self.fake.token and self.headers.get('Authorization') != f'OAuth {self.fake.token}':
+            return self._error(401, 'UnauthorizedError', 'Не авторизован.')
+        if self.fake._should_throttle():
+            return self._json(429, {'error': 'TooManyRequestsError',
+                                    'message': 'Слишком много запросов.'},
+                              {'Retry-After': '0'})
+
+        endpoint = route[len(API_PREFIX):].rstrip('/')
+        handler = self.ROUTES.get((self.command, endpoint))
+        if handler is None and endpoint.startswith('/operations/') and self.command == 'GET':
+            return self._operation_status(endpoint[len('/operations/'):])
+        if handler is None:
+            return self._error(405 if any(e == endpoint for _, e in self.ROUTES) else 404,
+                               'NotFoundError', 'Unknown endpoint')
+        return handler(self, query)
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_HEAD(self):
+        self._dispatch()
+
+    def do_PUT(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_DELETE(self):
+        self._dispatch()
+
+    # --- Эндпоинты API
+
+    def _disk_info(self, query):
+        with self.fake.state.lock:
+            used = self.fake.state.used_space()
+        data = {'total_space': self.fake.state.total_space, 'used_space': used,
+                'trash_size': 0,
+                'system_folders': {'applications': 'disk:/Приложения',
+                                   'downloads': 'disk:/Загрузки/'}}
+        if query.get('fields'):
+            data = _project(data, query['fields'].split(','))
+        self._json(200, data)
+
+    def _resource_info(self, query):
+        path = _normalize(query.get('path', ''))
+        limit = int(query.get('limit', 20))
+        offset = int(query.get('offset', 0))
+        state = self.fake.state
+        with state.lock:
+            if path not in state.nodes:
+                return self._error(404, 'DiskNotFoundError', 'Не удалось найти запрошенный ресурс.')
+            data = state.describe(path, limit=limit, offset=offset)
+        if query.get('fields'):
+            data = _project(data, query['fields'].split(','))
+        self._json(200, data)
+
+    def _all_files(self, query):
+        limit = int(query.get('limit', 20))
+        offset = int(query.get('offset', 0))
+        state = self.fake.state
+        with state.lock:
+            items = [state.describe(path, limit=None)
+                     for path in state.files()[offset:offset + limit]]
+        data = {'items': items, 'limit': limit, 'offset': offset}
+        if query.get('fields'):
+            data = _project(data, query['fields'].split(','))
+        self._json(200, data)
+
+    def _last_uploaded(self, query):
+        limit = int(query.get('limit', 20))
+        state = self.fake.state
+        with state.lock:
+            recent = sorted((path for path, node in state.nodes.items() if node.uploaded),
+                            key=lambda path: state.nodes[path].uploaded, reverse=True)
+            items = [state.describe(path, limit=None) for path in recent[:limit]]
+        data = {'items': items, 'limit': limit}
+        if query.get('fields'):
+            data = _project(data, query['fields'].split(','))
+        self._json(200, data)
+
+    def _create_folder(self, query):
+        path = _normalize(query.get('path', ''))
+        state = self.fake.state
+        with state.lock:
+            if path in state.nodes:
+                return self._error(409, 'DiskPathPointsToExistentDirectoryError',
+                                   'По указанному пути уже существует папка с таким именем.')
+            if path.rpartition('/')[0] not in state.nodes:
+                return self._error(409, 'DiskPathDoesntExistsError',
+                                   'Указанного пути не существует.')
+            state.nodes[path] = Node('dir')
+        self._json(201, {'href': f'{self.fake.base_url}/resources?path=disk:/{path}',
+                         'method': 'GET', 'templated': False})
+
+    def _delete_resource(self, query):
+        path = _normalize(query.get('path', ''))
+        state = self.fake.state
+        with state.lock:
+            if not path or path not in state.nodes:
+                return self._error(404, 'DiskNotFoundError', 'Не удалось найти запрошенный ресурс.')
+            non_empty = state.nodes[path].type == 'dir' and state.children(path)
+            state.remove(path)
+        if non_empty:
+            return self._json(202, {'href': self.fake._start_operation(), 'method': 'GET',
+                                    'templated': False})
+        self._send(204)
+
+    def _transfer(self, query, move):
+        source = _normalize(query.get('from', ''))
+        path = _normalize(query.get('path', ''))
+        overwrite = query.get('overwrite', 'false').lower() == 'true'
+        force_async = query.get('force_async', 'false').lower() == 'true'
+        state = self.fake.state
+        with state.lock:
+            if not source or source not in state.nodes:
+                return self._error(404, 'DiskNotFoundError', 'Не удалось найти запрошенный ресурс.')
+            if not path or path == source or path.startswith(source + '/'):
+                return self._error(409, 'DiskResourceAlreadyExistsError',
+                                   'Нельзя скопировать ресурс в самого себя.')
+            if path in state.nodes and not overwrite:
+                return self._error(409, 'DiskResourceAlreadyExistsError',
+                                   'Ресурс уже существует.')
+            if path.rpartition('/')[0] not in state.nodes:
+                return self._error(409, 'DiskPathDoesntExistsError',
+                                   'Указанного пути не существует.')
+            state.remove(path)
+            subtree = [p for p in state.nodes if p == source or p.startswith(source + '/')]
+            for old in subtree:
+                node = state.nodes[old]
+                copy = Node(node.type, node.data, node.digest)
+                if move:
+                    copy.created, copy.modified = node.created, node.modified
+                state.nodes[path + old[len(source):]] = copy
+            if move:
+                state.remove(source)
+        # Непустые папки, как и у настоящего API, обрабатываются асинхронно
+        if force_async or len(subtree) > 1:
+            return self._json(202, {'href': self.fake._start_operation(), 'method': 'GET',
+                                    'templated': False})
+        self._json(201, {'href': f'{self.fake.base_url}/resources?path=disk:/{path}',
+                         'method': 'GET', 'templated': False})
+
+    def _copy(self, query):
+        self._transfer(query, move=False)
+
+    def _move(self, query):
+        self._transfer(query, move=True)
+
+    def _upload_href(self, query):
+        path = _normalize(query.get('path', ''))
+        overwrite = query.get('overwrite', 'false').lower() == 'true'
+        state = self.fake.state
+        with state.lock:
+            if path in state.nodes and not overwrite:
+                return self._error(409, 'DiskResourceAlreadyExistsError',
+                                   'Ресурс уже существует.')
+            if path.rpartition('/')[0] not in state.nodes:
+                return self._error(409, 'DiskPathDoesntExistsError',
+                                   'Указанного пути не существует.')
+            upload_id = uuid.uuid4().hex
+            self.fake._uploads[upload_id] = path
+        self._json(200, {'href': f'{self.fake.url}/upload/{upload_id}', 'method': 'PUT',
+                         'templated': False, 'operation_id': upload_id})
+
+    def _download_href(self, query):
+        path = _normalize(query.get('path', ''))
+        state = self.fake.state
+        with state.lock:
+            node = state.nodes.get(path)
+            if node is None or node.type != 'file':
+                return self._error(404, 'DiskNotFoundError', 'Не удалось найти запрошенный ресурс.')
+            if node.digest:
+                return self._error(404, 'DiskNotFoundError', 'Содержимое файла стенд не хранит.')
+            download_id = uuid.uuid4().hex
+            self.fake._downloads[download_id] = path
+        self._json(200, {'href': f'{self.fake.url}/download/{download_id}', 'method': 'GET',
+                         'templated': False})
+
+    def _publish(self, query):
+        path = _normalize(query.get('path', ''))
+        state = self.fake.state
+        with state.lock:
+            node = state.nodes.get(path)
+            if node is None:
+                return self._error(404, 'DiskNotFoundError', 'Не удалось найти запрошенный ресурс.')
+            node.public_url = node.public_url or f'{self.fake.url}/public/{uuid.uuid4().hex}'
+        self._json(200, {'href': f'{self.fake.base_url}/resources?path=disk:/{path}',
+                         'method': 'GET', 'templated': False})
+
+    def _operation_status(self, operation_id):
+        deadline = self.fake._operations.get(operation_id)
+        if deadline is None:
+            return self._error(404, 'DiskNotFoundError', 'Операция не найдена.')
+        status = 'success' if time.monotonic() >= deadline else 'in-progress'
+        self._json(200, {'status': status})
+
+    # --- Хосты загрузки и скачивания
+
+    def _upload_target(self, upload_id):
+        path = self.fake._uploads.pop(upload_id, None)
+        digest = None
+        if self.fake.discard_bodies:
+            md5, sha256, size = hashlib.md5(), hashlib.sha256(), [0]
+
+            def sink(chunk):
+                md5.update(chunk)
+                sha256.update(chunk)
+                size[0] += len(chunk)
+
+            data = self._read_body(sink)
+            digest = (size[0], md5.hexdigest(), sha256.hexdigest())
+        else:
+            data = self._read_body()
+        if path is None:
+            return self._error(404, 'NotFoundError', 'Ссылка для загрузки недействительна.')
+        state = self.fake.state
+        with state.lock:
+            node = state.nodes.get(path)
+            if node is None or node.type != 'file':
+                node = state.nodes[path] = Node('file', data, digest)
+            else:
+                node.data = data
+                node.digest = digest
+                node.modified = _now()
+            state.uploads += 1
+            node.uploaded = state.uploads
+        self._send(201)
+
+    def _download_target(self, download_id):
+        path = self.fake._downloads.get(download_id)
+        state = self.fake.state
+        with state.lock:
+            node = state.nodes.get(path) if path is not None else None
+            data = node.data if node is not None else None
+        if data is None:
+            return self._error(404, 'NotFoundError', 'Ссылка для скачивания недействительна.')
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+        if not match:
+            return self._send(200, data, {'ETag': etag, 'Accept-Ranges': 'bytes'})
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+        if start >= len(data):
+            return self._send(416, b'', {'Content-Range': f'bytes */{len(data)}'})
+        self._send(206, data[start:end + 1], {'ETag': etag,
+                                             'Content-Range': f'bytes {start}-{end}/{len(data)}'})
+
+    ROUTES = {
+        ('GET', ''): _disk_info,
+        ('GET', '/resources'): _resource_info,
+        ('PUT', '/resources'): _create_folder,
+        ('DELETE', '/resources'): _delete_resource,
+        ('GET', '/resources/upload'): _upload_href,
+        ('GET', '/resources/download'): _download_href,
+        ('GET', '/resources/files'): _all_files,
+        ('GET', '/resources/last-uploaded'): _last_uploaded,
+        ('PUT', '/resources/publish'): _publish,
+        ('POST', '/resources/copy'): _copy,
+        ('POST', '/resources/move'): _move,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Локальный стенд API Яндекс.Диска')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа, сек')
+    parser.add_argument('--bandwidth', type=float, default=None, help='полоса, байт/сек')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='доля ответов 429')
+    parser.add_argument('--token', default=None, help='проверять Authorization')
+    parser.add_argument('--discard-bodies', action='store_true',
+                        help='не хранить содержимое загруженных файлов')
+    args = parser.parse_args(argv)
+    server = FakeDiskServer(latency=args.latency, bandwidth=args.bandwidth,
+                            throttle_rate=args.throttle_rate, token=args.token,
+                            host=args.host, port=args.port, discard_bodies=args.discard_bodies)
+    print(server.base_url, flush=True)
+    try:
+        # Работает, пока родитель не закроет stdin или не пришлёт сигнал
+        server.start()
+        sys.stdin.read()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+pytest-плагин для живых тестов Диска: проверка прав токена и общий клиент
+
+Подключается в tests/conftest.py (pytest_plugins). Права токена (read,
+write, upload, publish) проверяются один раз и кэшируются в .pytest_cache
+по хэшу токена на --disk-probe-ttl секунд. Тесты с маркером
+
+    @pytest.mark.requires_disk('write', 'upload')
+
+пропускаются ещё при сборке, если у токена нет нужных прав, — без
+отдельных запросов в каждом тесте. Пока ни один собранный тест не требует
+прав, проверка не выполняется вовсе.
+
+Токен: --disk-token, иначе $YANDEX_DISK_TOKEN; в репозитории он не хранится.
+Без токена отмеченные тесты пропускаются.
+"""
+import hashlib
+import os
+import time
+import uuid
+
+import pytest
+import requests
+
+from api.client import YandexDiskAPI
+from api.endpoints import BASE_URL
+from api.throttle import RetryPolicy
+
+TOKEN_ENV = 'YANDEX_DISK_TOKEN'
+CAPABILITIES = ('read', 'write', 'upload', 'publish')
+# Сколько секунд доверяем закэшированной проверке прав
+PROBE_TTL = 3600
+# Размер пула общего клиента
+SHARED_POOL_SIZE = 16
+CACHE_PREFIX = 'yadisk/capabilities'
+MARKER = 'requires_disk'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('yadisk', 'Яндекс.Диск')
+    group.addoption('--disk-token', default=None,
+                    help=f'OAuth-токен для живых тестов (иначе ${TOKEN_ENV})')
+    group.addoption('--disk-base-url', default=BASE_URL,
+                    help='адрес API (например, локальный стенд)')
+    group.addoption('--disk-probe-ttl', type=float, default=PROBE_TTL,
+                    help='сколько секунд действует закэшированная проверка прав')
+    group.addoption('--disk-reprobe', action='store_true',
+                    help='проверить права токена заново, не глядя в кэш')
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', f"{MARKER}(*capabilities): тесту нужны права токена "
+                   f"({', '.join(CAPABILITIES)}); без них он пропускается")
+    config._disk_capabilities = None
+
+
+def resolve_token(config):
+    return config.getoption('--disk-token') or os.environ.get(TOKEN_ENV) or None
+
+
+def token_key(token, base_url=BASE_URL):
+    """Ключ кэша: хэш токена и адреса API, сам токен на диск не пишется"""
+    return hashlib.sha256(f'{base_url}\n{token}'.encode()).hexdigest()[:16]
+
+
+def probe_capabilities(client):
+    """Права токена за один короткий сценарий во временной папке в корне.
+
+    Возвращает {'read': bool, ..., 'status': код ответа или None,
+    'error': текст сетевой ошибки или None}.
+    """
+    result = dict.fromkeys(CAPABILITIES, False)
+    result.update(status=None, error=None)
+    probe_path = f'autotests_probe_{uuid.uuid4().hex[:8]}'
+    try:
+        info = client.get_disk_info(fields=['total_space'])
+        result['status'] = info.status_code
+        result['read'] = info.status_code == 200
+        if not result['read']:
+            return result
+        result['upload'] = client._upload_href(f'{probe_path}.txt', overwrite=True).status_code == 200
+        result['write'] = client.create_folder(probe_path).status_code == 201
+        if result['write']:
+            try:
+                result['publish'] = client.publish_resource(probe_path).status_code == 200
+            finally:
+                client.delete_resource(probe_path, permanently=True)
+    except requests.RequestException as error:
+        result['error'] = f'{type(error).__name__}: {error}'
+    return result
+
+
+def load_capabilities(cache, key, ttl, probe, reprobe=False):
+    """Права из кэша pytest (если свежие) или из probe() с сохранением.
+
+    Результат с сетевой ошибкой не кэшируется: сеть могла пропасть ненадолго.
+    cache может быть None (плагин cacheprovider выключен).
+    """
+    cache_key = f'{CACHE_PREFIX}/{key}'
+    if cache is not None and not reprobe:
+        cached = cache.get(cache_key, None)
+        if cached and time.time() - cached.get('probed_at', 0) < ttl:
+            return cached['capabilities']
+    capabilities = probe()
+    if cache is not None and capabilities.get('error') is None:
+        cache.set(cache_key, {'probed_at': time.time(), 'capabilities': capabilities})
+    return capabilities
+
+
+def missing_capabilities(item, capabilities):
+    """Права из маркеров теста, которых нет у токена"""
+    required = [name for marker in item.iter_markers(MARKER) for name in marker.args]
+    return [name for name in required if not capabilities.get(name)]
+
+
+def _capabilities(config):
+    if config._disk_capabilities is None:
+        token = resolve_token(config)
+        if token is None:
+            config._disk_capabilities = dict.fromkeys(CAPABILITIES, False)
+            config._disk_capabilities.update(status=None, error='токен не задан')
+        else:
+            base_url = config.getoption('--disk-base-url')
+
+            def probe():
+                # Без повторов: недоступная сеть не должна задерживать сборку тестов
+                with YandexDiskAPI(token, base_url=base_url,
+                                   retry_policy=RetryPolicy(max_retries=0)) as client:
+                    return probe_capabilities(client)
+
+            config._disk_capabilities = load_capabilities(
+                getattr(config, 'cache', None), token_key(token, base_url),
+                config.getoption('--disk-probe-ttl'), probe,
+                reprobe=config.getoption('--disk-reprobe'))
+    return config._disk_capabilities
+
+
+def pytest_collection_modifyitems(config, items):
+    marked = [item for item in items if item.get_closest_marker(MARKER) is not None]
+    if not marked:
+        return
+    capabilities = _capabilities(config)
+    reason = capabilities.get('error') or f"HTTP {capabilities.get('status')}"
+    for item in marked:
+        missing = missing_capabilities(item, capabilities)
+        if missing:
+            item.add_marker(pytest.mark.skip(
+                reason=f"У токена нет прав: {', '.join(missing)} ({reason})"))
+
+
+@pytest.fixture(scope='session')
+def disk_capabilities(pytestconfig):
+    """{'read': bool, 'write': bool, 'upload': bool, 'publish': bool, ...}"""
+    return _capabilities(pytestconfig)
+
+
+@pytest.fixture(scope='session')
+def disk_client(pytestconfig):
+    """Один YandexDiskAPI на сессию (на воркер xdist) с общим пулом соединений"""
+    token = resolve_token(pytestconfig)
+    if token is None:
+        pytest.skip(f'Токен не задан: --disk-token или ${TOKEN_ENV}')
+    with YandexDiskAPI(token, base_url=pytestconfig.getoption('--disk-base-url'),
+                       pool_size=SHARED_POOL_SIZE) as client:
+        yield client
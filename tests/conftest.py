@@ -1,15 +1,22 @@
 import pytest
 import tempfile
 import os
+import re
+import uuid
+import requests
 from api.client import YandexDiskAPI
+from helpers.fake_server import FakeDiskServer
 
-# ТЕСТОВЫЙ ТОКЕН с полигона 
-TEST_TOKEN = "y0_AgAAAABknB8DAAG8XgAAAADN6GpSKd66ThUOdkFdhld_Ga8N"
+# Права токена, общий клиент и маркер requires_disk (токен — --disk-token или $YANDEX_DISK_TOKEN)
+pytest_plugins = ['helpers.pytest_plugin']
+
+# Стенд токен не проверяет
+FAKE_TOKEN = "fake-token"
 
 @pytest.fixture(scope="session")
-def api_client():
-    """Фикстура с API-клиентом"""
-    return YandexDiskAPI(TEST_TOKEN)
+def api_client(disk_client):
+    """Фикстура с API-клиентом: общий на сессию, с пулом соединений"""
+    return disk_client
 
 @pytest.fixture
 def temp_file():
@@ -24,6 +31,57 @@ def temp_file():
     if os.path.exists(temp_path):
         os.unlink(temp_path)
 
+def _worker_id():
+    """Имя воркера pytest-xdist ('gw0', ...) или 'master' без xdist"""
+    return os.environ.get('PYTEST_XDIST_WORKER', 'master')
+
+@pytest.fixture(scope="session")
+def remote_root(api_client, disk_capabilities):
+    """Корень сессии на Диске: свой у каждого воркера, создаётся один раз.
+    
+    В конце сессии весь корень удаляется одним запросом вместо удаления
+    после каждого теста.
+    """
+    # Общий id прогона у всех воркеров xdist, иначе случайный
+    run_id = os.environ.get('PYTEST_XDIST_TESTRUNUID', uuid.uuid4().hex)[:12]
+    root = f"autotests_{run_id}_{_worker_id()}"
+    created = False
+    if disk_capabilities['write']:
+        try:
+            created = api_client.create_folder(root).status_code == 201
+        except requests.RequestException:
+            pass
+    
+    yield root
+    
+    if created:
+        try:
+            api_client.delete_resource(root, permanently=True)
+        except requests.RequestException:
+            pass
+
+@pytest.fixture
+def remote_path(request, remote_root):
+    """Фабрика уникальных путей теста: remote_path('test_file.txt')"""
+    test_name = re.sub(r'[^\w.-]', '_', request.node.name)
+    
+    def make(name):
+        return f"{remote_root}/{test_name}__{name}"
+    
+    return make
+
+@pytest.fixture
+def test_folder_name(remote_path):
+    return remote_path("test_folder_api")
+
+@pytest.fixture
+def fake_disk():
+    """Локальный стенд Диска: офлайн, без токена и сети"""
+    with FakeDiskServer() as server:
+        yield server
+
 @pytest.fixture
-def test_folder_name():
-    return "test_folder_api"
\ No newline at end of file
+def fake_client(fake_disk):
+    """Настоящий YandexDiskAPI, направленный на локальный стенд"""
+    with YandexDiskAPI(FAKE_TOKEN, base_url=fake_disk.base_url) as client:
+        yield client
@@ -0,0 +1,97 @@
+"""
+Тесты асинхронного клиента
+"""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from api.async_client import AsyncResponse, AsyncYandexDiskAPI
+from api.client import YandexDiskAPI
+from api.models import query_params
+
+
+@pytest.fixture
+def local_server():
+    """Локальный сервер: считает одновременные запросы и принимает PUT"""
+    state = {'active': 0, 'peak': 0, 'body': None, 'headers': None}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.05)
+            with lock:
+                state['active'] -= 1
+            self._reply(200, b'{"ok": true}')
+
+        def do_PUT(self):
+            state['headers'] = dict(self.headers)
+            state['body'] = self.rfile.read(int(self.headers['Content-Length']))
+            self._reply(201, b'')
+
+        def _reply(self, status, body):
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", state
+    server.shutdown()
+    server.server_close()
+
+
+class TestAsyncYandexDiskAPI:
+    """Общий пул, семафор конкурентности и потоковая загрузка"""
+
+    def test_semaphore_limits_in_flight_requests(self, local_server):
+        url, state = local_server
+
+        async def scenario():
+            async with AsyncYandexDiskAPI('token', concurrency=3) as client:
+                responses = await asyncio.gather(*(client._send('GET', url) for _ in range(12)))
+            return responses
+
+        responses = asyncio.run(scenario())
+        assert all(r.status_code == 200 and r.json() == {'ok': True} for r in responses)
+        assert state['peak'] <= 3
+
+    def test_upload_streams_raw_body(self, local_server, tmp_path):
+        url, state = local_server
+        path = tmp_path / 'data.bin'
+        path.write_bytes(b'abc' * 10_000)
+
+        async def scenario():
+            async with AsyncYandexDiskAPI('token') as client:
+                client._request = AsyncMock(return_value=AsyncResponse(
+                    200, {}, f'{{"href": "{url}/upload"}}'.encode(), url))
+                return await client.upload_file(str(path), 'data.bin', chunk_size=4096)
+
+        response = asyncio.run(scenario())
+        assert response.status_code == 201
+        assert state['body'] == b'abc' * 10_000
+        assert 'Transfer-Encoding' not in state['headers']
+
+    def test_bool_params_are_serialized(self):
+        """overwrite/permanently уходят в query строками"""
+        assert query_params({'path': 'a', 'overwrite': False}) == {'path': 'a', 'overwrite': 'false'}
+
+    def test_sync_client_sends_same_bools(self):
+        transport = Mock()
+        transport.request.return_value = Mock(status_code=204)
+        YandexDiskAPI('t', transport=transport).delete_resource('a', permanently=True)
+        assert transport.request.call_args.kwargs['params']['permanently'] == 'true'
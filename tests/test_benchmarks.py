@@ -0,0 +1,28 @@
+"""
+Дымовой тест бенчмарка и режима сравнения с baseline
+"""
+from api.metrics import percentile
+from benchmarks.bench_client import compare, flatten, parse_size, run
+
+
+def test_run_produces_all_metrics():
+    results = run(operations=5, sizes=['1KB', '64KB'], repeats=1)
+    flat = flatten(results)
+    for name in ('create_folder', 'get_resource_info', 'delete_resource'):
+        assert flat[f'metadata.{name}.ops_per_sec'] > 0
+        assert f'metadata.{name}.p99_ms' in flat
+    assert flat['upload.64KB.mb_per_sec'] > 0
+    assert 'peak_rss_mb' in results and 'stand_peak_rss_mb' in results
+
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {'meta': {}, 'metadata': {'get': {'ops_per_sec': 100, 'p95_ms': 10}}}
+    current = {'meta': {}, 'metadata': {'get': {'ops_per_sec': 80, 'p95_ms': 9}}}
+    regressions = compare(current, baseline, threshold=0.1)
+    assert [item['metric'] for item in regressions] == ['metadata.get.ops_per_sec']
+
+
+def test_helpers():
+    assert parse_size('64KB') == 65536
+    assert parse_size('1GB') == 1024 ** 3
+    assert percentile([1, 2, 3, 4], 0.5) == 2
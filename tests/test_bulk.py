@@ -0,0 +1,71 @@
+"""
+Тесты массового создания и удаления папок
+"""
+import threading
+from unittest.mock import Mock
+
+from api.bulk import collapse_deletes, plan_folders
+from api.client import YandexDiskAPI
+from api.paths import normalize_path
+
+
+class TestBulkPlanning:
+    """Порядок создания и схлопывание удалений"""
+
+    def test_missing_parents_are_planned(self):
+        assert plan_folders(['disk:/job/a/b', '/job/c']) == {'job', 'job/a', 'job/a/b', 'job/c'}
+
+    def test_covered_deletes_are_skipped(self):
+        roots, covered = collapse_deletes(['job/a/b', 'job', 'other', 'jobs'])
+        assert sorted(roots) == ['job', 'jobs', 'other']
+        assert covered == {'job/a/b': 'job'}
+
+    def test_collapse_many_independent_paths(self):
+        paths = [f'dir{i}/file{j}.txt' for i in range(200) for j in range(100)]
+        roots, covered = collapse_deletes(paths + ['dir0'])
+        assert len(roots) == 20000 - 100 + 1
+        assert len(covered) == 100 and set(covered.values()) == {'dir0'}
+
+    def test_normalize_path(self):
+        assert normalize_path('disk:/a/b/') == 'a/b'
+
+
+class TestBulkClient:
+    """create_folders / delete_resources на клиенте"""
+
+    def test_parents_created_before_children(self):
+        created = []
+        lock = threading.Lock()
+
+        def create_folder(path):
+            with lock:
+                created.append(path)
+            return Mock(status_code=201)
+
+        client = YandexDiskAPI('token', transport=Mock())
+        client.create_folder = create_folder
+        results = client.create_folders(['job/a/x', 'job/a/y', 'job/b'])
+
+        assert set(results) == {'job', 'job/a', 'job/b', 'job/a/x', 'job/a/y'}
+        for path in results:
+            for parent in ('job', 'job/a'):
+                if path.startswith(parent + '/'):
+                    assert created.index(parent) < created.index(path)
+
+    def test_failed_parent_skips_children(self):
+        client = YandexDiskAPI('token', transport=Mock())
+        client.create_folder = lambda path: Mock(status_code=507 if path == 'job/a' else 201)
+        results = client.create_folders(['job/a/x', 'job/b'])
+
+        assert results['job/a'].status_code == 507
+        assert results['job/a/x'] is None
+        assert results['job/b'].status_code == 201
+
+    def test_delete_shares_ancestor_result(self):
+        client = YandexDiskAPI('token', transport=Mock())
+        client.delete_resource = Mock(return_value=Mock(status_code=202))
+        results = client.delete_resources(['job/a', 'job', 'tmp'], permanently=True)
+
+        assert client.delete_resource.call_count == 2
+        client.delete_resource.assert_any_call('job', True)
+        assert results['job/a'] is results['job']
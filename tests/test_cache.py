@@ -0,0 +1,79 @@
+"""
+Тесты кэша метаданных
+"""
+import time
+from unittest.mock import Mock
+
+from api.cache import MetadataCache
+from api.client import YandexDiskAPI
+
+
+def ok(data):
+    return Mock(status_code=200, json=lambda: data)
+
+
+def make_client(cache, *responses):
+    transport = Mock()
+    transport.request.side_effect = list(responses)
+    return YandexDiskAPI('token', transport=transport, cache=cache), transport
+
+
+class TestMetadataCache:
+    def test_lru_eviction(self):
+        cache = MetadataCache(maxsize=2)
+        cache.put('a', 'a', 1)
+        cache.put('b', 'b', 2)
+        cache.lookup('a')
+        cache.put('c', 'c', 3)
+        assert cache.lookup('b') is None
+        assert cache.lookup('a').response == 1
+
+    def test_invalidate_by_prefix(self):
+        cache = MetadataCache()
+        for path in ('job', 'job/a', 'job/a/f.txt', 'jobs', 'other'):
+            cache.put(path, path, path)
+        cache.put('disk', None, 'disk')
+        cache.invalidate('disk:/job/a')
+        assert {key for key in ('job', 'job/a', 'job/a/f.txt', 'jobs', 'other', 'disk')
+                if cache.lookup(key)} == {'jobs', 'other'}
+
+
+class TestClientCache:
+    def test_repeated_info_served_from_cache(self):
+        client, transport = make_client(MetadataCache(), ok({'total_space': 1}), ok({'path': 'disk:/a'}))
+        for _ in range(3):
+            assert client.get_disk_info().json() == {'total_space': 1}
+            assert client.get_resource_info('a').json() == {'path': 'disk:/a'}
+        assert transport.request.call_count == 2
+
+    def test_mutation_invalidates(self):
+        client, transport = make_client(MetadataCache(), ok({'path': 'disk:/a'}),
+                                        Mock(status_code=201), ok({'path': 'disk:/a', 'n': 2}))
+        client.get_resource_info('a')
+        client.create_folder('a/b')
+        assert client.get_resource_info('a').json()['n'] == 2
+
+    def test_stale_entry_revalidated(self):
+        data = {'path': 'disk:/f', 'md5': 'x', 'modified': 't1', 'size': 10}
+        client, transport = make_client(MetadataCache(ttl=0.01), ok(data),
+                                        ok({'md5': 'x', 'modified': 't1'}))
+        first = client.get_resource_info('f')
+        time.sleep(0.02)
+        assert client.get_resource_info('f') is first
+        assert transport.request.call_args.kwargs['params']['fields'] == 'md5,modified'
+
+    def test_stale_folder_refetched(self):
+        listing = {'path': 'disk:/dir', 'type': 'dir', 'modified': 't1',
+                   '_embedded': {'items': [], 'total': 0}}
+        updated = dict(listing, _embedded={'items': [{'path': 'disk:/dir/f'}], 'total': 1})
+        client, transport = make_client(MetadataCache(ttl=0.01), ok(listing), ok(updated))
+        client.get_resource_info('dir')
+        time.sleep(0.02)
+        assert client.get_resource_info('dir').json()['_embedded']['total'] == 1
+        assert 'fields' not in transport.request.call_args.kwargs['params']
+
+    def test_cache_is_opt_in(self):
+        client, transport = make_client(None, ok({}), ok({}))
+        client.get_disk_info()
+        client.get_disk_info()
+        assert transport.request.call_count == 2
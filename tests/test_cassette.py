@@ -0,0 +1,97 @@
+"""
+Тесты записи и воспроизведения кассет
+"""
+import io
+import os
+import time
+
+import pytest
+
+from api.cassette import (INLINE_BODY_SIZE, CassetteMissError, CassetteTransport,
+                          cassette_key)
+from api.client import YandexDiskAPI
+from api.endpoints import DOWNLOAD_URL
+from api.metrics import MetricsCollector
+from helpers.data_generator import Payload
+from helpers.fake_server import FakeDiskServer
+
+
+def scenario(client, download_path):
+    """Типичный сценарий: папка, загрузка, метаданные, скачивание, удаление"""
+    payload = Payload(3 * INLINE_BODY_SIZE + 7, seed=4)
+    results = [
+        client.create_folder('cassette').status_code,
+        client.upload_stream(payload, 'cassette/data.bin', length=len(payload)).status_code,
+        client.get_resource_info('cassette/data.bin').json()['size'],
+        client.download_file('cassette/data.bin', download_path,
+                             segment_size=INLINE_BODY_SIZE).status_code,
+        client.delete_resource('cassette/data.bin').status_code,
+        client.get_resource_info('cassette/data.bin').status_code,
+    ]
+    with open(download_path, 'rb') as f:
+        assert f.read() == payload.read_all()
+    return results
+
+
+class TestCassette:
+    def test_key_is_order_independent(self):
+        assert cassette_key('get', 'u', {'b': 1, 'a': True}) == \
+            cassette_key('GET', 'u', {'a': True, 'b': 1})
+        assert cassette_key('GET', 'u', headers={'Range': 'bytes=0-0'}) != cassette_key('GET', 'u')
+
+    def test_record_then_replay_offline(self, tmp_path):
+        path = str(tmp_path / 'cassettes' / 'scenario')
+        with FakeDiskServer() as server:
+            with CassetteTransport(path) as transport:
+                assert transport.mode == 'record'
+                client = YandexDiskAPI('t', base_url=server.base_url, transport=transport)
+                recorded = scenario(client, str(tmp_path / 'recorded.bin'))
+            base_url = server.base_url
+        assert os.path.exists(path + '.index.json')
+
+        # Сервер остановлен: всё отвечает кассета
+        with CassetteTransport(path) as transport:
+            assert transport.mode == 'replay'
+            client = YandexDiskAPI('t', base_url=base_url, transport=transport)
+            assert scenario(client, str(tmp_path / 'replayed.bin')) == recorded
+        assert recorded[-1] == 404
+
+    def test_identical_bodies_stored_once(self, tmp_path):
+        path = str(tmp_path / 'dedup')
+        with FakeDiskServer() as server, CassetteTransport(path) as transport:
+            client = YandexDiskAPI('t', base_url=server.base_url, transport=transport)
+            client.create_folder('a')
+            size_after_first = os.path.getsize(path + '.bodies')
+            for _ in range(5):
+                client.get_resource_info('a')
+            assert os.path.getsize(path + '.bodies') - size_after_first <= 1024
+
+    def test_large_body_streamed_from_disk(self, tmp_path):
+        path = str(tmp_path / 'stream')
+        payload = Payload(INLINE_BODY_SIZE * 4, seed=9)
+        with FakeDiskServer() as server, CassetteTransport(path) as transport:
+            client = YandexDiskAPI('t', base_url=server.base_url, transport=transport)
+            client.upload_stream(payload, 'big.bin', length=len(payload))
+            href = client._request('GET', DOWNLOAD_URL, params={'path': 'big.bin'}).json()['href']
+            transport.request('GET', href, stream=True).close()
+        with CassetteTransport(path, mode='replay') as transport:
+            response = transport.request('GET', href, stream=True)
+            assert isinstance(response.raw, io.RawIOBase)
+            assert b''.join(response.iter_content(4096)) == payload.read_all()
+            response.close()
+
+    def test_miss_and_timing(self, tmp_path):
+        path = str(tmp_path / 'timing')
+        with FakeDiskServer(latency=0.05) as server:
+            with CassetteTransport(path, mode='record') as transport:
+                YandexDiskAPI('t', base_url=server.base_url, transport=transport).get_disk_info()
+            base_url = server.base_url
+        metrics = MetricsCollector()
+        with CassetteTransport(path, mode='replay', timing=1.0) as transport:
+            client = YandexDiskAPI('t', base_url=base_url, transport=transport, metrics=metrics)
+            started = time.perf_counter()
+            assert client.get_disk_info().status_code == 200
+            assert time.perf_counter() - started >= 0.04
+            with pytest.raises(CassetteMissError):
+                client.get_resource_info('unknown')
+        assert metrics.to_json()['requests'][0]['count'] == 1
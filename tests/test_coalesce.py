@@ -0,0 +1,127 @@
+"""
+Тесты склейки одинаковых одновременных запросов
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.client import YandexDiskAPI
+from api.coalesce import AsyncSingleFlight, SingleFlight, request_key
+from api.throttle import RequestStats
+from helpers.fake_server import FakeDiskServer
+
+
+class TestSingleFlight:
+    def test_key_ignores_param_order(self):
+        assert request_key('get', 'u', {'a': 1, 'b': True}) == \
+            request_key('GET', 'u', {'b': True, 'a': 1})
+        assert request_key('GET', 'u', {'a': 1}) != request_key('GET', 'u', {'a': 2})
+
+    def test_concurrent_calls_share_result(self):
+        stats = RequestStats()
+        flight = SingleFlight(stats)
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return object()
+
+        def worker():
+            barrier.wait()
+            return flight.do('key', slow)
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: worker(), range(8)))
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert stats['coalesced'] == 7
+        assert flight.in_flight() == 0
+
+    def test_error_propagates_and_key_is_released(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            flight.do('key', fail)
+        assert flight.do('key', lambda: 42) == 42
+
+    def test_async_calls_share_result(self):
+        stats = RequestStats()
+        flight = AsyncSingleFlight(stats)
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def scenario():
+            waiters = [asyncio.ensure_future(flight.do('key', slow)) for _ in range(5)]
+            await asyncio.sleep(0)
+            waiters[0].cancel()
+            return await asyncio.gather(*waiters[1:])
+
+        assert asyncio.run(scenario()) == ['result'] * 4
+        assert len(calls) == 1
+        assert stats['coalesced'] == 4
+
+
+class TestClientCoalescing:
+    def _burst(self, client, call, count=10):
+        barrier = threading.Barrier(count)
+
+        def worker(_):
+            barrier.wait()
+            return call()
+
+        with ThreadPoolExecutor(count) as pool:
+            return list(pool.map(worker, range(count)))
+
+    def test_identical_gets_share_one_request(self):
+        with FakeDiskServer(latency=0.1) as server, \
+                YandexDiskAPI('t', base_url=server.base_url, coalesce=True) as client:
+            client.create_folder('shared')
+            before = server.requests
+            responses = self._burst(client, lambda: client.get_resource_info('shared'))
+            assert all(response.status_code == 200 for response in responses)
+            assert server.requests - before == 1
+            assert client.stats['coalesced'] == 9
+
+    def test_different_params_are_not_merged(self):
+        with FakeDiskServer(latency=0.05) as server, \
+                YandexDiskAPI('t', base_url=server.base_url, coalesce=True) as client:
+            client.create_folder('a')
+            client.create_folder('b')
+            before = server.requests
+            self._burst(client, lambda: [client.get_resource_info('a'),
+                                         client.get_resource_info('b')], count=4)
+            assert server.requests - before == 2
+
+    def test_disabled_by_default(self):
+        with FakeDiskServer(latency=0.05) as server, \
+                YandexDiskAPI('t', base_url=server.base_url) as client:
+            before = server.requests
+            self._burst(client, client.get_disk_info, count=4)
+            assert server.requests - before == 4
+
+    def test_async_client(self):
+        pytest.importorskip('aiohttp')
+        from api.async_client import AsyncYandexDiskAPI
+
+        async def scenario(base_url):
+            async with AsyncYandexDiskAPI('t', base_url=base_url, coalesce=True) as client:
+                responses = await asyncio.gather(*(client.get_disk_info() for _ in range(10)))
+                return responses, client.stats['coalesced']
+
+        with FakeDiskServer(latency=0.05) as server:
+            responses, coalesced = asyncio.run(scenario(server.base_url))
+            assert all(response.status_code == 200 for response in responses)
+            assert server.requests == 1
+            assert coalesced == 9
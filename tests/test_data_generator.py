@@ -0,0 +1,68 @@
+"""
+Тесты генератора синтетических данных
+"""
+import os
+import random
+import zlib
+
+import pytest
+
+from helpers.data_generator import (Payload, fixed_size, generate_tree, lognormal_sizes,
+                                    tree_spec, write_file)
+
+
+class TestPayload:
+    @pytest.mark.parametrize('size', [0, 1, 65536, 65537, 3 * 1024 * 1024 + 5])
+    def test_exact_size(self, size):
+        payload = Payload(size, seed=1)
+        assert len(payload) == size
+        assert sum(len(chunk) for chunk in payload) == size
+
+    def test_deterministic(self):
+        assert Payload(200_000, seed=7).md5() == Payload(200_000, seed=7).md5()
+        assert Payload(200_000, seed=7).md5() != Payload(200_000, seed=8).md5()
+
+    def test_chunks_are_views_of_shared_buffer(self):
+        chunks = list(Payload(300_000, seed=1))
+        assert all(isinstance(chunk, memoryview) for chunk in chunks)
+        assert chunks[0].obj is chunks[1].obj
+
+    def test_compressible_mix(self):
+        def ratio(compressible):
+            data = Payload(1024 * 1024, seed=3, compressible=compressible).read_all()
+            return len(zlib.compress(data)) / len(data)
+
+        assert ratio(0.0) > 0.99
+        assert ratio(1.0) < 0.5
+        assert ratio(0.0) > ratio(0.5) > ratio(1.0)
+
+    def test_write_file(self, tmp_path):
+        path = tmp_path / 'payload.bin'
+        assert write_file(path, 100_000, seed=2) == 100_000
+        assert path.read_bytes() == Payload(100_000, seed=2).read_all()
+
+
+class TestTree:
+    def test_spec_shape(self):
+        folders, files = tree_spec(depth=2, fanout=3, files_per_dir=4, sizes=fixed_size(10))
+        assert len(folders) == 3 + 9
+        assert len(files) == 4 * (1 + 3 + 9)
+        assert folders.index('dir_00') < folders.index('dir_00/dir_02')
+        assert all(size == 10 for _, size, _ in files)
+
+    def test_spec_is_deterministic(self):
+        assert tree_spec(seed=5) == tree_spec(seed=5)
+        assert tree_spec(seed=5) != tree_spec(seed=6)
+
+    def test_lognormal_bounds(self):
+        sample = lognormal_sizes(median=1000, sigma=2.0, min_size=10, max_size=5000)
+        rng = random.Random(0)
+        sizes = [sample(rng) for _ in range(1000)]
+        assert min(sizes) >= 10 and max(sizes) <= 5000
+
+    def test_generate_tree(self, tmp_path):
+        files = generate_tree(tmp_path, depth=1, fanout=2, files_per_dir=3,
+                              sizes=lognormal_sizes(median=2048, max_size=64 * 1024))
+        assert len(files) == 9
+        for rel_path, size in files:
+            assert os.path.getsize(tmp_path / rel_path) == size
@@ -0,0 +1,55 @@
+"""
+Тесты диагностического CLI на локальном стенде
+"""
+import json
+import socket
+
+import diagnose
+from helpers.fake_server import FakeDiskServer
+
+
+def _run(tmp_path, *args):
+    output = tmp_path / 'report.json'
+    code = diagnose.main([*args, '--samples', '5', '--output', str(output)])
+    return code, json.loads(output.read_text())
+
+
+class TestDiagnose:
+    def test_healthy(self, tmp_path, fake_disk):
+        code, report = _run(tmp_path, '--token', 't', '--base-url', fake_disk.base_url)
+        assert code == diagnose.EXIT_OK and report['ok']
+        checks = report['checks']
+        assert checks['api']['status'] == 200
+        assert checks['upload_href']['ok']
+        assert checks['latency']['pooled']['samples'] == 5
+        assert checks['latency']['pooled']['new_connections'] == 0
+        assert checks['latency']['fresh']['new_connections'] == 5
+        assert set(checks['latency']['fresh']['total']) == {'p50_ms', 'p95_ms', 'p99_ms'}
+
+    def test_bad_token(self, tmp_path):
+        with FakeDiskServer(token='good') as server:
+            code, report = _run(tmp_path, '--token', 'bad', '--base-url', server.base_url)
+        assert code == diagnose.EXIT_AUTH
+        assert report['checks']['api']['status'] == 401
+        assert 'hint' in report['checks']['api']
+
+    def test_unreachable(self, tmp_path):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        code, report = _run(tmp_path, '--token', 't', '--timeout', '1',
+                            '--base-url', f'http://127.0.0.1:{port}/v1/disk')
+        assert code == diagnose.EXIT_UNREACHABLE
+        assert 'error' in report['checks']['api']
+
+    def test_token_from_env(self, tmp_path, fake_disk, monkeypatch):
+        monkeypatch.setenv(diagnose.TOKEN_ENV, 't')
+        code, _ = _run(tmp_path, '--base-url', fake_disk.base_url)
+        assert code == diagnose.EXIT_OK
+
+    def test_missing_token(self, monkeypatch):
+        monkeypatch.delenv(diagnose.TOKEN_ENV, raising=False)
+        assert diagnose.main([]) == diagnose.EXIT_USAGE
+
+    def test_zero_samples(self):
+        assert diagnose.main(['--token', 't', '--samples', '0']) == diagnose.EXIT_USAGE
@@ -6,6 +6,7 @@ import pytest
 class TestYandexDiskAPI:
     """Тесты REST API Яндекс.Диска с адаптацией под права токена"""
     
+    @pytest.mark.requires_disk('read')
     def test_get_disk_info(self, api_client):
         """GET: Получение информации о диске"""
         response = api_client.get_disk_info()
@@ -34,14 +35,10 @@ class TestYandexDiskAPI:
             print(f"GET: Неожиданный статус {status}")
             assert status in [200, 401, 403, 429, 500]
     
-    def test_create_and_delete_folder(self, api_client):
+    @pytest.mark.requires_disk('write')
+    def test_create_and_delete_folder(self, api_client, remote_path):
         """PUT и DELETE: Создание и удаление папки"""
-        folder_name = "test_folder_api"
-        
-        # Сначала проверяем доступ
-        info_response = api_client.get_disk_info()
-        if info_response and info_response.status_code != 200:
-            pytest.skip(f"Токен невалиден для операций (код: {info_response.status_code})")
+        folder_name = remote_path("test_folder_api")
         
         # PUT - создание
         create_response = api_client.create_folder(folder_name)
@@ -68,13 +65,9 @@ class TestYandexDiskAPI:
         else:
             print(f" PUT: Неожиданный статус {create_status}")
     
-    def test_upload_and_delete_file(self, api_client):
+    @pytest.mark.requires_disk('upload', 'write')
+    def test_upload_and_delete_file(self, api_client, remote_path):
         """PUT через получение ссылки и DELETE: Загрузка и удаление файла"""
-        # Проверяем доступ
-        info_response = api_client.get_disk_info()
-        if not info_response or info_response.status_code != 200:
-            pytest.skip("Токен невалиден для операций с файлами")
-        
         # Создаем тестовый файл в памяти
         import tempfile
         with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
@@ -82,7 +75,7 @@ class TestYandexDiskAPI:
             temp_path = f.name
         
         try:
-            disk_path = "test_file.txt"
+            disk_path = remote_path("test_file.txt")
             
             # Загрузка файла
             upload_response = api_client.upload_file(temp_path, disk_path)
@@ -115,13 +108,10 @@ class TestYandexDiskAPI:
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
     
-    def test_publish_resource(self, api_client):
+    @pytest.mark.requires_disk('write', 'publish')
+    def test_publish_resource(self, api_client, remote_path):
         """PUT: Публикация ресурса"""
-        info_response = api_client.get_disk_info()
-        if not info_response or info_response.status_code != 200:
-            pytest.skip("Токен невалиден для операции публикации")
-        
-        folder_name = "test_publish_folder"
+        folder_name = remote_path("test_publish_folder")
         
         # Создаем папку
         api_client.create_folder(folder_name)
@@ -130,7 +120,6 @@ class TestYandexDiskAPI:
         publish_response = api_client.publish_resource(folder_name)
         
         if publish_response is None:
-            api_client.delete_resource(folder_name)
             pytest.skip("Нет ответа при публикации")
         
         publish_status = publish_response.status_code
@@ -142,18 +131,14 @@ class TestYandexDiskAPI:
         
         print(f" Publish: получен статус {publish_status}")
         
-        # Очистка
-        api_client.delete_resource(folder_name)
+        # Очистка — общим удалением корня сессии (remote_root)
     
-    def test_complete_workflow(self, api_client):
+    @pytest.mark.requires_disk('write', 'upload')
+    def test_complete_workflow(self, api_client, remote_path):
         """Полный workflow: создание папки, загрузка файла, проверка, удаление"""
-        info_response = api_client.get_disk_info()
-        if not info_response or info_response.status_code != 200:
-            pytest.skip("Токен невалиден для полного workflow")
-        
         print("\n Запуск полного workflow...")
         
-        folder_name = "workflow_test_folder"
+        folder_name = remote_path("workflow_test_folder")
         file_in_folder = f"{folder_name}/workflow_file.txt"
         
         # 1. Создаем папку
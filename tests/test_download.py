@@ -0,0 +1,96 @@
+"""
+Тесты скачивания файла Range-сегментами
+"""
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from api.client import YandexDiskAPI
+from api.download import SIDECAR_SUFFIX
+
+PAYLOAD = os.urandom(100_000)
+
+
+@pytest.fixture
+def range_server():
+    """Локальный файловый сервер с поддержкой Range и сбоем по запросу"""
+    state = {'ranges': [], 'fail_from': None}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+            if not match:
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(PAYLOAD)))
+                self.end_headers()
+                self.wfile.write(PAYLOAD)
+                return
+            start, end = int(match.group(1)), int(match.group(2))
+            state['ranges'].append(start)
+            if state['fail_from'] is not None and start >= state['fail_from']:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = PAYLOAD[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(PAYLOAD)}')
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/file", state
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(href):
+    client = YandexDiskAPI('token')
+    client._request = Mock(return_value=Mock(status_code=200, json=lambda: {'href': href}))
+    return client
+
+
+class TestRangedDownload:
+    """Параллельные сегменты, предвыделение файла и докачка"""
+
+    def test_segments_are_assembled(self, tmp_path, range_server):
+        href, state = range_server
+        target = str(tmp_path / 'out.bin')
+        with make_client(href) as client:
+            response = client.download_file('file.bin', target, segment_size=16_384, workers=4)
+
+        assert response.status_code == 200
+        with open(target, 'rb') as f:
+            assert f.read() == PAYLOAD
+        assert not os.path.exists(target + SIDECAR_SUFFIX)
+        # Пробный запрос + 7 сегментов по 16 KB
+        assert len(state['ranges']) == 1 + 7
+
+    def test_interrupted_download_resumes(self, tmp_path, range_server):
+        href, state = range_server
+        target = str(tmp_path / 'out.bin')
+        state['fail_from'] = 50_000
+        with make_client(href) as client:
+            with pytest.raises(requests.HTTPError):
+                client.download_file('file.bin', target, segment_size=10_000, workers=1)
+            assert os.path.exists(target + SIDECAR_SUFFIX)
+
+            state['fail_from'] = None
+            state['ranges'].clear()
+            client.download_file('file.bin', target, segment_size=10_000, workers=2)
+
+        with open(target, 'rb') as f:
+            assert f.read() == PAYLOAD
+        # Повторно качаются только сегменты с 50 000 байта
+        assert sorted(state['ranges'][1:]) == list(range(50_000, 100_000, 10_000))
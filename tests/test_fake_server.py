@@ -0,0 +1,93 @@
+"""
+Настоящий YandexDiskAPI против локального стенда: весь HTTP-стек без сети
+"""
+import hashlib
+import os
+
+from api.throttle import RetryPolicy
+from api.client import YandexDiskAPI
+from api.endpoints import DOWNLOAD_URL
+from helpers.fake_server import FakeDiskServer
+
+
+class TestFakeDiskServer:
+    """Эндпоинты из api/endpoints.py на стенде"""
+
+    def test_disk_info(self, fake_client):
+        response = fake_client.get_disk_info()
+        assert response.status_code == 200
+        assert {'total_space', 'used_space', 'system_folders'} <= set(response.json())
+
+    def test_folder_lifecycle(self, fake_client):
+        assert fake_client.create_folder('test_folder_api').status_code == 201
+        assert fake_client.create_folder('test_folder_api').status_code == 409
+        assert fake_client.create_folder('missing/child').status_code == 409
+        assert fake_client.get_resource_info('test_folder_api').json()['type'] == 'dir'
+        assert fake_client.delete_resource('test_folder_api').status_code == 204
+        assert fake_client.get_resource_info('test_folder_api').status_code == 404
+
+    def test_upload_download_roundtrip(self, fake_client, tmp_path):
+        payload = os.urandom(200_000)
+        source = tmp_path / 'source.bin'
+        source.write_bytes(payload)
+
+        assert fake_client.upload_file(str(source), 'file.bin').status_code == 201
+        assert fake_client.upload_file(str(source), 'file.bin').status_code == 409
+        info = fake_client.get_resource_info('file.bin').json()
+        assert info['size'] == len(payload)
+
+        target = tmp_path / 'target.bin'
+        fake_client.download_file('file.bin', str(target), segment_size=64 * 1024)
+        assert target.read_bytes() == payload
+
+    def test_discard_bodies_keeps_only_digest(self):
+        payload = os.urandom(300_000)
+        with FakeDiskServer(discard_bodies=True) as server:
+            with YandexDiskAPI('t', base_url=server.base_url) as client:
+                assert client.upload_stream(iter([payload]), 'file.bin').status_code == 201
+                info = client.get_resource_info('file.bin').json()
+                link = client._request('GET', DOWNLOAD_URL, params={'path': 'file.bin'})
+                assert link.status_code == 404
+            assert server.state.nodes['file.bin'].data == b''
+        assert info['size'] == len(payload)
+        assert info['md5'] == hashlib.md5(payload).hexdigest()
+
+    def test_non_empty_delete_is_async(self, fake_client, fake_disk):
+        fake_client.create_folders(['workflow_test_folder/sub'])
+        response = fake_client.delete_resource('workflow_test_folder')
+        assert response.status_code == 202
+        fake_client.operations.poll_interval = 0.01
+        assert fake_client.wait_operation(response, timeout=5) == 'success'
+
+    def test_publish(self, fake_client):
+        fake_client.create_folder('test_publish_folder')
+        assert fake_client.publish_resource('test_publish_folder').status_code == 200
+        assert 'public_url' in fake_client.get_resource_info('test_publish_folder').json()
+
+    def test_listing_pages_and_fields(self, fake_client, tmp_path):
+        fake_client.create_folder('big')
+        source = tmp_path / 'f.txt'
+        source.write_bytes(b'x')
+        for i in range(25):
+            fake_client.upload_file(str(source), f'big/f{i:02}.txt')
+        items = list(fake_client.iter_dir('big', fields=['name'], page_size=10))
+        assert [item['name'] for item in items] == [f'f{i:02}.txt' for i in range(25)]
+        assert items[0] == {'name': 'f00.txt'}
+
+
+class TestFakeDiskInjection:
+    """Задержка и 429 на стенде"""
+
+    def test_throttling_is_retried(self):
+        with FakeDiskServer(throttle_rate=0.3, seed=1) as server:
+            with YandexDiskAPI('token', base_url=server.base_url,
+                               retry_policy=RetryPolicy(max_retries=10)) as client:
+                statuses = [client.get_disk_info().status_code for _ in range(20)]
+        assert statuses == [200] * 20
+        assert server.throttled > 0
+        assert client.stats['retried'] == server.throttled
+
+    def test_token_is_checked(self):
+        with FakeDiskServer(token='secret') as server:
+            with YandexDiskAPI('wrong', base_url=server.base_url) as client:
+                assert client.get_disk_info().status_code == 401
@@ -0,0 +1,50 @@
+"""
+Тесты постраничного обхода папки
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from api.client import YandexDiskAPI
+from api.listing import item_fields
+
+
+class FakeFolder:
+    """Папка из total элементов, отдаёт страницы по limit/offset"""
+
+    def __init__(self, total):
+        self.total = total
+        self.offsets = []
+
+    def __call__(self, method, url, headers=None, params=None, **kwargs):
+        self.offsets.append(params['offset'])
+        self.last_params = params
+        stop = min(params['offset'] + params['limit'], self.total)
+        items = [{'name': f'f{i}'} for i in range(params['offset'], stop)]
+        return Mock(status_code=200, json=lambda: {'_embedded': {'items': items}})
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_iter_dir_walks_all_pages(prefetch):
+    folder = FakeFolder(total=250)
+    client = YandexDiskAPI('token', transport=Mock(request=folder))
+    names = [item['name'] for item in client.iter_dir('big', page_size=100, prefetch=prefetch)]
+
+    assert names == [f'f{i}' for i in range(250)]
+    assert folder.offsets == [0, 100, 200]
+
+
+def test_iter_dir_is_lazy():
+    folder = FakeFolder(total=1000)
+    client = YandexDiskAPI('token', transport=Mock(request=folder))
+    items = client.iter_dir('big', page_size=10, prefetch=False)
+    next(items)
+    assert folder.offsets == [0]
+
+
+def test_fields_projection():
+    folder = FakeFolder(total=1)
+    client = YandexDiskAPI('token', transport=Mock(request=folder))
+    list(client.iter_dir('dir', fields=['name', 'size']))
+    assert folder.last_params['fields'] == '_embedded.items.name,_embedded.items.size'
+    assert item_fields('name,_embedded.total') == '_embedded.items.name,_embedded.total'
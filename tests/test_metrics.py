@@ -0,0 +1,77 @@
+"""
+Тесты метрик запросов и экспортёров
+"""
+import json
+
+import pytest
+
+from api.client import YandexDiskAPI
+from api.endpoints import BASE_URL, OPERATIONS_URL, RESOURCES_URL
+from api.metrics import Histogram, MetricsCollector, endpoint_template
+
+
+class TestEndpointTemplate:
+    def test_templates(self):
+        assert endpoint_template('GET', BASE_URL) == 'BASE_URL'
+        assert endpoint_template('GET', RESOURCES_URL + '?path=a') == 'RESOURCES_URL'
+        assert endpoint_template('GET', 'http://127.0.0.1:1/v1/disk/resources/upload') == 'FILES_URL'
+        assert endpoint_template('GET', OPERATIONS_URL + '/123') == 'OPERATIONS_URL'
+        assert endpoint_template('PUT', 'https://uploader1.disk.yandex.net/upload-target/x') == 'UPLOAD_HREF'
+
+
+class TestHistogram:
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value)
+        assert histogram.cumulative() == [(0.1, 1), (1.0, 3), ('+Inf', 4)]
+
+
+class TestClientMetrics:
+    def test_phases_and_exporters(self, fake_disk, tmp_path):
+        metrics = MetricsCollector()
+        source = tmp_path / 'f.bin'
+        source.write_bytes(b'x' * 1000)
+        with YandexDiskAPI('token', base_url=fake_disk.base_url, metrics=metrics) as client:
+            events = []
+            client.transport.add_hook(events.append)
+            client.get_disk_info()
+            client.get_disk_info()
+            client.upload_file(str(source), 'f.bin')
+
+        # Новое соединение только у первого запроса к API
+        assert events[0].dns is not None and events[0].connect is not None
+        assert events[1].dns is None and events[1].connect is None
+        assert events[0].ttfb is not None and events[0].bytes_received > 0
+        # Фазы не пересекаются: dns и connect не входят в ttfb
+        first = events[0]
+        assert first.dns + first.connect + (first.tls or 0) + first.ttfb + first.transfer \
+            == pytest.approx(first.duration, abs=1e-6)
+        upload = [e for e in events if e.endpoint == 'UPLOAD_HREF'][0]
+        assert upload.bytes_sent == 1000 and upload.status == 201
+
+        snapshot = json.loads(metrics.to_json_text())
+        counts = {(r['endpoint'], r['status']): r['count'] for r in snapshot['requests']}
+        assert counts[('BASE_URL', '200')] == 2
+        assert counts[('FILES_URL', '200')] == 1
+
+        text = metrics.to_prometheus()
+        assert 'yadisk_request_duration_seconds_count{endpoint="BASE_URL",method="GET"} 2' in text
+        assert 'yadisk_request_bytes_total{endpoint="UPLOAD_HREF",direction="sent"} 1000' in text
+        assert 'phase="connect"' in text and 'phase="dns"' in text
+
+    def test_chunked_upload_counts_sent_bytes(self, fake_disk):
+        metrics = MetricsCollector()
+        with YandexDiskAPI('token', base_url=fake_disk.base_url, metrics=metrics) as client:
+            events = []
+            client.transport.add_hook(events.append)
+            client.upload_stream(iter([b'a' * 300, b'b' * 700]), 'stream.bin')
+
+        upload = [e for e in events if e.endpoint == 'UPLOAD_HREF'][0]
+        assert upload.bytes_sent == 1000 and upload.status == 201
+        assert 'yadisk_request_bytes_total{endpoint="UPLOAD_HREF",direction="sent"} 1000' \
+            in metrics.to_prometheus()
+
+    def test_disabled_by_default(self, fake_client):
+        assert fake_client.transport.hooks == []
+        assert fake_client.get_disk_info().status_code == 200
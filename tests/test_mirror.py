@@ -0,0 +1,125 @@
+"""
+Тесты локального зеркала метаданных
+"""
+import hashlib
+import time
+
+import pytest
+
+from api.client import YandexDiskAPI
+
+
+def _upload(client, path, data):
+    assert client.upload_stream(data, path).status_code == 201
+
+
+@pytest.fixture
+def populated(fake_client):
+    fake_client.create_folders(['docs', 'docs/old', 'photos'])
+    _upload(fake_client, 'docs/a.txt', b'a' * 10)
+    _upload(fake_client, 'docs/old/b.txt', b'b' * 20)
+    _upload(fake_client, 'photos/cat.jpg', b'c' * 30)
+    _upload(fake_client, 'photos/copy.txt', b'a' * 10)
+    return fake_client
+
+
+class TestEndpoints:
+    def test_iter_files_is_flat_and_paged(self, populated):
+        items = list(populated.iter_files(fields=['path', 'size'], page_size=3))
+        assert [item['path'] for item in items] == [
+            'disk:/docs/a.txt', 'disk:/docs/old/b.txt', 'disk:/photos/cat.jpg',
+            'disk:/photos/copy.txt']
+        assert set(items[0]) == {'path', 'size'}
+
+    def test_last_uploaded_newest_first(self, populated):
+        items = populated.get_last_uploaded(limit=2, fields=['path']).json()['items']
+        assert [item['path'] for item in items] == ['disk:/photos/copy.txt',
+                                                     'disk:/photos/cat.jpg']
+
+
+class TestMirror:
+    def test_queries_served_locally(self, populated, fake_disk):
+        mirror = populated.open_mirror()
+        assert len(mirror) == 4
+        before = fake_disk.requests
+        assert mirror.exists('docs/old/b.txt')
+        assert mirror.exists('/docs/old')
+        assert not mirror.exists('docs/missing.txt')
+        assert mirror.md5('disk:/docs/a.txt') == hashlib.md5(b'a' * 10).hexdigest()
+        assert mirror.size('docs') == 30
+        assert mirror.size('') == 70
+        assert mirror.size('photos/cat.jpg') == 30
+        assert mirror.find_by_md5(hashlib.md5(b'a' * 10).hexdigest()) == [
+            'docs/a.txt', 'photos/copy.txt']
+        assert fake_disk.requests == before
+
+    def test_point_query_is_fast(self, populated):
+        mirror = populated.open_mirror()
+        started = time.perf_counter()
+        for _ in range(1000):
+            mirror.md5('docs/old/b.txt')
+        assert (time.perf_counter() - started) / 1000 < 0.001
+
+    def test_own_changes_go_live(self, populated):
+        mirror = populated.open_mirror()
+        populated.delete_resource('docs/a.txt')
+        assert not mirror.exists('docs/a.txt')
+        _upload(populated, 'docs/new.txt', b'n' * 5)
+        assert mirror.size('docs/new.txt') == 5
+        assert mirror.size('docs') == 25
+
+    def test_own_changes_affect_root(self, fake_client):
+        fake_client.create_folder('d')
+        _upload(fake_client, 'd/a.bin', b'a' * 10)
+        mirror = fake_client.open_mirror(max_age=3600)
+        _upload(fake_client, 'd/b.bin', b'b' * 100)
+        assert mirror.size('') == 110
+        assert mirror.size('d') == 110
+
+    def test_many_own_changes_keep_queries_fast(self, populated):
+        mirror = populated.open_mirror(max_age=3600)
+        for i in range(20000):
+            mirror.invalidate(f'scratch/{i}/file.txt')
+        started = time.perf_counter()
+        for _ in range(1000):
+            mirror.md5('docs/old/b.txt')
+        assert (time.perf_counter() - started) / 1000 < 0.001
+
+    def test_incremental_refresh_picks_up_foreign_uploads(self, populated, fake_disk):
+        mirror = populated.open_mirror(max_age=3600)
+        # Файл загружен "другим клиентом": зеркало о нём не знает
+        with YandexDiskAPI('other', base_url=fake_disk.base_url) as other:
+            time.sleep(1.1)  # modified у стенда с точностью до секунды
+            _upload(other, 'photos/dog.jpg', b'd' * 40)
+        assert not mirror.exists('photos/dog.jpg')
+        assert mirror.exists('photos/dog.jpg', max_age=0)
+        assert mirror.size('photos', max_age=3600) == 80
+
+    def test_foreign_delete_bounded_by_rebuild_unless_verified(self, populated, fake_disk):
+        mirror = populated.open_mirror(max_age=3600)
+        with YandexDiskAPI('other', base_url=fake_disk.base_url) as other:
+            other.delete_resource('photos/cat.jpg')
+        # last-uploaded удалений не показывает: до полной сборки путь "есть"
+        assert mirror.exists('photos/cat.jpg', max_age=0)
+        assert not mirror.exists('photos/cat.jpg', max_age=0, verify=True)
+        # Ответ API уже записан в зеркало
+        assert not mirror.exists('photos/cat.jpg')
+
+    def test_window_overflow_triggers_rebuild(self, populated, fake_disk):
+        mirror = populated.open_mirror(max_age=3600)
+        mirror.recent_limit = 2
+        with YandexDiskAPI('other', base_url=fake_disk.base_url) as other:
+            time.sleep(1.1)
+            for i in range(3):
+                _upload(other, f'docs/bulk_{i}.txt', b'x')
+        built_at = mirror.built_at
+        mirror.refresh()
+        assert mirror.built_at > built_at
+        assert len(mirror) == 7
+
+    def test_persisted_mirror_is_reused(self, populated, tmp_path):
+        path = str(tmp_path / 'mirror.sqlite')
+        populated.open_mirror(path).close()
+        populated.mirror = None
+        mirror = populated.open_mirror(path)
+        assert mirror.built_at is not None and len(mirror) == 4
@@ -0,0 +1,47 @@
+"""
+Тесты моделей ответов и проекции fields
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from api.models import DiskInfo, Link, Resource
+
+
+class TestModels:
+    def test_slots_without_instance_dict(self):
+        resource = Resource({'name': 'a'})
+        assert not hasattr(resource, '__dict__')
+        with pytest.raises(AttributeError):
+            resource.extra = 1
+
+    def test_json_parsed_lazily(self):
+        response = Mock(status_code=200)
+        response.json.return_value = {'total_space': 10, 'used_space': 4}
+        info = DiskInfo.from_response(response)
+        response.json.assert_not_called()
+        assert info.free_space == 6
+        assert info.used_space == 4
+        response.json.assert_called_once()
+
+    def test_non_200_gives_none(self):
+        assert Link.from_response(Mock(status_code=404)) is None
+
+
+class TestFieldsProjection:
+    def test_resource_projection(self, fake_client, tmp_path):
+        source = tmp_path / 'f.txt'
+        source.write_bytes(b'hello')
+        fake_client.create_folder('dir')
+        fake_client.upload_file(str(source), 'dir/f.txt')
+
+        response = fake_client.get_resource_info('dir', fields=['name', '_embedded.items.name',
+                                                                '_embedded.items.size'])
+        folder = Resource.from_response(response)
+        assert folder.data == {'name': 'dir', '_embedded': {'items': [{'name': 'f.txt', 'size': 5}]}}
+        assert [(item.name, item.size, item.md5) for item in folder.items] == [('f.txt', 5, None)]
+
+    def test_disk_info_projection(self, fake_client):
+        info = DiskInfo.from_response(fake_client.get_disk_info(fields='total_space'))
+        assert info.total_space > 0
+        assert info.used_space is None
@@ -0,0 +1,97 @@
+"""
+Тесты планировщика асинхронных операций
+"""
+import asyncio
+import threading
+from unittest.mock import Mock
+
+from api.client import YandexDiskAPI
+from api.operations import OperationTracker
+
+
+def accepted(href):
+    return Mock(status_code=202, json=lambda: {'href': href, 'method': 'GET'})
+
+
+class FakeStatuses:
+    """Операция завершается после заданного числа опросов"""
+
+    def __init__(self, polls_needed, final='success'):
+        self.polls_needed = polls_needed
+        self.final = final
+        self.polls = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, method, url):
+        with self.lock:
+            count = self.polls[url] = self.polls.get(url, 0) + 1
+        status = self.final if count >= self.polls_needed else 'in-progress'
+        return Mock(status_code=200, json=lambda: {'status': status})
+
+
+class TestOperationTracker:
+    """Futures, общий планировщик и бэкофф"""
+
+    def test_many_operations_complete(self):
+        statuses = FakeStatuses(polls_needed=3)
+        tracker = OperationTracker(statuses, poll_interval=0.01, backoff=1.5)
+        futures = [tracker.track(accepted(f'https://op/{i}')) for i in range(50)]
+
+        assert [f.result(timeout=5) for f in futures] == ['success'] * 50
+        assert all(count == 3 for count in statuses.polls.values())
+        assert tracker.pending == 0
+        tracker.close()
+
+    def test_failed_status_and_sync_responses(self):
+        tracker = OperationTracker(FakeStatuses(1, final='failed'), poll_interval=0.01)
+        assert tracker.track(accepted('https://op/x')).result(timeout=5) == 'failed'
+        assert tracker.track(Mock(status_code=204)).result() == 'success'
+        assert tracker.track(Mock(status_code=404)).result() == 'failed'
+        tracker.close()
+
+    def test_same_href_shares_future(self):
+        tracker = OperationTracker(FakeStatuses(2), poll_interval=0.01)
+        assert tracker.track('https://op/1') is tracker.track(accepted('https://op/1'))
+        tracker.close()
+
+    def test_awaitable(self):
+        tracker = OperationTracker(FakeStatuses(2), poll_interval=0.01)
+
+        async def scenario():
+            return await tracker.wait_async(accepted('https://op/async'))
+
+        assert asyncio.run(scenario()) == 'success'
+        tracker.close()
+
+    def test_poll_errors_fail_operation(self):
+        def unavailable(method, url):
+            if url.endswith('gone'):
+                return Mock(status_code=404)
+            raise ConnectionError('нет сети')
+
+        tracker = OperationTracker(unavailable, poll_interval=0.01, max_interval=0.01,
+                                   max_errors=3)
+        assert tracker.track('https://op/gone').result(timeout=5) == 'failed'
+        assert tracker.track('https://op/down').result(timeout=5) == 'failed'
+        assert tracker.pending == 0
+        tracker.close()
+
+    def test_close_cancels_pending(self):
+        tracker = OperationTracker(FakeStatuses(10 ** 6), poll_interval=0.01)
+        future = tracker.track('https://op/slow')
+        tracker.close()
+        assert future.cancelled()
+
+
+class TestClientOperations:
+    def test_wait_operation_uses_client_request(self):
+        client = YandexDiskAPI('token', transport=Mock())
+        client._request = FakeStatuses(1)
+        client.operations.poll_interval = 0.01
+        assert client.wait_operation(accepted('https://op/delete'), timeout=5) == 'success'
+        client.close()
+
+    def test_unknown_operation_on_stand(self, fake_client, fake_disk):
+        fake_client.operations.poll_interval = 0.01
+        href = f'{fake_disk.base_url}/operations/unknown'
+        assert fake_client.wait_operation(href, timeout=5) == 'failed'
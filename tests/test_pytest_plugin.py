@@ -0,0 +1,106 @@
+"""
+Тесты pytest-плагина: проверка прав токена и её кэширование
+"""
+import requests
+
+from api.client import YandexDiskAPI
+from helpers import pytest_plugin
+from helpers.fake_server import FakeDiskServer
+
+
+class FakeCache:
+    """Заменитель config.cache с тем же get/set"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, default):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+class CountingProbe:
+    def __init__(self, result=None):
+        self.calls = 0
+        self.result = result or {'read': True, 'write': True, 'upload': False,
+                                 'publish': False, 'status': 200, 'error': None}
+
+    def __call__(self):
+        self.calls += 1
+        return dict(self.result)
+
+
+class TestProbe:
+    def test_all_capabilities(self, fake_client, fake_disk):
+        capabilities = pytest_plugin.probe_capabilities(fake_client)
+        assert all(capabilities[name] for name in pytest_plugin.CAPABILITIES)
+        assert capabilities['status'] == 200 and capabilities['error'] is None
+        # Временная папка проверки за собой не оставляется
+        assert fake_client.get_resource_info('/').json()['_embedded']['items'] == []
+
+    def test_bad_token(self):
+        with FakeDiskServer(token='good') as server:
+            with YandexDiskAPI('bad', base_url=server.base_url) as client:
+                capabilities = pytest_plugin.probe_capabilities(client)
+        assert not any(capabilities[name] for name in pytest_plugin.CAPABILITIES)
+        assert capabilities['status'] == 401
+
+    def test_probe_folder_removed_when_publish_fails(self, fake_client, fake_disk, monkeypatch):
+        def broken(path):
+            raise requests.ConnectionError('обрыв')
+
+        monkeypatch.setattr(fake_client, 'publish_resource', broken)
+        capabilities = pytest_plugin.probe_capabilities(fake_client)
+        assert capabilities['write'] and not capabilities['publish']
+        assert 'ConnectionError' in capabilities['error']
+        assert fake_client.get_resource_info('/').json()['_embedded']['items'] == []
+
+    def test_network_error(self):
+        class Broken:
+            def get_disk_info(self, fields=None):
+                raise requests.ConnectionError('нет сети')
+
+        capabilities = pytest_plugin.probe_capabilities(Broken())
+        assert not capabilities['read']
+        assert 'ConnectionError' in capabilities['error']
+
+
+class TestLoadCapabilities:
+    def test_cached_within_ttl(self):
+        cache, probe = FakeCache(), CountingProbe()
+        first = pytest_plugin.load_capabilities(cache, 'k', 60, probe)
+        second = pytest_plugin.load_capabilities(cache, 'k', 60, probe)
+        assert first == second and probe.calls == 1
+
+    def test_expired(self):
+        cache, probe = FakeCache(), CountingProbe()
+        pytest_plugin.load_capabilities(cache, 'k', 60, probe)
+        pytest_plugin.load_capabilities(cache, 'k', 0, probe)
+        assert probe.calls == 2
+
+    def test_reprobe_and_other_token(self):
+        cache, probe = FakeCache(), CountingProbe()
+        pytest_plugin.load_capabilities(cache, 'k', 60, probe)
+        pytest_plugin.load_capabilities(cache, 'k', 60, probe, reprobe=True)
+        pytest_plugin.load_capabilities(cache, 'other', 60, probe)
+        assert probe.calls == 3
+
+    def test_network_error_not_cached(self):
+        cache = FakeCache()
+        probe = CountingProbe({'read': False, 'status': None, 'error': 'ConnectionError'})
+        pytest_plugin.load_capabilities(cache, 'k', 60, probe)
+        pytest_plugin.load_capabilities(cache, 'k', 60, probe)
+        assert probe.calls == 2 and cache.data == {}
+
+    def test_without_cache(self):
+        probe = CountingProbe()
+        assert pytest_plugin.load_capabilities(None, 'k', 60, probe)['read']
+
+
+def test_token_key_hides_token():
+    key = pytest_plugin.token_key('secret-token', 'https://example')
+    assert 'secret' not in key
+    assert key == pytest_plugin.token_key('secret-token', 'https://example')
+    assert key != pytest_plugin.token_key('secret-token', 'http://127.0.0.1')
@@ -0,0 +1,256 @@
+"""
+Тесты хеджирования и предохранителя
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from api.client import YandexDiskAPI
+from api.resilience import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError,
+                            HedgePolicy)
+from api.throttle import RequestStats, RetryPolicy, TokenBucket
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, tag=None):
+        self.status_code = status_code
+        self.tag = tag
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class SlowFirstTransport:
+    """Первый запрос зависает на stall секунд, остальные отвечают сразу"""
+
+    def __init__(self, stall=1.0):
+        self.stall = stall
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.calls += 1
+            number = self.calls
+        if number == 1:
+            time.sleep(self.stall)
+        return FakeResponse(200, number)
+
+    def add_hook(self, hook):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestHedgePolicy:
+    def test_fast_response_is_not_hedged(self):
+        stats = RequestStats()
+        policy = HedgePolicy(default_delay=0.5, stats=stats)
+        assert policy.run('E', lambda: FakeResponse(tag='fast')).tag == 'fast'
+        assert stats['hedged'] == 0
+        policy.close()
+
+    def test_slow_primary_is_hedged(self):
+        stats = RequestStats()
+        policy = HedgePolicy(default_delay=0.05, stats=stats)
+        transport = SlowFirstTransport(stall=0.5)
+        started = time.perf_counter()
+        response = policy.run('E', lambda: transport.request('GET', 'u'))
+        assert time.perf_counter() - started < 0.3
+        assert response.tag == 2
+        assert stats['hedged'] == 1 and stats['hedge_won'] == 1
+        policy.close()
+
+    def test_backup_needs_admission(self):
+        stats = RequestStats()
+        policy = HedgePolicy(default_delay=0.02, stats=stats)
+        transport = SlowFirstTransport(stall=0.1)
+        response = policy.run('E', lambda: transport.request('GET', 'u'), admit=lambda: False)
+        assert response.tag == 1 and transport.calls == 1
+        assert stats['hedged'] == 0 and stats['hedge_skipped'] == 1
+        policy.close()
+
+    def test_saturated_pool_neither_queues_nor_hedges(self):
+        stats = RequestStats()
+        policy = HedgePolicy(default_delay=0.15, workers=2, stats=stats)
+
+        def send():
+            time.sleep(0.1)
+            return FakeResponse()
+
+        threads = [threading.Thread(target=policy.run, args=('E', send)) for _ in range(16)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # В очереди пула никто не ждал: все 16 ответов пришли за ~0.1 с
+        assert time.perf_counter() - started < 0.5
+        assert stats['hedged'] == 0
+        assert stats['hedge_bypassed'] >= 14
+        policy.close()
+
+    def test_threshold_follows_recent_latency(self):
+        policy = HedgePolicy(percentile=0.9, min_samples=10, min_delay=0.01, default_delay=2.0)
+        assert policy.delay('E') == 2.0
+        for i in range(1, 11):
+            policy.observe('E', i / 100)
+        assert policy.delay('E') == pytest.approx(0.09)
+        assert policy.delay('other') == 2.0
+
+    def test_error_when_both_attempts_fail(self):
+        policy = HedgePolicy(default_delay=0.01)
+
+        def fail():
+            time.sleep(0.05)
+            raise requests.ConnectionError('down')
+
+        with pytest.raises(requests.ConnectionError):
+            policy.run('E', fail)
+        policy.close()
+
+    def test_async_hedging(self):
+        stats = RequestStats()
+        policy = HedgePolicy(default_delay=0.05, stats=stats)
+        calls = []
+
+        async def send():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+                return 'slow'
+            return 'fast'
+
+        assert asyncio.run(policy.run_async('E', send)) == 'fast'
+        assert stats['hedge_won'] == 1
+
+
+class TestCircuitBreaker:
+    def test_opens_after_failures_and_recovers(self):
+        breaker = CircuitBreaker(failures=3, recovery=0.1)
+        for _ in range(3):
+            breaker.call('E', lambda: FakeResponse(500))
+        assert breaker.state('E') == OPEN
+        with pytest.raises(CircuitOpenError) as info:
+            breaker.call('E', lambda: FakeResponse(200))
+        assert isinstance(info.value, requests.RequestException)
+        assert info.value.endpoint == 'E'
+        # Другие эндпоинты не затронуты
+        assert breaker.call('F', lambda: FakeResponse(200)).status_code == 200
+
+        time.sleep(0.12)
+        assert breaker.state('E') == HALF_OPEN
+        breaker.call('E', lambda: FakeResponse(200))
+        assert breaker.state('E') == CLOSED
+
+    def test_half_open_failure_reopens(self):
+        breaker = CircuitBreaker(failures=1, recovery=0.05)
+
+        def fail():
+            raise requests.ConnectionError('down')
+
+        with pytest.raises(requests.ConnectionError):
+            breaker.call('E', fail)
+        time.sleep(0.06)
+        with pytest.raises(requests.ConnectionError):
+            breaker.call('E', fail)
+        assert breaker.state('E') == OPEN
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failures=2)
+        breaker.call('E', lambda: FakeResponse(502))
+        breaker.call('E', lambda: FakeResponse(200))
+        breaker.call('E', lambda: FakeResponse(502))
+        assert breaker.state('E') == CLOSED
+
+    def test_trial_with_unexpected_error_frees_slot(self):
+        breaker = CircuitBreaker(failures=1, recovery=0.05)
+        breaker.record('E', False)
+        time.sleep(0.06)
+
+        def broken():
+            raise ValueError('не JSON')
+
+        with pytest.raises(ValueError):
+            breaker.call('E', broken)
+        assert breaker.state('E') == HALF_OPEN
+        breaker.call('E', lambda: FakeResponse(200))
+        assert breaker.state('E') == CLOSED
+
+    def test_cancelled_async_trial_frees_slot(self):
+        breaker = CircuitBreaker(failures=1, recovery=0.05)
+        breaker.record('E', False)
+        time.sleep(0.06)
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def ok():
+            return FakeResponse(200)
+
+        async def scenario():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(breaker.call_async('E', hang), 0.01)
+            return await breaker.call_async('E', ok)
+
+        assert asyncio.run(scenario()).status_code == 200
+        assert breaker.state('E') == CLOSED
+
+    def test_lost_trial_readmitted_after_recovery(self):
+        breaker = CircuitBreaker(failures=1, recovery=0.05)
+        breaker.record('E', False)
+        time.sleep(0.06)
+        assert breaker.before('E') is True
+        # Проба не отчиталась: пока recovery не прошло, остальные отбиваются
+        with pytest.raises(CircuitOpenError):
+            breaker.before('E')
+        time.sleep(0.06)
+        assert breaker.before('E') is True
+
+
+class TestClientIntegration:
+    def test_hedged_get_resource_info(self):
+        transport = SlowFirstTransport(stall=1.0)
+        hedging = HedgePolicy(default_delay=0.05)
+        client = YandexDiskAPI('t', transport=transport, hedging=hedging)
+        started = time.perf_counter()
+        response = client.get_resource_info('a')
+        assert time.perf_counter() - started < 0.5
+        assert response.tag == 2
+        hedging.close()
+
+    def test_backup_spends_rate_limit(self):
+        transport = SlowFirstTransport(stall=0.3)
+        hedging = HedgePolicy(default_delay=0.05)
+        limiter = TokenBucket(rate=1, capacity=2)
+        client = YandexDiskAPI('t', transport=transport, hedging=hedging, rate_limiter=limiter)
+        assert client.get_resource_info('a').tag == 2
+        assert client.stats['requests'] == 2
+        # Бакет пуст: следующая медленная попытка не хеджируется
+        transport.calls = 0
+        assert client.get_resource_info('a').tag == 1
+        assert transport.calls == 1
+        hedging.close()
+
+    def test_mutations_are_not_hedged(self):
+        transport = SlowFirstTransport(stall=0.2)
+        client = YandexDiskAPI('t', transport=transport, hedging=HedgePolicy(default_delay=0.01))
+        client.create_folder('a')
+        assert transport.calls == 1
+
+    def test_breaker_fails_fast(self):
+        breaker = CircuitBreaker(failures=2, recovery=60)
+        with YandexDiskAPI('t', base_url='http://127.0.0.1:9/v1/disk', timeout=(0.5, 0.5),
+                           retry_policy=RetryPolicy(max_retries=0),
+                           circuit_breaker=breaker) as client:
+            for _ in range(2):
+                with pytest.raises(requests.ConnectionError):
+                    client.get_disk_info()
+            with pytest.raises(CircuitOpenError):
+                client.get_disk_info()
+            assert client.stats['circuit_open'] == 1
@@ -0,0 +1,133 @@
+"""
+Тесты инкрементальной синхронизации папки
+"""
+import hashlib
+import threading
+from unittest.mock import Mock
+
+import requests
+
+from api import bulk
+from api.sync import INDEX_NAME, SyncIndex, sync_directory
+
+
+class FakeDisk:
+    """Диск в памяти с тем же интерфейсом, что использует sync_directory"""
+
+    def __init__(self):
+        self.files = {}
+        self.dirs = set()
+        self.uploads = []
+        self.lock = threading.Lock()
+
+    def iter_dir(self, path, fields=None):
+        if path not in self.dirs:
+            raise requests.HTTPError(response=Mock(status_code=404))
+        prefix = path + '/'
+        for d in sorted(self.dirs):
+            if d.startswith(prefix) and '/' not in d[len(prefix):]:
+                yield {'name': d[len(prefix):], 'type': 'dir'}
+        for f, data in sorted(self.files.items()):
+            if f.startswith(prefix) and '/' not in f[len(prefix):]:
+                yield {'name': f[len(prefix):], 'type': 'file', 'md5': hashlib.md5(data).hexdigest()}
+
+    def create_folder(self, path):
+        with self.lock:
+            self.dirs.add(path)
+        return Mock(status_code=201)
+
+    def create_folders(self, paths):
+        return bulk.create_folders(self.create_folder, paths)
+
+    def upload_file(self, file_path, disk_path, overwrite=False):
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        with self.lock:
+            self.files[disk_path] = data
+            self.uploads.append(disk_path)
+        return Mock(status_code=201)
+
+    def delete_resource(self, path):
+        with self.lock:
+            self.dirs = {d for d in self.dirs if d != path and not d.startswith(path + '/')}
+            self.files = {f: v for f, v in self.files.items()
+                          if f != path and not f.startswith(path + '/')}
+        return Mock(status_code=204)
+
+    def delete_resources(self, paths):
+        return bulk.delete_resources(self.delete_resource, paths)
+
+
+def make_tree(root, files):
+    for rel_path, data in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+class TestSyncDirectory:
+    def test_first_sync_uploads_everything(self, tmp_path):
+        make_tree(tmp_path, {'a.txt': b'a', 'sub/b.txt': b'b', 'sub/deep/c.txt': b'c'})
+        disk = FakeDisk()
+        report = sync_directory(disk, str(tmp_path), 'build')
+
+        assert sorted(report.uploaded) == ['a.txt', 'sub/b.txt', 'sub/deep/c.txt']
+        assert {'build', 'build/sub', 'build/sub/deep'} <= disk.dirs
+        assert INDEX_NAME not in ''.join(disk.files)
+
+    def test_second_sync_uploads_only_changes(self, tmp_path):
+        make_tree(tmp_path, {'a.txt': b'a', 'sub/b.txt': b'b', 'old.txt': b'old'})
+        disk = FakeDisk()
+        sync_directory(disk, str(tmp_path), 'build')
+        disk.uploads.clear()
+
+        (tmp_path / 'a.txt').write_bytes(b'changed')
+        (tmp_path / 'old.txt').unlink()
+        report = sync_directory(disk, str(tmp_path), 'build')
+
+        assert disk.uploads == ['build/a.txt']
+        assert report.unchanged == ['sub/b.txt']
+        assert report.deleted == ['old.txt']
+        assert 'build/old.txt' not in disk.files
+
+    def test_unreadable_file_is_reported_not_fatal(self, tmp_path):
+        make_tree(tmp_path, {'a.txt': b'a', 'link.txt': b'l'})
+        disk = FakeDisk()
+        sync_directory(disk, str(tmp_path), 'build')
+
+        (tmp_path / 'link.txt').unlink()
+        (tmp_path / 'link.txt').symlink_to(tmp_path / 'missing.txt')
+        (tmp_path / 'b.txt').write_bytes(b'b')
+        report = sync_directory(disk, str(tmp_path), 'build')
+
+        assert isinstance(report.failed['link.txt'], FileNotFoundError)
+        assert report.uploaded == ['b.txt']
+        # Прочитать не смогли — значит, и удалять копию на Диске нельзя
+        assert 'link.txt' not in report.deleted
+        assert 'build/link.txt' in disk.files
+
+
+class TestSyncIndex:
+    def test_hash_reused_when_unchanged(self, tmp_path):
+        path = tmp_path / 'f.bin'
+        path.write_bytes(b'data')
+        index = SyncIndex(str(tmp_path / 'index.sqlite'))
+        first = index.hashes('f.bin', str(path))
+        index.flush()
+        index._db.execute("UPDATE files SET md5 = 'cached'")
+        assert index.hashes('f.bin', str(path))[0] == 'cached'
+        assert first[0] == hashlib.md5(b'data').hexdigest()
+        index.close()
+
+    def test_new_hashes_written_in_batches(self, tmp_path):
+        index = SyncIndex(str(tmp_path / 'index.sqlite'), batch_size=3)
+        for i in range(4):
+            path = tmp_path / f'{i}.bin'
+            path.write_bytes(b'x' * i)
+            index.hashes(f'{i}.bin', str(path))
+        stored = index._db.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        assert stored == 3
+        index.close()
+        reopened = SyncIndex(str(tmp_path / 'index.sqlite'))
+        assert len(reopened.paths()) == 4
+        reopened.close()
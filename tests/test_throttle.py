@@ -0,0 +1,84 @@
+"""
+Тесты лимитера частоты и политики повторов
+"""
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from api.client import YandexDiskAPI
+from api.throttle import RetryPolicy, TokenBucket
+
+
+def response(status, headers=None):
+    return Mock(status_code=status, headers=headers or {})
+
+
+class TestTokenBucket:
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+    def test_async_acquire_sleeps(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        async def scenario():
+            started = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire_async()
+            return time.monotonic() - started
+
+        assert asyncio.run(scenario()) >= 0.03
+
+
+class TestRetryPolicy:
+    def test_retry_after_is_honoured(self):
+        policy = RetryPolicy()
+        assert policy.delay(0, response(429, {'Retry-After': '2'})) == 2.0
+
+    def test_backoff_is_bounded(self):
+        policy = RetryPolicy(backoff=1, max_backoff=3)
+        assert all(0 <= policy.delay(10) <= 3 for _ in range(100))
+
+    def test_only_idempotent_methods(self):
+        policy = RetryPolicy()
+        assert policy.should_retry('GET', 0, response(503))
+        assert policy.should_retry('delete', 0, response(429))
+        assert not policy.should_retry('PUT', 0, response(503))
+        assert not policy.should_retry('GET', 3, response(503))
+
+
+class TestClientRetry:
+    def make_client(self, *responses, **kwargs):
+        transport = Mock()
+        transport.request.side_effect = list(responses)
+        return YandexDiskAPI('token', transport=transport,
+                             retry_policy=RetryPolicy(backoff=0.001), **kwargs)
+
+    def test_get_retried_until_success(self):
+        client = self.make_client(response(429, {'Retry-After': '0'}), response(503), response(200))
+        assert client.get_disk_info().status_code == 200
+        assert client.stats.snapshot()['throttled'] == 2
+        assert client.stats['retried'] == 2
+        assert client.stats['requests'] == 3
+
+    def test_put_is_not_retried(self):
+        client = self.make_client(response(503), response(201))
+        assert client.create_folder('x').status_code == 503
+        assert client.stats['retried'] == 0
+
+    def test_connection_error_retried(self):
+        client = self.make_client(requests.ConnectionError(), response(200))
+        assert client.get_resource_info('x').status_code == 200
+
+    def test_shared_rate_limiter(self):
+        bucket = TokenBucket(rate=1000, capacity=1)
+        client = self.make_client(response(200), response(200), rate_limiter=bucket)
+        with patch.object(bucket, 'reserve', wraps=bucket.reserve) as reserve:
+            client.get_disk_info()
+            client.get_disk_info()
+        assert reserve.call_count == 2
@@ -0,0 +1,89 @@
+"""
+Тесты копирования и перемещения на стороне сервера
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from api.bulk import TRANSFER_ERROR, TRANSFER_IN_PROGRESS, transfer_many
+from api.cache import MetadataCache
+from api.client import YandexDiskAPI
+
+
+def _upload(client, path, data=b'data'):
+    assert client.upload_stream(data, path).status_code == 201
+
+
+class TestCopyMove:
+    def test_copy_file(self, fake_client, fake_disk):
+        _upload(fake_client, 'a.txt', b'hello')
+        assert fake_client.copy('a.txt', 'b.txt').status_code == 201
+        assert fake_disk.state.nodes['b.txt'].data == b'hello'
+        assert 'a.txt' in fake_disk.state.nodes
+        assert fake_client.copy('a.txt', 'b.txt').status_code == 409
+        assert fake_client.copy('a.txt', 'b.txt', overwrite=True).status_code == 201
+
+    def test_move_folder_is_tracked(self, fake_client, fake_disk):
+        fake_client.create_folder('src')
+        _upload(fake_client, 'src/file.txt')
+        response = fake_client.move('src', 'dst')
+        assert response.status_code == 202
+        assert fake_client.wait_operation(response, timeout=5) == 'success'
+        assert 'src' not in fake_disk.state.nodes
+        assert fake_disk.state.nodes['dst/file.txt'].data == b'data'
+
+    def test_move_invalidates_cache(self, fake_disk):
+        with YandexDiskAPI('t', base_url=fake_disk.base_url, cache=MetadataCache()) as client:
+            _upload(client, 'a.txt')
+            assert client.get_resource_info('a.txt').status_code == 200
+            client.move('a.txt', 'b.txt')
+            assert client.get_resource_info('a.txt').status_code == 404
+            assert client.get_resource_info('b.txt').status_code == 200
+
+
+class TestTransferMany:
+    def test_copy_many_reports_per_item(self, fake_client, fake_disk):
+        fake_client.create_folders(['dir', 'backup'])
+        _upload(fake_client, 'dir/one.txt', b'1')
+        _upload(fake_client, 'two.txt', b'2')
+        results = fake_client.copy_many([('dir', 'backup/dir'), ('two.txt', 'backup/two.txt'),
+                                         ('missing.txt', 'backup/missing.txt')], timeout=5)
+        assert results['backup/dir'].ok and results['backup/dir'].response.status_code == 202
+        assert results['backup/two.txt'].ok
+        assert results['backup/missing.txt'].status == 'failed'
+        assert results['backup/missing.txt'].response.status_code == 404
+        assert fake_disk.state.nodes['backup/dir/one.txt'].data == b'1'
+
+    def test_move_many(self, fake_client, fake_disk):
+        fake_client.create_folder('inbox')
+        names = [f'file_{i}.txt' for i in range(10)]
+        for name in names:
+            _upload(fake_client, name)
+        results = fake_client.move_many([(name, f'inbox/{name}') for name in names], workers=4)
+        assert all(result.ok for result in results.values())
+        assert all(name not in fake_disk.state.nodes for name in names)
+        assert len(fake_disk.state.children('inbox')) == 10
+
+    def test_errors_and_timeouts(self):
+        ok = Mock(status_code=201)
+        pending = Mock(status_code=202)
+        never = Mock()
+        never.result.side_effect = TimeoutError
+
+        def transfer(source, path):
+            if source == 'boom':
+                raise ConnectionError('down')
+            return pending if source == 'slow' else ok
+
+        results = transfer_many(transfer, lambda response: never,
+                                [('a', 'b'), ('boom', 'c'), ('slow', 'd')], timeout=0.01)
+        assert results['b'].ok
+        assert results['c'].status == TRANSFER_ERROR
+        assert isinstance(results['c'].error, ConnectionError)
+        assert results['d'].status == TRANSFER_IN_PROGRESS
+
+    def test_duplicate_destination_rejected(self):
+        transfer = Mock(return_value=Mock(status_code=201))
+        with pytest.raises(ValueError):
+            transfer_many(transfer, Mock(), [('a', 'x'), ('b', '/x/')])
+        transfer.assert_not_called()
@@ -0,0 +1,71 @@
+"""
+Тесты транспорта: пул соединений и жизненный цикл клиента
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+from api.client import YandexDiskAPI
+from api.transport import Transport, DEFAULT_TIMEOUT
+
+
+class TestTransport:
+    """Пул keep-alive соединений, таймауты и закрытие"""
+
+    def test_pool_size_applied_to_adapters(self):
+        """Размер пула передаётся в адаптеры обеих схем"""
+        transport = Transport(pool_connections=3, pool_maxsize=7)
+        for scheme in ('https://', 'http://'):
+            adapter = transport.session.get_adapter(scheme + 'cloud-api.yandex.net')
+            assert adapter._pool_connections == 3
+            assert adapter._pool_maxsize == 7
+        transport.close()
+
+    def test_default_timeout_is_set(self):
+        """Таймаут подставляется, если вызывающий его не указал"""
+        transport = Transport()
+        with patch.object(transport.session, 'request') as request:
+            transport.request('GET', 'https://cloud-api.yandex.net/v1/disk')
+        assert request.call_args.kwargs['timeout'] == DEFAULT_TIMEOUT
+
+    def test_keep_alive_disabled(self):
+        """Без keep-alive каждый запрос просит закрыть соединение"""
+        transport = Transport(keep_alive=False)
+        assert transport.session.headers['Connection'] == 'close'
+
+    def test_closed_transport_rejects_requests(self):
+        """После close() запросы не выполняются"""
+        with Transport() as transport:
+            pass
+        assert transport.closed
+        with pytest.raises(RuntimeError):
+            transport.request('GET', 'https://cloud-api.yandex.net/v1/disk')
+
+
+class TestClientTransport:
+    """Клиент ходит в API и на хост загрузки через один транспорт"""
+
+    def test_upload_goes_through_transport(self, temp_file):
+        """Ссылка для загрузки и сам PUT используют один и тот же пул"""
+        transport = Mock()
+        transport.request.side_effect = [
+            Mock(status_code=200, json=lambda: {'href': 'https://uploader.yandex.net/x'}),
+            Mock(status_code=201),
+        ]
+        client = YandexDiskAPI('token', transport=transport)
+
+        response = client.upload_file(temp_file, 'file.txt')
+
+        assert response.status_code == 201
+        urls = [call.args[1] for call in transport.request.call_args_list]
+        assert urls[1] == 'https://uploader.yandex.net/x'
+
+    def test_client_closes_only_own_transport(self):
+        """Чужой транспорт клиент не закрывает"""
+        shared = Mock()
+        with YandexDiskAPI('token', transport=shared):
+            pass
+        shared.close.assert_not_called()
+
+        with YandexDiskAPI('token') as client:
+            pass
+        assert client.transport.closed
@@ -0,0 +1,80 @@
+"""
+Тесты потоковой загрузки файла
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import Mock
+
+import pytest
+
+from api.client import YandexDiskAPI
+from api.upload import FileBody
+
+
+@pytest.fixture
+def upload_target():
+    """Локальный приёмник PUT: запоминает заголовки и тело"""
+    received = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_PUT(self):
+            received['headers'] = dict(self.headers)
+            received['body'] = self.rfile.read(int(self.headers['Content-Length']))
+            self.send_response(201)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/upload", received
+    server.shutdown()
+    server.server_close()
+
+
+class TestFileBody:
+    """Тело загрузки читается кусками в переиспользуемый буфер"""
+
+    def test_chunks_and_length(self, tmp_path):
+        """Куски фиксированного размера, длина известна заранее"""
+        path = tmp_path / 'data.bin'
+        path.write_bytes(os.urandom(10_000))
+        with open(path, 'rb') as f:
+            body = FileBody(f, chunk_size=4096)
+            sizes = [len(chunk) for chunk in body]
+        assert len(body) == 10_000
+        assert sizes == [4096, 4096, 1808]
+
+    def test_progress_callback(self, tmp_path):
+        """Колбэк получает отправленные байты, общий размер и время"""
+        path = tmp_path / 'data.bin'
+        path.write_bytes(b'x' * 5000)
+        calls = []
+        with open(path, 'rb') as f:
+            for _ in FileBody(f, chunk_size=2000, progress=lambda *a: calls.append(a)):
+                pass
+        assert [(sent, total) for sent, total, _ in calls] == [(2000, 5000), (4000, 5000), (5000, 5000)]
+
+
+class TestStreamingUpload:
+    """upload_file отправляет сырые байты с явным Content-Length"""
+
+    def test_raw_body_is_sent(self, tmp_path, upload_target):
+        href, received = upload_target
+        payload = os.urandom(300_000)
+        path = tmp_path / 'data.bin'
+        path.write_bytes(payload)
+
+        client = YandexDiskAPI('token')
+        client._request = Mock(return_value=Mock(status_code=200, json=lambda: {'href': href}))
+        response = client.upload_file(str(path), 'data.bin', chunk_size=64 * 1024)
+        client.close()
+
+        assert response.status_code == 201
+        assert received['body'] == payload
+        assert received['headers']['Content-Length'] == str(len(payload))
+        assert 'Transfer-Encoding' not in received['headers']
@@ -0,0 +1,64 @@
+"""
+Тесты конвейерной загрузки многих файлов
+"""
+import threading
+from unittest.mock import Mock
+
+from api.upload import pipelined_upload
+
+
+def make_files(tmp_path, count):
+    pairs = []
+    for i in range(count):
+        path = tmp_path / f'f{i}.txt'
+        path.write_bytes(f'file {i}'.encode())
+        pairs.append((str(path), f'batch/f{i}.txt'))
+    return pairs
+
+
+class TestUploadMany:
+    def test_all_files_uploaded(self, fake_client, fake_disk, tmp_path):
+        fake_client.create_folder('batch')
+        results = fake_client.upload_many(make_files(tmp_path, 30), workers=4, lookahead=6)
+
+        assert {path: r.status_code for path, r in results.items()} == \
+            {f'batch/f{i}.txt': 201 for i in range(30)}
+        assert fake_disk.state.nodes['batch/f7.txt'].data == b'file 7'
+
+    def test_expired_href_is_refetched(self, fake_client, fake_disk, tmp_path):
+        fake_client.create_folder('batch')
+        real_href = fake_client._upload_href
+        expired = Mock(status_code=200, json=lambda: {'href': f'{fake_disk.url}/upload/expired'})
+        seen = set()
+
+        def first_href_expired(disk_path, overwrite=False):
+            if disk_path not in seen:
+                seen.add(disk_path)
+                return expired
+            return real_href(disk_path, overwrite)
+
+        fake_client._upload_href = first_href_expired
+        results = fake_client.upload_many(make_files(tmp_path, 3))
+        assert [r.status_code for r in results.values()] == [201, 201, 201]
+
+    def test_lookahead_is_bounded(self):
+        lock = threading.Lock()
+        state = {'fetched': 0, 'put': 0, 'max_ahead': 0}
+        release = threading.Event()
+
+        def get_href(disk_path):
+            with lock:
+                state['fetched'] += 1
+                state['max_ahead'] = max(state['max_ahead'], state['fetched'] - state['put'])
+            return Mock(status_code=200, json=lambda: {'href': 'h'})
+
+        def put_file(href, local_path, disk_path):
+            release.wait(0.01)
+            with lock:
+                state['put'] += 1
+            return Mock(status_code=201)
+
+        pairs = [(f'l{i}', f'd{i}') for i in range(40)]
+        results = pipelined_upload(get_href, put_file, pairs, lookahead=5, workers=2)
+        assert len(results) == 40
+        assert state['max_ahead'] <= 5
@@ -0,0 +1,75 @@
+"""
+Тесты загрузки из памяти, файловых объектов, итераторов и труб
+"""
+import io
+import os
+import threading
+
+import pytest
+
+from api.upload import BufferBody, FileBody, SizedStreamBody, StreamBody, make_body
+from helpers.data_generator import Payload
+
+
+class TestMakeBody:
+    def test_body_kinds(self):
+        assert isinstance(make_body(b'abc'), BufferBody)
+        assert isinstance(make_body(memoryview(b'abc')), BufferBody)
+        assert isinstance(make_body(io.BytesIO(b'abc')), FileBody)
+        assert isinstance(make_body(iter([b'a'])), StreamBody)
+        assert isinstance(make_body(iter([b'a']), length=1), SizedStreamBody)
+
+    def test_buffer_chunks_are_views(self):
+        data = bytearray(b'x' * 10)
+        chunks = list(BufferBody(data, chunk_size=4))
+        assert [len(c) for c in chunks] == [4, 4, 2]
+        assert all(isinstance(c, memoryview) for c in chunks)
+
+    def test_sized_iterables_get_length(self):
+        assert len(make_body(Payload(5000))) == 5000
+        assert len(make_body([b'ab', b'cde'])) == 5
+        assert isinstance(make_body(Payload(10)), SizedStreamBody)
+
+    def test_bytesio_length_from_position(self):
+        source = io.BytesIO(b'0123456789')
+        source.seek(3)
+        assert len(make_body(source)) == 7
+
+
+class TestUploadStream:
+    @pytest.mark.parametrize('make_source', [
+        lambda data: data,
+        lambda data: memoryview(data),
+        lambda data: io.BytesIO(data),
+        lambda data: (data[i:i + 1000] for i in range(0, len(data), 1000)),
+    ], ids=['bytes', 'memoryview', 'bytesio', 'generator'])
+    def test_sources(self, fake_client, fake_disk, make_source):
+        data = os.urandom(5000)
+        response = fake_client.upload_stream(make_source(data), 'stream.bin', chunk_size=1024)
+        assert response.status_code == 201
+        assert fake_disk.state.nodes['stream.bin'].data == data
+
+    def test_payload_sent_with_content_length(self, fake_client, fake_disk):
+        payload = Payload(50_000, seed=3)
+        response = fake_client.upload_stream(payload, 'payload.bin')
+        assert response.status_code == 201
+        assert response.request.headers['Content-Length'] == '50000'
+        assert 'Transfer-Encoding' not in response.request.headers
+        assert fake_disk.state.nodes['payload.bin'].data == b''.join(payload)
+
+    def test_pipe_is_sent_chunked(self, fake_client, fake_disk):
+        read_fd, write_fd = os.pipe()
+        data = os.urandom(100_000)
+
+        def produce():
+            with os.fdopen(write_fd, 'wb') as writer:
+                writer.write(data)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        with os.fdopen(read_fd, 'rb') as reader:
+            response = fake_client.upload_stream(reader, 'pipe.bin')
+        producer.join()
+
+        assert response.status_code == 201
+        assert fake_disk.state.nodes['pipe.bin'].data == data